@@ -0,0 +1,158 @@
+import argparse
+import json
+import threading
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.bytecode import OpCodes
+from src.compiler import Compiler
+from src.frame import Frame
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.object import Array, Hash, HashPair, Integer, String
+from src.profiler import ANONYMOUS, MAIN
+from src.vm import VM, Status
+
+TRACKED: tuple[type, ...] = (Integer, String, Array, Hash, HashPair)
+
+
+@dataclass
+class Allocations:
+    counts: Counter[tuple[str, str, str]] = field(default_factory=Counter)
+    opcode: str = "-"
+    function: str = MAIN
+    main: Frame | None = None
+    peak: int = 0
+
+    def at(self, opcode: OpCodes, frame: Frame) -> None:
+        self.opcode = opcode.name
+        self.function = MAIN if frame is self.main else frame.fn.name or ANONYMOUS
+
+    def record(self, type_name: str) -> None:
+        self.counts[(type_name, self.opcode, self.function)] += 1
+
+    def by(self, index: int) -> Counter[str]:
+        totals: Counter[str] = Counter()
+        for key, count in self.counts.items():
+            totals[key[index]] += count
+        return totals
+
+    def report(self, top: int = 10) -> str:
+        lines = [f"{'type':<24} {'allocations':>12}"]
+        lines += [f"{name:<24} {count:>12}" for name, count in self.by(0).most_common()]
+        lines += ["", f"{'opcode':<24} {'allocations':>12}"]
+        lines += [f"{name:<24} {count:>12}" for name, count in self.by(1).most_common(top)]
+        lines += ["", f"{'function':<24} {'allocations':>12}"]
+        lines += [f"{name:<24} {count:>12}" for name, count in self.by(2).most_common(top)]
+        lines += ["", f"peak traced memory: {self.peak / 1024:.1f} KiB"]
+        return "\n".join(lines)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "types": dict(self.by(0)),
+            "opcodes": dict(self.by(1)),
+            "functions": dict(self.by(2)),
+            "allocations": [
+                {"type": type_name, "opcode": opcode, "function": function, "count": count}
+                for (type_name, opcode, function), count in self.counts.most_common()
+            ],
+            "peak": self.peak,
+        }
+
+
+def counted(cls: type, init: Callable[..., None]) -> Callable[..., None]:
+    def __init__(self: Any, *args: Any, **kwargs: Any) -> None:
+        init(self, *args, **kwargs)
+        allocations = getattr(current, "allocations", None)
+        if allocations is not None:
+            allocations.record(cls.__name__)
+
+    return __init__
+
+
+@dataclass
+class Patch:
+    inits: dict[type, Callable[..., None]] = field(default_factory=dict)
+    users: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def install(self) -> None:
+        with self.lock:
+            if self.users == 0:
+                self.inits = {cls: vars(cls)["__init__"] for cls in TRACKED}
+                for cls, init in self.inits.items():
+                    cls.__init__ = counted(cls, init)  # type: ignore[misc]
+            self.users += 1
+
+    def remove(self) -> None:
+        with self.lock:
+            self.users -= 1
+            if self.users == 0:
+                for cls, init in self.inits.items():
+                    cls.__init__ = init  # type: ignore[misc]
+
+
+current = threading.local()
+patch = Patch()
+
+
+@contextmanager
+def tracking(allocations: Allocations) -> Iterator[Allocations]:
+    previous = getattr(current, "allocations", None)
+    current.allocations = allocations
+    patch.install()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    try:
+        yield allocations
+    finally:
+        allocations.peak = tracemalloc.get_traced_memory()[1]
+        if not tracing:
+            tracemalloc.stop()
+        patch.remove()
+        current.allocations = previous
+
+
+@dataclass
+class AllocationTrackingVM(VM):
+    allocations: Allocations = field(default_factory=Allocations)
+
+    execute_until = VM.execute_until_traced
+
+    def __post_init__(self) -> None:
+        self.tracer = self.allocations.at
+
+    def run(self, max_calls: int | None = None) -> Status:
+        self.allocations.main = self.frames[0]
+        with tracking(self.allocations):
+            return super().run(max_calls)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.allocations")
+    parser.add_argument("file", help="Monkey source file to run")
+    parser.add_argument("--json", help="write the allocation counts to a JSON file")
+    parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        program = Parser(lexer=Lexer(f.read())).parse_program()
+    compiler = Compiler(optimize=args.optimize)
+    compiler.compile(program)
+    vm = AllocationTrackingVM.from_compiler(compiler=compiler)
+    vm.run()
+    print(vm.allocations.report())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(vm.allocations.to_json(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import replace
+from typing import Any, TypeVar
+
+from src.libast import (
+    ArrayLiteral,
+    BlockStatement,
+    CallExpression,
+    ExpressionStatement,
+    FunctionLiteral,
+    HashLiteral,
+    Identifier,
+    IfExpression,
+    IndexExpression,
+    InfixExpression,
+    LetStatement,
+    Node,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+)
+
+N = TypeVar("N", bound=Node)
+
+
+def children(node: Node) -> list[Node]:  # noqa: C901
+    match node:
+        case Program() | BlockStatement():
+            return list(node.statements)
+        case LetStatement():
+            return [] if node.value is None else [node.value]
+        case ReturnStatement():
+            return [] if node.return_value is None else [node.return_value]
+        case ExpressionStatement():
+            return [] if node.expression is None else [node.expression]
+        case IfExpression():
+            branches: list[Node] = [node.condition, node.consequence]
+            return branches if node.alternative is None else [*branches, node.alternative]
+        case FunctionLiteral():
+            return [*node.parameters, node.body]
+        case PrefixExpression():
+            return [node.right]
+        case InfixExpression():
+            return [node.left, node.right]
+        case CallExpression():
+            return [node.function, *node.arguments]
+        case ArrayLiteral():
+            return list(node.elements)
+        case HashLiteral():
+            return [e for pair in node.pairs.items() for e in pair]
+        case IndexExpression():
+            return [node.left, node.index]
+        case _:
+            return []
+
+
+def walk(node: Node) -> Iterator[Node]:
+    yield node
+    for child in children(node):
+        yield from walk(child)
+
+
+def walk_scope(node: Node) -> Iterator[Node]:
+    yield node
+    if isinstance(node, FunctionLiteral):
+        return
+    for child in children(node):
+        yield from walk_scope(child)
+
+
+def let_statements(statements: list[Node]) -> list[LetStatement]:
+    return [
+        n for statement in statements for n in walk_scope(statement) if isinstance(n, LetStatement)
+    ]
+
+
+def free_variables(node: FunctionLiteral) -> frozenset[str]:
+    names: set[str] = set()
+    for n in walk_scope(node.body):
+        match n:
+            case Identifier():
+                names.add(n.value)
+            case FunctionLiteral():
+                names |= free_variables(n)
+    return frozenset(names - {p.value for p in node.parameters})
+
+
+def bindings(node: FunctionLiteral) -> Counter[str]:
+    lets = let_statements(list(node.body.statements))
+    return Counter([*(p.value for p in node.parameters), *(s.name.value for s in lets)])
+
+
+def defines_function(node: Node) -> bool:
+    match node:
+        case FunctionLiteral():
+            return True
+        case CallExpression(function=Identifier(value="memoize"), arguments=[FunctionLiteral(), _]):
+            return True
+        case _:
+            return False
+
+
+def map_children(node: N, f: Callable[[Any], Any]) -> N:  # noqa: C901
+    match node:
+        case Program() | BlockStatement():
+            return replace(node, statements=[f(s) for s in node.statements])
+        case LetStatement() if node.value is not None:
+            return replace(node, value=f(node.value))
+        case ReturnStatement() if node.return_value is not None:
+            return replace(node, return_value=f(node.return_value))
+        case ExpressionStatement() if node.expression is not None:
+            return replace(node, expression=f(node.expression))
+        case IfExpression():
+            alternative = None if node.alternative is None else f(node.alternative)
+            return replace(
+                node,
+                condition=f(node.condition),
+                consequence=f(node.consequence),
+                alternative=alternative,
+            )
+        case FunctionLiteral():
+            return replace(node, body=f(node.body))
+        case PrefixExpression():
+            return replace(node, right=f(node.right))
+        case InfixExpression():
+            return replace(node, left=f(node.left), right=f(node.right))
+        case CallExpression():
+            return replace(
+                node, function=f(node.function), arguments=[f(a) for a in node.arguments]
+            )
+        case ArrayLiteral():
+            return replace(node, elements=[f(e) for e in node.elements])
+        case HashLiteral():
+            return replace(node, pairs={f(k): f(v) for k, v in node.pairs.items()})
+        case IndexExpression():
+            return replace(node, left=f(node.left), index=f(node.index))
+        case _:
+            return node
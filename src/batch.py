@@ -0,0 +1,143 @@
+import argparse
+import io
+import json
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from enum import StrEnum
+from pathlib import Path
+
+from src.compiler import Compiler
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.vm import VM, Status
+
+SLICE = 10_000
+CACHE_SIZE = 256
+WARM_UP = "let f = fn(x) { if (x < 1) { [x, {x: x}] } else { f(x - 1) } }; f(3)"
+
+
+class ParseError(Exception):
+    pass
+
+
+class Outcome(StrEnum):
+    OK = "OK"
+    ERROR = "ERROR"
+    TIMEOUT = "TIMEOUT"
+
+
+@dataclass(frozen=True)
+class Script:
+    name: str
+    source: str
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    name: str
+    outcome: Outcome
+    value: str | None = None
+    output: str = ""
+    error: str | None = None
+    elapsed: float = 0.0
+
+
+compiled: dict[tuple[str, bool], Compiler] = {}
+
+
+def compile_source(source: str, optimize: bool = False) -> Compiler:
+    compiler = compiled.get((source, optimize))
+    if compiler is not None:
+        return compiler
+    parser = Parser(lexer=Lexer(source))
+    program = parser.parse_program()
+    if parser.errors:
+        raise ParseError("; ".join(parser.errors))
+    compiler = Compiler(optimize=optimize)
+    compiler.compile(program)
+    if len(compiled) >= CACHE_SIZE:
+        del compiled[next(iter(compiled))]
+    compiled[(source, optimize)] = compiler
+    return compiler
+
+
+def run_script(script: Script, timeout: float | None = None, optimize: bool = False) -> BatchResult:
+    return execute(
+        script.name,
+        lambda: VM.from_compiler(compiler=compile_source(script.source, optimize)),
+        timeout,
+    )
+
+
+def execute(name: str, load: Callable[[], VM], timeout: float | None = None) -> BatchResult:
+    started = time.perf_counter()
+    deadline = None if timeout is None else started + timeout
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            vm = load()
+            while vm.run(max_calls=SLICE) == Status.SUSPENDED:
+                if deadline is not None and time.perf_counter() > deadline:
+                    return BatchResult(
+                        name=name,
+                        outcome=Outcome.TIMEOUT,
+                        output=output.getvalue(),
+                        elapsed=time.perf_counter() - started,
+                    )
+    except Exception as e:
+        return BatchResult(
+            name=name,
+            outcome=Outcome.ERROR,
+            output=output.getvalue(),
+            error=f"{type(e).__name__}: {e}",
+            elapsed=time.perf_counter() - started,
+        )
+    result = vm.last_popped_stack_elem()
+    return BatchResult(
+        name=name,
+        outcome=Outcome.OK,
+        value=None if result is None else result.inspect(),
+        output=output.getvalue(),
+        elapsed=time.perf_counter() - started,
+    )
+
+
+def warm_up() -> None:
+    run_script(Script(name="warm-up", source=WARM_UP))
+    compiled.clear()
+
+
+def run_batch(
+    scripts: Iterable[Script],
+    workers: int | None = None,
+    timeout: float | None = None,
+    optimize: bool = False,
+) -> Iterator[BatchResult]:
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up) as executor:
+        futures = [executor.submit(run_script, script, timeout, optimize) for script in scripts]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.batch")
+    parser.add_argument("files", nargs="+", help="Monkey source files to run")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, help="per-script timeout in seconds")
+    parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    scripts = [Script(name=file, source=Path(file).read_text()) for file in args.files]
+    failed = 0
+    for result in run_batch(scripts, args.workers, args.timeout, args.optimize):
+        failed += result.outcome != Outcome.OK
+        print(json.dumps(asdict(result)), flush=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
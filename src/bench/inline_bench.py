@@ -0,0 +1,46 @@
+import time
+
+from src.compiler import Compiler
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.vm import VM
+
+REPEAT = 5
+
+
+def main() -> None:
+    input = """
+        let add = fn(a, b) { a + b };
+        let square = fn(x) { x * x };
+        let sum = fn(n, acc) {
+                      if (n == 0) {
+                          acc
+                      } else {
+                          sum(n - 1, add(acc, square(n)))
+                      }
+                  };
+        let run = fn(i) { if (i == 0) { 0 } else { sum(300, 0) + run(i - 1) } };
+        run(60);
+        """
+    lexer = Lexer(input)
+    parser = Parser(lexer=lexer)
+    program = parser.parse_program()
+
+    for optimize in (False, True):
+        compiler = Compiler(optimize=optimize)
+        compiler.compile(program)
+        timings = []
+        for _ in range(REPEAT):
+            vm = VM.from_compiler(compiler=compiler)
+            t1_start = time.perf_counter()
+            vm.run()
+            t1_stop = time.perf_counter()
+            timings.append(t1_stop - t1_start)
+
+        print(
+            f"Sum of squares in Monkey(VM, inlining {'on' if optimize else 'off'}): {vm.last_popped_stack_elem()}, best of {REPEAT} execution times in seconds: {min(timings)}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import time
+
+from src.compiler import Compiler
+from src.evaluator import eval
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.object import Environment
+from src.optimizer import memoize_pure_functions
+from src.vm import VM
+
+
+def main() -> None:
+    input = """
+        let fibonacci = fn(x) {
+                            if (x == 0) {
+                                return 0;
+                            } else {
+                                if (x == 1) {
+                                    return 1;
+                                } else {
+                                    return fibonacci(x - 1) + fibonacci(x - 2);
+                                }
+                            }
+                        };
+        fibonacci(20);
+        """
+    lexer = Lexer(input)
+    parser = Parser(lexer=lexer)
+    program = parser.parse_program()
+
+    for memoize in (False, True):
+        t1_start = time.perf_counter()
+        eval(memoize_pure_functions(program) if memoize else program, Environment())
+        t1_stop = time.perf_counter()
+        print(
+            f"Fibonacci(20) in Monkey(tree-walking interpreter, memoization {'on' if memoize else 'off'}): execution time in seconds: {t1_stop - t1_start}",
+        )
+
+    for memoize in (False, True):
+        compiler = Compiler(memoize=memoize)
+        compiler.compile(program)
+        vm = VM.from_compiler(compiler=compiler)
+        t1_start = time.perf_counter()
+        vm.run()
+        t1_stop = time.perf_counter()
+        print(
+            f"Fibonacci(20) in Monkey(VM, memoization {'on' if memoize else 'off'}): execution time in seconds: {t1_stop - t1_start}",
+        )
+
+
+if __name__ == "__main__":
+    main()
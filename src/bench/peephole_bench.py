@@ -0,0 +1,51 @@
+import time
+
+from src.compiler import Compiler
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.object import CompiledFunction
+from src.vm import VM
+
+REPEAT = 5
+
+
+def main() -> None:
+    input = """
+        let fibonacci = fn(x) {
+                            if (x == 0) {
+                                return 0;
+                            } else {
+                                if (x == 1) {
+                                    return 1;
+                                } else {
+                                    return fibonacci(x - 1) + fibonacci(x - 2);
+                                }
+                            }
+                        };
+        fibonacci(20);
+        """
+    lexer = Lexer(input)
+    parser = Parser(lexer=lexer)
+    program = parser.parse_program()
+
+    for optimize in (False, True):
+        compiler = Compiler(optimize=optimize)
+        compiler.compile(program)
+        size = sum(
+            len(c.instructions) for c in compiler.constants if isinstance(c, CompiledFunction)
+        )
+        timings = []
+        for _ in range(REPEAT):
+            vm = VM.from_compiler(compiler=compiler)
+            t1_start = time.perf_counter()
+            vm.run()
+            t1_stop = time.perf_counter()
+            timings.append(t1_stop - t1_start)
+
+        print(
+            f"Fibonacci(20) in Monkey(VM, peephole optimizer {'on' if optimize else 'off'}): {size} bytes of function bytecode, best of {REPEAT} execution times in seconds: {min(timings)}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import time
+
+from src.compiler import Compiler
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.prepared import PreparedProgram, from_native
+from src.vm import VM
+
+
+def main() -> None:
+    input = """
+        let score = fn(r) {
+            if (r["age"] > 30) { r["income"] / 10 } else { r["income"] / 20 }
+        };
+        score(record) + bonus;
+        """
+    lexer = Lexer(input)
+    parser = Parser(lexer=lexer)
+    program = parser.parse_program()
+    records = [{"record": {"age": i % 60, "income": i * 100}, "bonus": i % 3} for i in range(5000)]
+
+    t1_start = time.perf_counter()
+    for record in records:
+        compiler = Compiler()
+        symbols = {name: compiler.symbol_table.define(name) for name in record}
+        compiler.compile(program)
+        vm = VM.from_compiler(compiler=compiler)
+        for name, symbol in symbols.items():
+            vm.globals[symbol.index] = from_native(record[name])
+        vm.run()
+    t1_stop = time.perf_counter()
+    print(
+        f"5000 records in Monkey(VM, compiled per record): execution time in seconds: {t1_stop - t1_start}",
+    )
+
+    t1_start = time.perf_counter()
+    PreparedProgram.from_program(program, ["record", "bonus"]).run_records(records)
+    t1_stop = time.perf_counter()
+    print(
+        f"5000 records in Monkey(VM, compiled once): execution time in seconds: {t1_stop - t1_start}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import time
+
+from src.compiler import Compiler
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.register_compiler import RegisterCompiler
+from src.register_vm import RegisterVM
+from src.vm import VM
+
+
+def main() -> None:
+    input = """
+        let fibonacci = fn(x) {
+                            if (x == 0) {
+                                return 0;
+                            } else {
+                                if (x == 1) {
+                                    return 1;
+                                } else {
+                                    return fibonacci(x - 1) + fibonacci(x - 2);
+                                }
+                            }
+                        };
+        fibonacci(25);
+        """
+    lexer = Lexer(input)
+    parser = Parser(lexer=lexer)
+    program = parser.parse_program()
+
+    compiler = Compiler()
+    compiler.compile(program)
+    vm = VM.from_compiler(compiler=compiler)
+    t1_start = time.perf_counter()
+    vm.run()
+    t1_stop = time.perf_counter()
+
+    register_compiler = RegisterCompiler()
+    register_compiler.compile(program)
+    register_vm = RegisterVM.from_compiler(register_compiler)
+    t2_start = time.perf_counter()
+    register_vm.run()
+    t2_stop = time.perf_counter()
+
+    print(
+        f"Fibonacci(25) in Monkey(stack VM, host language Python): execution time in seconds: {t1_stop - t1_start}",
+    )
+    print(
+        f"Fibonacci(25) in Monkey(register VM, host language Python): execution time in seconds: {t2_stop - t2_start}",
+    )
+
+
+if __name__ == "__main__":
+    main()
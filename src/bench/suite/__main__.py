@@ -0,0 +1,88 @@
+import argparse
+import json
+import platform
+from dataclasses import asdict
+
+from src.bench.suite.runner import ENGINES, BenchmarkResult, compare, run_workload
+from src.bench.suite.workloads import WORKLOADS
+
+
+def print_result(result: BenchmarkResult) -> None:
+    if result.statistics is None:
+        print(f"{result.workload:<12} {result.engine:<14} {result.status}: {result.message}")
+        return
+    stats = result.statistics
+    print(
+        f"{result.workload:<12} {result.engine:<14} "
+        f"median {stats.median:.4f}s  min {stats.min:.4f}s  mean {stats.mean:.4f}s  stdev {stats.stdev:.4f}s"
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    results = []
+    for workload in WORKLOADS:
+        if args.workload and workload.name not in args.workload:
+            continue
+        for engine in args.engine or ENGINES:
+            result = run_workload(workload, engine, args.warmups, args.repeats)
+            print_result(result)
+            results.append(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "warmups": args.warmups,
+                    "repeats": args.repeats,
+                    "results": [asdict(r) for r in results],
+                },
+                f,
+                indent=2,
+            )
+
+
+def compare_files(args: argparse.Namespace) -> None:
+    with open(args.old) as f:
+        old = json.load(f)["results"]
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+    for comparison in compare(old, new):
+        change = comparison.change()
+        if change is None:
+            print(f"{comparison.workload:<12} {comparison.engine:<14} n/a")
+            continue
+        verdict = ""
+        if change <= -args.threshold:
+            verdict = "faster"
+        elif change >= args.threshold:
+            verdict = "slower"
+        print(
+            f"{comparison.workload:<12} {comparison.engine:<14} "
+            f"{comparison.old:.4f}s -> {comparison.new:.4f}s  {change:+.1%} {verdict}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.bench.suite")
+    commands = parser.add_subparsers(required=True)
+
+    run_parser = commands.add_parser("run", help="run the workloads")
+    run_parser.add_argument("--workload", action="append", choices=[w.name for w in WORKLOADS])
+    run_parser.add_argument("--engine", action="append", choices=list(ENGINES))
+    run_parser.add_argument("--warmups", type=int, default=1)
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--output", help="write the results to a JSON file")
+    run_parser.set_defaults(command=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.05)
+    compare_parser.set_defaults(command=compare_files)
+
+    args = parser.parse_args()
+    args.command(args)
+
+
+if __name__ == "__main__":
+    main()
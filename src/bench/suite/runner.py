@@ -0,0 +1,141 @@
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from src import stack_evaluator
+from src.bench.suite.workloads import Workload
+from src.compiler import CompilationError, Compiler
+from src.evaluator import eval
+from src.lexer import Lexer
+from src.libast import Program
+from src.libparser import Parser
+from src.object import Environment, Object
+from src.vm import VM
+
+Run = Callable[[], Object | None]
+
+RECURSION_LIMIT = 10_000
+
+
+class UnsupportedWorkload(Exception):
+    pass
+
+
+def prepare_eval(program: Program) -> Run:
+    def run() -> Object | None:
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+        try:
+            return eval(program, Environment())
+        finally:
+            sys.setrecursionlimit(limit)
+
+    return run
+
+
+def prepare_stack_eval(program: Program) -> Run:
+    return lambda: stack_evaluator.eval(program, Environment())
+
+
+def prepare_vm(program: Program, optimize: bool = False) -> Run:
+    compiler = Compiler(optimize=optimize)
+    try:
+        compiler.compile(program)
+    except CompilationError as e:
+        raise UnsupportedWorkload(str(e)) from e
+
+    def run() -> Object | None:
+        vm = VM.from_compiler(compiler=compiler)
+        vm.run()
+        return vm.last_popped_stack_elem()
+
+    return run
+
+
+ENGINES: dict[str, Callable[[Program], Run]] = {
+    "eval": prepare_eval,
+    "eval-stack": prepare_stack_eval,
+    "vm": prepare_vm,
+    "vm-optimized": lambda program: prepare_vm(program, optimize=True),
+}
+
+
+@dataclass(frozen=True)
+class Statistics:
+    min: float
+    max: float
+    mean: float
+    median: float
+    stdev: float
+
+    @classmethod
+    def from_timings(cls, timings: list[float]) -> Self:
+        return cls(
+            min=min(timings),
+            max=max(timings),
+            mean=statistics.mean(timings),
+            median=statistics.median(timings),
+            stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        )
+
+
+@dataclass
+class BenchmarkResult:
+    workload: str
+    engine: str
+    status: str
+    message: str = ""
+    timings: list[float] = field(default_factory=list)
+    statistics: Statistics | None = None
+
+
+def run_workload(workload: Workload, engine: str, warmups: int, repeats: int) -> BenchmarkResult:
+    program = Parser(lexer=Lexer(workload.source)).parse_program()
+    try:
+        run = ENGINES[engine](program)
+    except UnsupportedWorkload as e:
+        return BenchmarkResult(workload.name, engine, "unsupported", message=str(e))
+    for _ in range(warmups):
+        run()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+        actual = "null" if result is None else result.inspect()
+        if actual != workload.expected:
+            message = f"expected {workload.expected}, got {actual}"
+            return BenchmarkResult(workload.name, engine, "failed", message=message)
+    return BenchmarkResult(
+        workload.name, engine, "ok", timings=timings, statistics=Statistics.from_timings(timings)
+    )
+
+
+@dataclass(frozen=True)
+class Comparison:
+    workload: str
+    engine: str
+    old: float | None
+    new: float | None
+
+    def change(self) -> float | None:
+        if self.old is None or self.new is None:
+            return None
+        return (self.new - self.old) / self.old
+
+
+def median(result: dict[str, Any]) -> float | None:
+    stats = result.get("statistics")
+    return None if stats is None else stats["median"]
+
+
+def compare(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[Comparison]:
+    before = {(r["workload"], r["engine"]): median(r) for r in old}
+    after = {(r["workload"], r["engine"]): median(r) for r in new}
+    return [
+        Comparison(workload, engine, before.get((workload, engine)), after.get((workload, engine)))
+        for workload, engine in dict.fromkeys([*before, *after])
+    ]
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Workload:
+    name: str
+    source: str
+    expected: str
+
+
+WORKLOADS = [
+    Workload(
+        name="recursion",
+        source="""
+            let fibonacci = fn(x) {
+                if (x < 2) { x } else { fibonacci(x - 1) + fibonacci(x - 2) }
+            };
+            fibonacci(18);
+        """,
+        expected="2584",
+    ),
+    Workload(
+        name="closures",
+        source="""
+            let adder = fn(x) { fn(y) { x + y } };
+            let sum = fn(n) { if (n == 0) { 0 } else { adder(n)(sum(n - 1)) } };
+            let repeat = fn(k, acc) { if (k == 0) { acc } else { repeat(k - 1, acc + sum(100)) } };
+            repeat(20, 0);
+        """,
+        expected="101000",
+    ),
+    Workload(
+        name="arrays",
+        source="""
+            let build = fn(n, arr) { if (n == 0) { arr } else { build(n - 1, push(arr, n)) } };
+            let total = fn(arr, acc) {
+                if (len(arr) == 0) { acc } else { total(rest(arr), acc + first(arr)) }
+            };
+            let repeat = fn(k, acc) {
+                if (k == 0) { acc } else { repeat(k - 1, acc + total(build(150, []), 0)) }
+            };
+            repeat(4, 0);
+        """,
+        expected="45300",
+    ),
+    Workload(
+        name="hashes",
+        source="""
+            let h = {"a": 1, "b": 2, "c": 3, 1: 10, 2: 20, true: 5};
+            let lookup = fn(n, acc) {
+                if (n == 0) { acc } else { lookup(n - 1, acc + h["a"] + h["c"] + h[1] + h[true]) }
+            };
+            let repeat = fn(k, acc) { if (k == 0) { acc } else { repeat(k - 1, acc + lookup(150, 0)) } };
+            repeat(10, 0);
+        """,
+        expected="28500",
+    ),
+    Workload(
+        name="strings",
+        source="""
+            let concat = fn(s, n) { if (n == 0) { "" } else { s + concat(s, n - 1) } };
+            let repeat = fn(k, acc) {
+                if (k == 0) { acc } else { repeat(k - 1, acc + len(concat("monkey", 150))) }
+            };
+            repeat(10, 0);
+        """,
+        expected="9000",
+    ),
+    Workload(
+        name="nesting",
+        source="""
+            let f = fn(x) {
+                if (x > 0) {
+                    if (x > 1) {
+                        if (x > 2) { [[x, [x + 1]], {"k": [x]}][0][1][0] } else { 2 }
+                    } else { 1 }
+                } else { 0 }
+            };
+            let loop = fn(n, acc) { if (n == 0) { acc } else { loop(n - 1, acc + f(n)) } };
+            let repeat = fn(k, acc) { if (k == 0) { acc } else { repeat(k - 1, acc + loop(150, 0)) } };
+            repeat(5, 0);
+        """,
+        expected="57365",
+    ),
+]
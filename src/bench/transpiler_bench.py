@@ -0,0 +1,37 @@
+import time
+
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.transpiler import run
+
+
+def main() -> None:
+    input = """
+        let fibonacci = fn(x) {
+                            if (x == 0) {
+                                return 0;
+                            } else {
+                                if (x == 1) {
+                                    return 1;
+                                } else {
+                                    return fibonacci(x - 1) + fibonacci(x - 2);
+                                }
+                            }
+                        };
+        fibonacci(35);
+        """
+    lexer = Lexer(input)
+    parser = Parser(lexer=lexer)
+    program = parser.parse_program()
+
+    t1_start = time.perf_counter()
+    run(program)
+    t1_stop = time.perf_counter()
+
+    print(
+        f"Fibonacci(35) in Monkey(transpiled to Python, host language Python): execution time in seconds: {t1_stop - t1_start}",
+    )
+
+
+if __name__ == "__main__":
+    main()
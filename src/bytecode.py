@@ -1,3 +1,4 @@
+import bisect
 from collections.abc import Iterator
 from dataclasses import dataclass, field
 from enum import IntEnum, auto
@@ -9,6 +10,7 @@ Opcode: TypeAlias = int
 @dataclass
 class Instructions:
     inst: list[int] = field(default_factory=list)
+    lines: dict[int, int] = field(default_factory=dict, compare=False)
 
     def to_string(self) -> str:
         output: str = ""
@@ -34,13 +36,21 @@ class Instructions:
 
         return output
 
-    def add(self, instruction: list[int]) -> int:
+    def add(self, instruction: list[int], line: int = 0) -> int:
         position = len(self.inst)
         self.inst.extend(instruction)
+        if line:
+            self.lines[position] = line
         return position
 
     def remove(self, position: int) -> None:
         self.inst = self.inst[:position]
+        self.lines = {offset: line for offset, line in self.lines.items() if offset < position}
+
+    def line(self, offset: int) -> int:
+        offsets = list(self.lines)
+        index = bisect.bisect_right(offsets, offset)
+        return self.lines[offsets[index - 1]] if index else 0
 
     def replace(self, position: int, new_instructions: list[int]) -> None:
         self.inst[position : position + len(new_instructions)] = new_instructions
@@ -94,6 +104,15 @@ class OpCodes(IntEnum):
     OpReturn = auto()
     OpGetLocal = auto()
     OpSetLocal = auto()
+    OpAddInt = auto()
+    OpSubInt = auto()
+    OpMulInt = auto()
+    OpDivInt = auto()
+    OpEqualInt = auto()
+    OpNotEqualInt = auto()
+    OpGreaterThanInt = auto()
+    OpJumpTruthy = auto()
+    OpGetBuiltin = auto()
 
 
 @dataclass(frozen=True)
@@ -129,6 +148,29 @@ definitions: dict[Opcode, Definition] = {
     OpCodes.OpReturn: Definition("OpReturn", []),
     OpCodes.OpGetLocal: Definition("OpGetLocal", [1]),
     OpCodes.OpSetLocal: Definition("OpSetLocal", [1]),
+    OpCodes.OpAddInt: Definition("OpAddInt", []),
+    OpCodes.OpSubInt: Definition("OpSubInt", []),
+    OpCodes.OpMulInt: Definition("OpMulInt", []),
+    OpCodes.OpDivInt: Definition("OpDivInt", []),
+    OpCodes.OpEqualInt: Definition("OpEqualInt", []),
+    OpCodes.OpNotEqualInt: Definition("OpNotEqualInt", []),
+    OpCodes.OpGreaterThanInt: Definition("OpGreaterThanInt", []),
+    OpCodes.OpJumpTruthy: Definition("OpJumpTruthy", [2]),
+    OpCodes.OpGetBuiltin: Definition("OpGetBuiltin", [1]),
+}
+
+integer_specializations: dict[OpCodes, OpCodes] = {
+    OpCodes.OpAdd: OpCodes.OpAddInt,
+    OpCodes.OpSub: OpCodes.OpSubInt,
+    OpCodes.OpMul: OpCodes.OpMulInt,
+    OpCodes.OpDiv: OpCodes.OpDivInt,
+    OpCodes.OpEqual: OpCodes.OpEqualInt,
+    OpCodes.OpNotEqual: OpCodes.OpNotEqualInt,
+    OpCodes.OpGreaterThan: OpCodes.OpGreaterThanInt,
+}
+
+generic_opcodes: dict[Opcode, OpCodes] = {
+    specialized: generic for generic, specialized in integer_specializations.items()
 }
 
 
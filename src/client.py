@@ -0,0 +1,47 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Any
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "monkey.sock")
+
+
+def request(path: str, payload: dict[str, Any]) -> dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            response: dict[str, Any] = json.loads(f.readline())
+    return response
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.client")
+    parser.add_argument("file", help="Monkey source file to run, or - for stdin")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--bytecode", action="store_true", help="file holds compiled bytecode")
+    parser.add_argument("--timeout", type=float)
+    args = parser.parse_args()
+
+    payload: dict[str, Any] = {"timeout": args.timeout}
+    if args.bytecode:
+        with open(args.file) as f:
+            payload["bytecode"] = json.load(f)
+    elif args.file == "-":
+        payload["source"] = sys.stdin.read()
+    else:
+        with open(args.file) as f:
+            payload["source"] = f.read()
+    response = request(args.socket, payload)
+    sys.stdout.write(response["output"])
+    if response["outcome"] != "OK":
+        print(response["error"] or response["outcome"], file=sys.stderr)
+        sys.exit(1)
+    print(response["value"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Self
 
+from src.analysis import defines_function, walk
 from src.bytecode import Instructions, OpCodes, make
 from src.libast import (
     ArrayLiteral,
@@ -22,8 +24,17 @@ from src.libast import (
     ReturnStatement,
     StringLiteral,
 )
+from src.libbuiltins import builtins
 from src.object import CompiledFunction, Integer, Object, String
-from src.symbol_table import SymbolScope, SymbolTable
+from src.optimizer import (
+    eliminate_dead_code,
+    inline_body,
+    is_inlinable,
+    memoize_pure_functions,
+)
+from src.peephole import peephole
+from src.symbol_table import Symbol, SymbolScope, SymbolTable
+from src.tokens import Token
 
 
 class CompilationError(Exception):
@@ -47,6 +58,7 @@ class CompilationScope:
     instructions: Instructions = field(default_factory=Instructions)
     last_instruction: EmittedInstruction = field(default_factory=EmittedInstruction)
     previous_instruction: EmittedInstruction = field(default_factory=EmittedInstruction)
+    inline_candidates: dict[Symbol, FunctionLiteral] = field(default_factory=dict)
 
     def emit(self, opcode: OpCodes, operands: list[int]) -> int:
         instruction = make(opcode, operands)
@@ -75,9 +87,17 @@ class Compiler:
     symbol_table: SymbolTable = field(default_factory=SymbolTable)
     scopes: list[CompilationScope] = field(default_factory=list)
     scope_index: int = 0
+    optimize: bool = False
+    memoize: bool = False
+    line: int = 0
+    bindings: Counter[str] = field(default_factory=Counter)
+    inlining: list[FunctionLiteral] = field(default_factory=list)
 
     def __post_init__(self) -> None:
         self.scopes.append(CompilationScope())
+        for i, name in enumerate(builtins):
+            if name not in self.symbol_table.store:
+                self.symbol_table.define_builtin(i, name)
 
     @classmethod
     def with_new_state(cls, s: SymbolTable, constants: list[Object]) -> Self:
@@ -86,9 +106,25 @@ class Compiler:
     def current_instructions(self) -> Instructions:
         return self.scopes[self.scope_index].instructions
 
-    def compile(self, node: Node) -> None:  # noqa: C901
+    def compile(self, node: Node) -> None:
+        line = self.line
+        token = getattr(node, "token", None)
+        if isinstance(token, Token) and token.line:
+            self.line = token.line
+        try:
+            self.compile_node(node)
+        finally:
+            self.line = line
+
+    def compile_node(self, node: Node) -> None:  # noqa: C901
         if isinstance(node, Program):
-            for statement in node.statements:
+            program = eliminate_dead_code(node) if self.optimize else node
+            if self.memoize:
+                program = memoize_pure_functions(program)
+            self.bindings = Counter(
+                s.name.value for s in walk(program) if isinstance(s, LetStatement)
+            )
+            for statement in program.statements:
                 self.compile(statement)
         if isinstance(node, InfixExpression):
             if node.operator == "<":
@@ -156,13 +192,20 @@ class Compiler:
             for statement in node.statements:
                 self.compile(statement)
         if isinstance(node, LetStatement) and node.value is not None:
-            self.compile(node.value)
-            symbol = self.symbol_table.define(node.name.value)
-            match symbol.scope:
-                case SymbolScope.GLOBAL:
-                    self.emit(OpCodes.OpSetGlobal, [symbol.index])
-                case SymbolScope.LOCAL:
-                    self.emit(OpCodes.OpSetLocal, [symbol.index])
+            if defines_function(node.value) and self.symbol_table.outer is None:
+                # define global functions up front so that their bodies can call them recursively
+                symbol = self.symbol_table.define(node.name.value)
+                self.compile(node.value)
+            else:
+                self.compile(node.value)
+                symbol = self.symbol_table.define(node.name.value)
+            self.emit_set(symbol)
+            if (
+                self.optimize
+                and isinstance(node.value, FunctionLiteral)
+                and is_inlinable(symbol.name, node.value, self.bindings)
+            ):
+                self.scopes[self.scope_index].inline_candidates[symbol] = node.value
         if isinstance(node, Identifier):
             maybe_symbol = self.symbol_table.resolve(node.value)
             if maybe_symbol is None:
@@ -170,8 +213,12 @@ class Compiler:
             match maybe_symbol.scope:
                 case SymbolScope.GLOBAL:
                     self.emit(OpCodes.OpGetGlobal, [maybe_symbol.index])
+                case SymbolScope.LOCAL if node.value not in self.symbol_table.store:
+                    raise CompilationError(f"Error: closures are not supported: {node.value}")
                 case SymbolScope.LOCAL:
                     self.emit(OpCodes.OpGetLocal, [maybe_symbol.index])
+                case SymbolScope.BUILTIN:
+                    self.emit(OpCodes.OpGetBuiltin, [maybe_symbol.index])
         if isinstance(node, StringLiteral):
             string = String(value=node.value)
             self.emit(OpCodes.OpConstant, [self.add_constant(string)])
@@ -204,21 +251,82 @@ class Compiler:
 
             num_of_locals = self.symbol_table.num_definitions
             instructions = self.leave_scope()
+            if self.optimize:
+                instructions = peephole(instructions)
             compiled_fn = CompiledFunction(
                 instructions=instructions,
                 num_of_locals=num_of_locals,
                 num_of_parameters=len(node.parameters),
+                name=node.name,
             )
             self.emit(opcode=OpCodes.OpConstant, operands=[self.add_constant(compiled_fn)])
         if isinstance(node, ReturnStatement) and node.return_value:
             self.compile(node.return_value)
             self.emit(OpCodes.OpReturnValue, [])
         if isinstance(node, CallExpression):
+            if self.optimize and self.compile_inlined_call(node):
+                return
             self.compile(node.function)
             for arg in node.arguments:
                 self.compile(arg)
             self.emit(OpCodes.OpCall, [len(node.arguments)])
 
+    def inline_candidate(self, node: CallExpression) -> tuple[Symbol, FunctionLiteral] | None:
+        if not isinstance(node.function, Identifier):
+            return None
+        symbol = self.symbol_table.resolve(node.function.value)
+        if symbol is None:
+            return None
+        scope = self.scopes[0] if symbol.scope == SymbolScope.GLOBAL else self.scopes[-1]
+        fn = scope.inline_candidates.get(symbol)
+        if fn is None or len(node.arguments) != len(fn.parameters):
+            return None
+        if any(f is fn for f in self.inlining):
+            return None
+        return symbol, fn
+
+    def compile_inlined_call(self, node: CallExpression) -> bool:
+        candidate = self.inline_candidate(node)
+        if candidate is None:
+            return False
+        symbol, fn = candidate
+        parameters, body, free = inline_body(symbol.name, fn)
+        for name in free:
+            free_symbol = self.symbol_table.resolve(name)
+            if free_symbol is None or free_symbol.scope not in (
+                SymbolScope.GLOBAL,
+                SymbolScope.BUILTIN,
+            ):
+                return False
+            if self.bindings[name] > 1:
+                return False
+
+        for argument in node.arguments:
+            self.compile(argument)
+        for parameter in reversed(parameters):
+            self.emit_set(
+                self.symbol_table.store.get(parameter) or self.symbol_table.define(parameter)
+            )
+        self.inlining.append(fn)
+        last = body.statements[-1] if body.statements else None
+        if isinstance(last, ExpressionStatement) and last.expression is not None:
+            for statement in body.statements[:-1]:
+                self.compile(statement)
+            self.compile(last.expression)
+        else:
+            for statement in body.statements:
+                self.compile(statement)
+            self.emit(OpCodes.OpNull, [])
+        self.inlining.pop()
+        return True
+
+    def emit_set(self, symbol: Symbol) -> None:
+        match symbol.scope:
+            case SymbolScope.GLOBAL:
+                self.emit(OpCodes.OpSetGlobal, [symbol.index])
+            case SymbolScope.LOCAL:
+                self.emit(OpCodes.OpSetLocal, [symbol.index])
+
     def bytecode(self) -> Bytecode:
         return Bytecode(
             instructions=self.current_instructions(),
@@ -244,7 +352,7 @@ class Compiler:
 
     def emit(self, opcode: OpCodes, operands: list[int]) -> int:
         instruction = make(opcode, operands)
-        pos = self.current_instructions().add(instruction)
+        pos = self.current_instructions().add(instruction, self.line)
         self.set_last_instruction(opcode, pos)
         return pos
 
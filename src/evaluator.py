@@ -1,6 +1,7 @@
 from collections.abc import Hashable
-from typing import cast
+from typing import NoReturn, cast
 
+from src.analysis import bindings, free_variables
 from src.libast import (
     ArrayLiteral,
     BlockStatement,
@@ -33,16 +34,38 @@ from src.object import (
     Hash,
     HashPair,
     Integer,
+    Memoized,
     Null,
     Object,
     ReturnValue,
     String,
+    memo_key,
 )
 
+SCOPE_CACHE_SIZE = 1024
+
 NULL = Null()
 TRUE = BooleanObject(value=True)
 FALSE = BooleanObject(value=False)
 
+scopes: dict[int, tuple[FunctionLiteral, frozenset[str], frozenset[str], frozenset[str]]] = {}
+
+
+class ErrorSignal(Exception):
+    def __init__(self, error: Error):
+        super().__init__(error.message)
+        self.error = error
+
+
+class ReturnSignal(Exception):
+    def __init__(self, value: Object):
+        super().__init__("return outside of a function")
+        self.value = value
+
+
+def fail(message: str) -> NoReturn:
+    raise ErrorSignal(Error(message=message))
+
 
 def to_native_bool(value: bool) -> BooleanObject:
     if value:
@@ -50,11 +73,22 @@ def to_native_bool(value: bool) -> BooleanObject:
     return FALSE
 
 
-def eval(node: Node | None, env: Environment) -> Object:  # noqa: C901
+def eval(node: Node | None, env: Environment) -> Object:
+    try:
+        return evaluate(node, env)
+    except ReturnSignal as signal:
+        if isinstance(node, Program):
+            return signal.value
+        return ReturnValue(value=signal.value)
+    except ErrorSignal as signal:
+        return signal.error
+
+
+def evaluate(node: Node | None, env: Environment) -> Object:  # noqa: C901
     if isinstance(node, Program):
         return eval_program(node, env)
     if isinstance(node, ExpressionStatement):
-        return eval(node.expression, env)
+        return evaluate(node.expression, env)
     if isinstance(node, IntegerLiteral):
         return Integer(value=node.value)
     if isinstance(node, Boolean):
@@ -62,64 +96,33 @@ def eval(node: Node | None, env: Environment) -> Object:  # noqa: C901
             return TRUE
         return FALSE
     if isinstance(node, PrefixExpression):
-        right = eval(node.right, env)
-        if is_error(right):
-            return right
-        return eval_prefix_expression(node.operator, right)
+        return eval_prefix_expression(node.operator, evaluate(node.right, env))
     if isinstance(node, InfixExpression):
-        left = eval(node.left, env)
-        right = eval(node.right, env)
-        if is_error(left):
-            return left
-        if is_error(right):
-            return right
-        return eval_infix_expression(node.operator, left, right)
+        left = evaluate(node.left, env)
+        return eval_infix_expression(node.operator, left, evaluate(node.right, env))
     if isinstance(node, BlockStatement):
         return eval_block_statement(node, env)
     if isinstance(node, IfExpression):
-        condition = eval(node.condition, env)
-        if is_error(condition):
-            return condition
         return eval_if_expression(node, env)
     if isinstance(node, ReturnStatement):
-        val = eval(node.return_value, env)
-        if is_error(val):
-            return val
-        return ReturnValue(value=val)
+        raise ReturnSignal(evaluate(node.return_value, env))
     if isinstance(node, LetStatement):
-        val = eval(node.value, env)
-        if is_error(val):
-            return val
-        env[node.name.value] = val
+        env[node.name.value] = evaluate(node.value, env)
+        return NULL
     if isinstance(node, Identifier):
         return eval_identifier(node, env)
     if isinstance(node, FunctionLiteral):
-        params = node.parameters
-        body = node.body
-        return Function(parameters=params, body=body, env=env)
+        return make_function(node, env)
     if isinstance(node, CallExpression):
-        func = eval(node.function, env)
-        if is_error(func):
-            return func
-        args = eval_expressions(node.arguments, env)
-        if len(args) == 1 and is_error(args[0]):
-            return args[0]
-        return apply_function(func, args)
+        func = evaluate(node.function, env)
+        return apply_function(func, eval_expressions(node.arguments, env))
     if isinstance(node, StringLiteral):
         return String(value=node.value)
     if isinstance(node, ArrayLiteral):
-        elements = eval_expressions(node.elements, env)
-        if len(elements) == 1 and is_error(elements[0]):
-            return elements[0]
-        return Array(elements=elements)
+        return Array(elements=eval_expressions(node.elements, env))
     if isinstance(node, IndexExpression):
-        left = eval(node.left, env)
-        if is_error(left):
-            return left
-        index = eval(node.index, env)
-        if is_error(index):
-            return index
-        return eval_index_expression(left, index)
+        left = evaluate(node.left, env)
+        return eval_index_expression(left, evaluate(node.index, env))
 
     if isinstance(node, HashLiteral):
         return eval_hash_literal(node, env)
@@ -130,34 +133,74 @@ def eval(node: Node | None, env: Environment) -> Object:  # noqa: C901
 def apply_function(func: Object, args: list[Object]) -> Object:
     if isinstance(func, Function):
         extented_env = extend_function_env(func, args)
-        evaluated = eval(func.body, extented_env)
-        return unwrap_return_value(evaluated)
+        try:
+            return evaluate(func.body, extented_env)
+        except ReturnSignal as signal:
+            return signal.value
+    if isinstance(func, Memoized):
+        key = memo_key(args)
+        if key is None:
+            return apply_function(func.fn, args)
+        result = func.lookup(key)
+        if result is None:
+            result = apply_function(func.fn, args)
+            func.store(key, result)
+        return result
     if isinstance(func, Builtin):
-        return func.fn(*args)
-    return Error(message=f"not a function or builtin: {func.type()}")
-
-
-def unwrap_return_value(obj: Object) -> Object:
-    if isinstance(obj, ReturnValue):
-        return obj.value
-    return obj
+        result = func.fn(*args)
+        if isinstance(result, Error):
+            raise ErrorSignal(result)
+        return result
+    fail(f"not a function or builtin: {func.type()}")
+
+
+def make_function(node: FunctionLiteral, env: Environment) -> Function:
+    scope = scopes.get(id(node))
+    if scope is None or scope[0] is not node:
+        if len(scopes) >= SCOPE_CACHE_SIZE:
+            del scopes[next(iter(scopes))]
+        counts = bindings(node)
+        final = frozenset(name for name, count in counts.items() if count == 1)
+        scope = scopes[id(node)] = (node, free_variables(node), frozenset(counts), final)
+    _, free, local_names, final_names = scope
+    return Function(
+        parameters=node.parameters,
+        body=node.body,
+        env=capture(env, free),
+        name=node.name,
+        local_names=local_names,
+        final_names=final_names,
+    )
+
+
+def capture(env: Environment, free: frozenset[str]) -> Environment:
+    if env.outer is None:
+        return env
+    outer = capture(env.outer, free)
+    if env.names is None:
+        return env if outer is env.outer else Environment(store=env.store, outer=outer)
+    captured = env.names & free
+    if not captured:
+        return outer
+    if captured == env.names and outer is env.outer:
+        return env
+    if captured <= env.final and all(name in env.store for name in captured):
+        store = {name: env.store[name] for name in captured}
+        return Environment(store=store, outer=outer, names=captured, final=captured)
+    if outer is env.outer:
+        return env
+    return Environment(store=env.store, outer=outer, names=env.names, final=env.final)
 
 
 def extend_function_env(func: Function, args: list[Object]) -> Environment:
-    env = Environment.create_enclosed_env(outer=func.env)
+    env = Environment(outer=func.env, names=func.local_names, final=func.final_names)
     for index, param in enumerate(func.parameters):
         env[param.value] = args[index]
     return env
 
 
 def eval_expressions(exprs: list[Expression], env: Environment) -> list[Object]:
-    result: list[Object] = []
-    for expr in exprs:
-        evaluated = eval(expr, env)
-        if is_error(evaluated):
-            return [evaluated]
-        result.append(evaluated)
-    return result
+    return [evaluate(expr, env) for expr in exprs]
 
 
 def eval_identifier(node: Identifier, env: Environment) -> Object:
@@ -168,24 +211,14 @@ def eval_identifier(node: Identifier, env: Environment) -> Object:
     if builtin is not None:
         return builtin
 
-    return Error(message=f"identifier not found: {node.value}")
-
-
-def is_error(obj: Object | None) -> bool:
-    if obj is not None:
-        return obj.type() == OBJECT_TYPE.ERROR_OBJ
-    return False
+    fail(f"identifier not found: {node.value}")
 
 
 def eval_program(program: Program, env: Environment) -> Object:
     result: Object = NULL
 
     for stmt in program.statements:
-        result = eval(stmt, env)
-        if isinstance(result, ReturnValue):
-            return result.value
-        if isinstance(result, Error):
-            return result
+        result = evaluate(stmt, env)
 
     return result
 
@@ -194,11 +227,7 @@ def eval_block_statement(block: BlockStatement, env: Environment) -> Object:
     result: Object = NULL
 
     for stmt in block.statements:
-        result = eval(stmt, env)
-        if result != NULL:
-            rt = result.type()
-            if rt == OBJECT_TYPE.RETURN_VALUE_OBJ or rt == OBJECT_TYPE.ERROR_OBJ:
-                return result
+        result = evaluate(stmt, env)
 
     return result
 
@@ -210,7 +239,7 @@ def eval_prefix_expression(operator: str, right: Object) -> Object:
         case "-":
             return eval_minus_prefix_operator_expression(right)
         case _:
-            return Error(message=f"unknown operator: {operator}{right.type()}")
+            fail(f"unknown operator: {operator}{right.type()}")
 
 
 def eval_bang_operator_expression(right: Object) -> Object:
@@ -225,7 +254,7 @@ def eval_bang_operator_expression(right: Object) -> Object:
 
 def eval_minus_prefix_operator_expression(right: Object) -> Object:
     if right.type() != OBJECT_TYPE.INTEGER:
-        return Error(message=f"unknown operator: -{right.type()}")
+        fail(f"unknown operator: -{right.type()}")
     if not isinstance(right, Integer):
         return NULL
 
@@ -245,8 +274,8 @@ def eval_infix_expression(operator: str, left: Object, right: Object) -> Object:
             if isinstance(left, String) and isinstance(right, String):
                 return eval_string_infix_expression(operator, left, right)
             if left.type() != right.type():
-                return Error(message=f"type mismatch: {left.type()} {operator} {right.type()}")
-            return Error(message=f"unknown operator: {left.type()} {operator} {right.type()}")
+                fail(f"type mismatch: {left.type()} {operator} {right.type()}")
+            fail(f"unknown operator: {left.type()} {operator} {right.type()}")
 
 
 def eval_string_infix_expression(operator: str, left: String, right: String) -> Object:
@@ -257,7 +286,7 @@ def eval_string_infix_expression(operator: str, left: String, right: String) ->
         case "+":
             return String(value=left_val + right_val)
         case _:
-            return Error(message=f"unknown operator: {left.type()} {operator} {right.type()}")
+            fail(f"unknown operator: {left.type()} {operator} {right.type()}")
 
 
 def eval_integer_infix_expression(operator: str, left: Integer, right: Integer) -> Object:
@@ -282,15 +311,15 @@ def eval_integer_infix_expression(operator: str, left: Integer, right: Integer)
         case "!=":
             return to_native_bool(value=left_val != right_val)
         case _:
-            return Error(message=f"unknown operator: {left.type()} {operator} {right.type()}")
+            fail(f"unknown operator: {left.type()} {operator} {right.type()}")
 
 
 def eval_if_expression(expr: IfExpression, env: Environment) -> Object:
-    condition = eval(expr.condition, env)
+    condition = evaluate(expr.condition, env)
     if is_truthy(condition):
-        return eval(expr.consequence, env)
+        return evaluate(expr.consequence, env)
     if expr.alternative is not None:
-        return eval(expr.alternative, env)
+        return evaluate(expr.alternative, env)
     return NULL
 
 
@@ -309,12 +338,12 @@ def eval_index_expression(left: Object, index: Object) -> Object:
         return eval_array_index_expression(cast(Array, left), cast(Integer, index))
     if left.type() == OBJECT_TYPE.HASH_OBJ:
         return eval_hash_index_expression(cast(Hash, left), index)
-    return Error(message=f"index operator not supported: {left.type()}[{index.type()}]")
+    fail(f"index operator not supported: {left.type()}[{index.type()}]")
 
 
 def eval_hash_index_expression(hash: Hash, index: Object) -> Object:
     if not isinstance(index, Hashable):
-        return Error(message=f"unusable as hash key: {index.type()}")
+        fail(f"unusable as hash key: {index.type()}")
     try:
         pair = hash.pairs[index]
     except KeyError:
@@ -332,13 +361,9 @@ def eval_array_index_expression(array: Array, index: Integer) -> Object:
 def eval_hash_literal(node: HashLiteral, env: Environment) -> Object:
     pairs: dict[Hashable, HashPair] = {}
     for key_node, value_node in node.pairs.items():
-        key = eval(key_node, env)
-        if is_error(key):
-            return key
+        key = evaluate(key_node, env)
         if not isinstance(key, Hashable):
-            return Error(message=f"unusable as hash key: {key.type()}")
-        value = eval(value_node, env)
-        if is_error(value):
-            return value
+            fail(f"unusable as hash key: {key.type()}")
+        value = evaluate(value_node, env)
         pairs[key] = HashPair(key=key, value=value)
     return Hash(pairs=pairs)
@@ -0,0 +1,100 @@
+import argparse
+import gc
+import json
+import os
+import signal
+import socketserver
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Self
+
+from src.batch import BatchResult, Outcome, ParseError, execute, warm_up
+from src.client import DEFAULT_SOCKET
+from src.compiler import Compiler
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.object import Object
+from src.server import bind_private
+from src.snapshot import Snapshot
+from src.symbol_table import SymbolTable
+from src.vm import VM, Globals
+
+
+@dataclass
+class Prelude:
+    symbol_table: SymbolTable = field(default_factory=SymbolTable)
+    constants: list[Object] = field(default_factory=list)
+    globals: Globals = field(default_factory=Globals)
+
+    def compile(self, source: str) -> VM:
+        parser = Parser(lexer=Lexer(source))
+        program = parser.parse_program()
+        if parser.errors:
+            raise ParseError("; ".join(parser.errors))
+        compiler = Compiler.with_new_state(self.symbol_table, self.constants)
+        compiler.compile(program)
+        return VM.with_new_state(compiler, self.globals)
+
+    @classmethod
+    def load(cls, source: str) -> Self:
+        prelude = cls()
+        prelude.compile(source).run()
+        return prelude
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> Self:
+        vm = snapshot.restore()
+        return cls(
+            symbol_table=snapshot.symbol_table, constants=snapshot.constants, globals=vm.globals
+        )
+
+
+class ForkServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, path: str, prelude: Prelude) -> None:
+        super().__init__(path, PreludeHandler)
+        self.prelude = prelude
+
+
+class PreludeHandler(socketserver.StreamRequestHandler):
+    server: ForkServer
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            source, timeout = request["source"], request.get("timeout")
+        except (ValueError, TypeError, KeyError) as e:
+            result = BatchResult(name="request", outcome=Outcome.ERROR, error=f"bad request: {e}")
+        else:
+            result = execute("source", lambda: self.server.prelude.compile(source), timeout)
+        self.wfile.write(json.dumps(asdict(result)).encode() + b"\n")
+
+
+def make_server(path: str, prelude: Prelude) -> ForkServer:
+    server = bind_private(path, lambda p: ForkServer(p, prelude))
+    warm_up()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.forkserver")
+    parser.add_argument("prelude", help="Monkey source file compiled and run once at startup")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--snapshot", action="store_true", help="prelude is a saved snapshot")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        prelude = Prelude.from_snapshot(Snapshot.load(args.prelude))
+    else:
+        with open(args.prelude) as f:
+            prelude = Prelude.load(f.read())
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with make_server(args.socket, prelude) as server:
+        gc.freeze()
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
+from collections.abc import Hashable
 from dataclasses import dataclass
 
 from src.bytecode import Instructions
-from src.object import CompiledFunction
+from src.object import CompiledFunction, Memoized
 
 
 @dataclass
@@ -9,6 +10,7 @@ class Frame:
     fn: CompiledFunction
     base_pointer: int
     ip: int = -1
+    memoized: tuple[Memoized, Hashable] | None = None
 
     def instructions(self) -> Instructions:
         return self.fn.instructions
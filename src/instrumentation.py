@@ -0,0 +1,116 @@
+import argparse
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.bytecode import OpCodes
+from src.compiler import Compiler
+from src.frame import Frame
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.vm import VM, Status
+
+
+@dataclass
+class Instrumentation:
+    counts: Counter[OpCodes] = field(default_factory=Counter)
+    times: defaultdict[OpCodes, float] = field(default_factory=lambda: defaultdict(float))
+    histograms: defaultdict[OpCodes, Counter[int]] = field(
+        default_factory=lambda: defaultdict(Counter)
+    )
+    bigrams: Counter[tuple[OpCodes, OpCodes]] = field(default_factory=Counter)
+    previous: OpCodes | None = None
+    started: int = 0
+
+    def record(self, opcode: OpCodes, _frame: Frame) -> None:
+        now = time.perf_counter_ns()
+        if self.previous is not None:
+            self.charge(self.previous, now - self.started)
+            self.bigrams[(self.previous, opcode)] += 1
+        self.counts[opcode] += 1
+        self.previous = opcode
+        self.started = time.perf_counter_ns()
+
+    def charge(self, opcode: OpCodes, elapsed: int) -> None:
+        self.times[opcode] += elapsed / 1e9
+        self.histograms[opcode][elapsed.bit_length()] += 1
+
+    def stop(self) -> None:
+        if self.previous is not None:
+            self.charge(self.previous, time.perf_counter_ns() - self.started)
+        self.previous = None
+
+    def report(self, top: int = 10) -> str:
+        total = sum(self.times.values()) or 1.0
+        lines = [f"{'opcode':<20} {'count':>10} {'total ms':>10} {'mean ns':>10} {'time':>7}"]
+        for opcode, elapsed in sorted(self.times.items(), key=lambda item: -item[1]):
+            count = self.counts[opcode]
+            lines.append(
+                f"{opcode.name:<20} {count:>10} {elapsed * 1e3:>10.2f} "
+                f"{elapsed / count * 1e9:>10.0f} {elapsed / total:>7.1%}"
+            )
+        lines.append("")
+        lines.append(f"{'bigram':<41} {'count':>10}")
+        for (first, second), count in self.bigrams.most_common(top):
+            lines.append(f"{first.name + ' ' + second.name:<41} {count:>10}")
+        return "\n".join(lines)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "opcodes": {
+                opcode.name: {
+                    "count": self.counts[opcode],
+                    "time": self.times[opcode],
+                    "histogram": {
+                        f"<{2 ** bucket}ns": n
+                        for bucket, n in sorted(self.histograms[opcode].items())
+                    },
+                }
+                for opcode in self.counts
+            },
+            "bigrams": [
+                {"first": first.name, "second": second.name, "count": count}
+                for (first, second), count in self.bigrams.most_common()
+            ],
+        }
+
+
+@dataclass
+class InstrumentedVM(VM):
+    instrumentation: Instrumentation = field(default_factory=Instrumentation)
+
+    execute_until = VM.execute_until_traced
+
+    def __post_init__(self) -> None:
+        self.tracer = self.instrumentation.record
+
+    def run(self, max_calls: int | None = None) -> Status:
+        try:
+            return super().run(max_calls)
+        finally:
+            self.instrumentation.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.instrumentation")
+    parser.add_argument("file", help="Monkey source file to run")
+    parser.add_argument("--json", help="write the counts and timings to a JSON file")
+    parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        program = Parser(lexer=Lexer(f.read())).parse_program()
+    compiler = Compiler(optimize=args.optimize)
+    compiler.compile(program)
+    vm = InstrumentedVM.from_compiler(compiler=compiler)
+    vm.run()
+    print(vm.instrumentation.report())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(vm.instrumentation.to_json(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+from src.bytecode import OpCodes, generic_opcodes, lookup, read_operands
+from src.object import Array, Boolean, CompiledFunction, Hash, HashPair, Integer, Object
+
+if TYPE_CHECKING:
+    from src.vm import VM
+
+JIT_THRESHOLD = 100
+MAX_JIT_DEPTH = 100
+MAX_DEOPTIMIZATIONS = 16
+
+JitFunction = Callable[..., Object]
+
+ARITHMETIC_OPERATORS = {
+    OpCodes.OpAdd: "+",
+    OpCodes.OpSub: "-",
+    OpCodes.OpMul: "*",
+    OpCodes.OpDiv: "//",
+}
+
+
+class Deoptimization(Exception):
+    def __init__(self, ip: int, locals: tuple[Object | None, ...], stack: tuple[Object, ...]):
+        super().__init__(f"deoptimized at ip {ip}")
+        self.ip = ip
+        self.locals = locals
+        self.stack = stack
+
+
+class JitBailout(Exception):
+    pass
+
+
+class Kind(StrEnum):
+    INT = "INT"
+    BOOL = "BOOL"
+    OBJ = "OBJ"
+
+
+@dataclass(frozen=True)
+class Value:
+    expr: str
+    kind: Kind
+
+    def boxed(self) -> str:
+        match self.kind:
+            case Kind.INT:
+                return f"Integer(value={self.expr})"
+            case Kind.BOOL:
+                return f"(TRUE if {self.expr} else FALSE)"
+            case _:
+                return self.expr
+
+
+@dataclass(frozen=True)
+class Decoded:
+    offset: int
+    opcode: OpCodes
+    operands: list[int]
+    next_offset: int
+
+
+def decode(inst: list[int]) -> dict[int, Decoded]:
+    decoded: dict[int, Decoded] = {}
+    offset = 0
+    while offset < len(inst):
+        definition = lookup(inst[offset])
+        if definition is None:
+            raise JitBailout(f"unknown opcode {inst[offset]}")
+        operand_data = read_operands(definition, inst[offset + 1 :])
+        next_offset = offset + 1 + operand_data.offset
+        decoded[offset] = Decoded(offset, OpCodes(inst[offset]), operand_data.operands, next_offset)
+        offset = next_offset
+    return decoded
+
+
+def build_hash(*items: Object) -> Hash:
+    pairs: dict[Hashable, HashPair] = {}
+    for key, value in zip(items[::2], items[1::2], strict=True):
+        if not isinstance(key, Hashable):
+            raise TypeError(f"unsupported hash key: {key}")
+        pairs[key] = HashPair(key=key, value=value)
+    return Hash(pairs=pairs)
+
+
+@dataclass
+class FunctionTranslator:
+    fn: CompiledFunction
+    constants: list[Object]
+    name: str
+    lines: list[str] = field(default_factory=list)
+    indent: int = 1
+    num_temps: int = 0
+    constant_names: dict[str, Object] = field(default_factory=dict)
+    code: dict[int, Decoded] = field(default_factory=dict)
+    guarded: set[str] = field(default_factory=set)
+
+    def translate(self) -> str:
+        self.code = decode(self.fn.instructions.inst)
+        params = [f"l{i}" for i in range(self.fn.num_of_parameters)]
+        for i in range(self.fn.num_of_parameters, self.fn.num_of_locals):
+            self.emit(f"l{i} = None")
+        if self.translate_region(0, len(self.fn.instructions), []) is not None:
+            raise JitBailout("function does not end with a return")
+        return "\n".join([f"def {self.name}({', '.join(params)}):", *self.lines]) + "\n"
+
+    def emit(self, line: str) -> None:
+        self.lines.append("    " * self.indent + line)
+
+    def new_temp(self, expr: str, kind: Kind) -> Value:
+        self.num_temps += 1
+        name = f"t{self.num_temps}"
+        self.emit(f"{name} = {expr}")
+        return Value(name, kind)
+
+    def deoptimize(self, ip: int, stack: list[Value]) -> str:
+        locals = "".join(f"l{i}, " for i in range(self.fn.num_of_locals))
+        values = "".join(f"{v.boxed()}, " for v in stack)
+        return f"raise Deoptimization({ip}, ({locals}), ({values}))"
+
+    def unbox(self, ip: int, value: Value, stack: list[Value]) -> str:
+        if value.kind == Kind.INT:
+            return value.expr
+        if value.kind == Kind.BOOL:
+            self.emit(self.deoptimize(ip, stack))
+            return value.expr
+        if value.expr not in self.guarded:
+            self.emit(f"if type({value.expr}) is not Integer:")
+            self.indent += 1
+            self.emit(self.deoptimize(ip, stack))
+            self.indent -= 1
+            self.guarded.add(value.expr)
+        return f"{value.expr}.value"
+
+    def truthy(self, value: Value) -> str:
+        match value.kind:
+            case Kind.BOOL:
+                return value.expr
+            case Kind.INT:
+                return "True"
+            case _:
+                return f"({value.expr}.value if type({value.expr}) is Boolean else {value.expr} is not NULL)"
+
+    def constant(self, index: int) -> Value:
+        obj = self.constants[index]
+        if isinstance(obj, Integer):
+            return Value(str(obj.value), Kind.INT)
+        name = f"c{index}"
+        self.constant_names[name] = obj
+        return Value(name, Kind.OBJ)
+
+    def translate_region(  # noqa: C901
+        self, start: int, end: int, stack: list[Value]
+    ) -> list[Value] | None:
+        offset = start
+        while offset < end:
+            ins = self.code[offset]
+            ip = ins.offset
+            match ins.opcode:
+                case OpCodes.OpConstant:
+                    stack.append(self.constant(ins.operands[0]))
+                case OpCodes.OpTrue:
+                    stack.append(Value("True", Kind.BOOL))
+                case OpCodes.OpFalse:
+                    stack.append(Value("False", Kind.BOOL))
+                case OpCodes.OpNull:
+                    stack.append(Value("NULL", Kind.OBJ))
+                case OpCodes.OpPop:
+                    stack.pop()
+                case (
+                    OpCodes.OpAdd
+                    | OpCodes.OpSub
+                    | OpCodes.OpMul
+                    | OpCodes.OpDiv
+                    | OpCodes.OpAddInt
+                    | OpCodes.OpSubInt
+                    | OpCodes.OpMulInt
+                    | OpCodes.OpDivInt
+                ):
+                    right = self.unbox(ip, stack[-1], stack)
+                    left = self.unbox(ip, stack[-2], stack)
+                    operator = ARITHMETIC_OPERATORS[generic_opcodes.get(ins.opcode, ins.opcode)]
+                    del stack[-2:]
+                    stack.append(self.new_temp(f"{left} {operator} {right}", Kind.INT))
+                case (
+                    OpCodes.OpEqual
+                    | OpCodes.OpNotEqual
+                    | OpCodes.OpEqualInt
+                    | OpCodes.OpNotEqualInt
+                ):
+                    left_value, right_value = stack[-2], stack[-1]
+                    is_equal = ins.opcode in (OpCodes.OpEqual, OpCodes.OpEqualInt)
+                    operator = "==" if is_equal else "!="
+                    kinds = {left_value.kind, right_value.kind}
+                    if kinds == {Kind.INT, Kind.OBJ}:
+                        right = self.unbox(ip, right_value, stack)
+                        left = self.unbox(ip, left_value, stack)
+                    elif len(kinds) == 1 and Kind.OBJ not in kinds:
+                        left, right = left_value.expr, right_value.expr
+                    else:
+                        left, right = left_value.boxed(), right_value.boxed()
+                    del stack[-2:]
+                    stack.append(self.new_temp(f"{left} {operator} {right}", Kind.BOOL))
+                case OpCodes.OpGreaterThan | OpCodes.OpGreaterThanInt:
+                    right = self.unbox(ip, stack[-1], stack)
+                    left = self.unbox(ip, stack[-2], stack)
+                    del stack[-2:]
+                    stack.append(self.new_temp(f"{left} > {right}", Kind.BOOL))
+                case OpCodes.OpMinus:
+                    operand = self.unbox(ip, stack[-1], stack)
+                    stack[-1] = self.new_temp(f"-{operand}", Kind.INT)
+                case OpCodes.OpBang:
+                    operand_value = stack.pop()
+                    match operand_value.kind:
+                        case Kind.BOOL:
+                            stack.append(self.new_temp(f"not {operand_value.expr}", Kind.BOOL))
+                        case Kind.INT:
+                            stack.append(Value("False", Kind.BOOL))
+                        case _:
+                            expr = f"{operand_value.expr} in FALSY"
+                            stack.append(self.new_temp(expr, Kind.BOOL))
+                case OpCodes.OpGetLocal:
+                    stack.append(Value(f"l{ins.operands[0]}", Kind.OBJ))
+                case OpCodes.OpSetLocal:
+                    local = f"l{ins.operands[0]}"
+                    value = stack.pop()
+                    for i, pending in enumerate(stack):
+                        if pending.expr == local:
+                            stack[i] = self.new_temp(local, Kind.OBJ)
+                    self.emit(f"{local} = {value.boxed()}")
+                    self.guarded.discard(local)
+                case OpCodes.OpGetGlobal:
+                    temp = self.new_temp(f"G[{ins.operands[0]}]", Kind.OBJ)
+                    self.emit(f"if {temp.expr} is None:")
+                    self.indent += 1
+                    self.emit(self.deoptimize(ip, stack))
+                    self.indent -= 1
+                    stack.append(temp)
+                case OpCodes.OpGetBuiltin:
+                    stack.append(Value(f"B[{ins.operands[0]}]", Kind.OBJ))
+                case OpCodes.OpArray:
+                    count = ins.operands[0]
+                    elements = [v.boxed() for v in stack[len(stack) - count :]]
+                    del stack[len(stack) - count :]
+                    stack.append(
+                        self.new_temp(f"Array(elements=[{', '.join(elements)}])", Kind.OBJ)
+                    )
+                case OpCodes.OpHash:
+                    count = ins.operands[0]
+                    items = [v.boxed() for v in stack[len(stack) - count :]]
+                    del stack[len(stack) - count :]
+                    stack.append(self.new_temp(f"build_hash({', '.join(items)})", Kind.OBJ))
+                case OpCodes.OpIndex:
+                    left, index = stack[-2].boxed(), stack[-1].boxed()
+                    del stack[-2:]
+                    stack.append(self.new_temp(f"index({left}, {index})", Kind.OBJ))
+                case OpCodes.OpCall:
+                    count = ins.operands[0]
+                    call = [v.boxed() for v in stack[len(stack) - count - 1 :]]
+                    del stack[len(stack) - count - 1 :]
+                    stack.append(self.new_temp(f"call({', '.join(call)})", Kind.OBJ))
+                case OpCodes.OpReturnValue:
+                    self.emit(f"return {stack[-1].boxed()}")
+                    return None
+                case OpCodes.OpReturn:
+                    self.emit("return NULL")
+                    return None
+                case OpCodes.OpJumpNotTruthy | OpCodes.OpJumpTruthy:
+                    merged = self.translate_conditional(ins, stack)
+                    if merged is None:
+                        return None
+                    stack, offset = merged
+                    continue
+                case _:
+                    raise JitBailout(f"unsupported opcode {ins.opcode.name}")
+            offset = ins.next_offset
+        return stack
+
+    def translate_conditional(  # noqa: C901
+        self, ins: Decoded, stack: list[Value]
+    ) -> tuple[list[Value], int] | None:
+        alternative_start = ins.operands[0]
+        condition = stack.pop()
+        for i, pending in enumerate(stack):
+            if pending.expr[0] == "l" and pending.expr[1:].isdigit():
+                stack[i] = self.new_temp(pending.expr, pending.kind)
+        test = self.truthy(condition)
+        if ins.opcode == OpCodes.OpJumpTruthy:
+            test = f"not {test}"
+
+        self.emit(f"if {test}:")
+        self.indent += 1
+        guarded = set(self.guarded)
+        previous = next((d for d in self.code.values() if d.next_offset == alternative_start), None)
+        if previous is not None and previous.opcode in (OpCodes.OpReturnValue, OpCodes.OpReturn):
+            if self.translate_region(ins.next_offset, alternative_start, list(stack)) is not None:
+                raise JitBailout("unsupported control flow")
+            self.guarded = guarded
+            self.indent -= 1
+            return stack, alternative_start
+        jump = self.code.get(alternative_start - 3)
+        if jump is None or jump.opcode != OpCodes.OpJump or jump.operands[0] < alternative_start:
+            raise JitBailout("unsupported control flow")
+        end = jump.operands[0]
+        consequence = self.translate_region(ins.next_offset, jump.offset, list(stack))
+        consequence_guarded, self.guarded = self.guarded, set(guarded)
+        consequence_end = len(self.lines)
+        if consequence is not None:
+            self.emit("")
+        self.indent -= 1
+        self.emit("else:")
+        self.indent += 1
+        alternative = self.translate_region(alternative_start, end, list(stack))
+        alternative_end = len(self.lines)
+        if consequence is None:
+            consequence_guarded = self.guarded
+        elif alternative is not None:
+            self.guarded &= consequence_guarded
+        else:
+            self.guarded = consequence_guarded
+        if alternative is not None:
+            self.emit("")
+        self.indent -= 1
+
+        if consequence is None and alternative is None:
+            return None
+        if consequence is None or alternative is None:
+            remaining = consequence if consequence is not None else alternative
+            assert remaining is not None
+            line = consequence_end if consequence is not None else alternative_end
+            self.lines[line] = "    " * (self.indent + 1) + "pass"
+            return remaining, end
+        if len(consequence) != len(stack) + 1 or len(alternative) != len(stack) + 1:
+            raise JitBailout("branches leave unbalanced stacks")
+
+        result, other = consequence[-1], alternative[-1]
+        kind = result.kind if result.kind == other.kind else Kind.OBJ
+        self.num_temps += 1
+        merged = Value(f"t{self.num_temps}", kind)
+        for line, value in ((consequence_end, result), (alternative_end, other)):
+            expr = value.expr if kind == value.kind else value.boxed()
+            self.lines[line] = "    " * (self.indent + 1) + f"{merged.expr} = {expr}"
+        return [*stack, merged], end
+
+
+@dataclass
+class Jit:
+    vm: "VM"
+    threshold: int = JIT_THRESHOLD
+    call_counts: dict[int, int] = field(default_factory=dict)
+    compiled: dict[int, JitFunction | None] = field(default_factory=dict)
+    deoptimizations: dict[int, int] = field(default_factory=dict)
+    sources: dict[int, str] = field(default_factory=dict)
+    depth: int = 0
+
+    def lookup(self, fn: CompiledFunction) -> JitFunction | None:
+        key = id(fn)
+        if key in self.compiled:
+            return self.compiled[key] if self.depth < MAX_JIT_DEPTH else None
+        count = self.call_counts.get(key, 0) + 1
+        self.call_counts[key] = count
+        if count < self.threshold:
+            return None
+        self.compiled[key] = self.compile(fn)
+        return self.lookup(fn)
+
+    def compile(self, fn: CompiledFunction) -> JitFunction | None:
+        from src.vm import BUILTINS, FALSE, NULL, TRUE
+
+        translator = FunctionTranslator(fn, self.vm.constants, name=f"jit_{len(self.compiled)}")
+        try:
+            source = translator.translate()
+        except JitBailout:
+            return None
+        namespace: dict[str, Any] = {
+            "Integer": Integer,
+            "Boolean": Boolean,
+            "Array": Array,
+            "TRUE": TRUE,
+            "FALSE": FALSE,
+            "NULL": NULL,
+            "FALSY": (FALSE, NULL),
+            "G": self.vm.globals,
+            "B": BUILTINS,
+            "Deoptimization": Deoptimization,
+            "build_hash": build_hash,
+            "index": self.vm.execute_index,
+            "call": self.call,
+            **translator.constant_names,
+        }
+        exec(compile(source, f"<jit {translator.name}>", "exec"), namespace)
+        self.sources[id(fn)] = source
+        jitted: JitFunction = namespace[translator.name]
+        return jitted
+
+    def enter(self, fn: CompiledFunction, jitted: JitFunction, args: list[Object]) -> Object:
+        self.depth += 1
+        try:
+            return jitted(*args)
+        except Deoptimization:
+            key = id(fn)
+            self.deoptimizations[key] = self.deoptimizations.get(key, 0) + 1
+            if self.deoptimizations[key] >= MAX_DEOPTIMIZATIONS:
+                self.compiled[key] = None
+            raise
+        finally:
+            self.depth -= 1
+
+    def call(self, callee: Object, *args: Object) -> Object:
+        if type(callee) is CompiledFunction and callee.num_of_parameters == len(args):
+            jitted = self.compiled.get(id(callee))
+            if jitted is not None and self.depth < MAX_JIT_DEPTH:
+                try:
+                    return self.enter(callee, jitted, list(args))
+                except Deoptimization as deopt:
+                    return self.vm.resume_deoptimized(callee, deopt)
+        return self.vm.call_function(callee, list(args))
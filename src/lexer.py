@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from src.tokens import Token, TokenType, lookup_ident
 
@@ -13,11 +13,14 @@ class Lexer:
     position: int = 0
     read_position: int = 0
     current_char: str = ""
+    line: int = 1
 
     def __post_init__(self) -> None:
         self.read_char()
 
     def read_char(self) -> None:
+        if self.current_char == "\n":
+            self.line += 1
         if self.read_position >= len(self.input):
             self.current_char = ""
         else:
@@ -27,8 +30,12 @@ class Lexer:
         self.read_position += 1
 
     def next_token(self) -> Token:
-        token = Token(token_type=TokenType.EOF, literal="")
         self.skip_whitespace()
+        line = self.line
+        return replace(self.read_token(), line=line)
+
+    def read_token(self) -> Token:
+        token = Token(token_type=TokenType.EOF, literal="")
         match self.current_char:
             case "=":
                 if self.peek_char() == "=":
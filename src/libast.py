@@ -203,6 +203,7 @@ class FunctionLiteral(Expression):
     token: Token
     parameters: list[Identifier]
     body: BlockStatement
+    name: str = ""
 
     def expression_node(self) -> None:
         ...
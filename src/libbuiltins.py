@@ -1,4 +1,15 @@
-from src.object import Array, Builtin, Error, Integer, Null, Object, String
+from src.object import (
+    Array,
+    Builtin,
+    CompiledFunction,
+    Error,
+    Function,
+    Integer,
+    Memoized,
+    Null,
+    Object,
+    String,
+)
 
 
 def len_builtin(*args: Object) -> Object:
@@ -67,6 +78,17 @@ def puts_builtin(*args: Object) -> Object:
     return Null()
 
 
+def memoize_builtin(*args: Object) -> Object:
+    if len(args) != 2:
+        return Error(message=f"wrong number of arguments. got={len(args)}, want=2")
+    fn, size = args
+    if not isinstance(fn, Function | CompiledFunction | Builtin | Memoized):
+        return Error(message=f"argument to 'memoize' must be FUNCTION, got {fn.type()}")
+    if not isinstance(size, Integer) or size.value < 1:
+        return Error(message=f"size of 'memoize' must be a positive INTEGER, got {size.inspect()}")
+    return Memoized(fn=fn, size=size.value)
+
+
 builtins: dict[str, Builtin] = {
     "len": Builtin(fn=len_builtin),
     "first": Builtin(fn=first_builtin),
@@ -74,4 +96,7 @@ builtins: dict[str, Builtin] = {
     "rest": Builtin(fn=rest_builtin),
     "push": Builtin(fn=push_builtin),
     "puts": Builtin(fn=puts_builtin),
+    "memoize": Builtin(fn=memoize_builtin),
 }
+
+PURE_BUILTINS = frozenset({"len", "first", "last", "rest", "push"})
@@ -1,5 +1,5 @@
 from collections.abc import Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import IntEnum, auto
 from typing import TypeAlias
 
@@ -128,6 +128,8 @@ class Parser:
         self.next_token()
 
         value = self.parse_expression(Precedence.LOWEST)
+        if isinstance(value, FunctionLiteral):
+            value = replace(value, name=identifier.value)
 
         if self.peek_token.has_token_type(TokenType.SEMICOLON):
             self.next_token()
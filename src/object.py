@@ -1,4 +1,5 @@
-from collections.abc import Hashable
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
 from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import Protocol, Self, TypeAlias, runtime_checkable
@@ -21,6 +22,7 @@ class OBJECT_TYPE(StrEnum):
     ARRAY_OBJ = "ARRAY"
     HASH_OBJ = "HASH"
     COMPILED_FUNCTION_OBJ = "COMPILED_FUNCTION"
+    MEMOIZED_OBJ = "MEMOIZED"
 
 
 @runtime_checkable
@@ -117,6 +119,8 @@ class Error(Object):
 class Environment:
     store: dict[str, Object] = field(default_factory=dict)
     outer: Self | None = None
+    names: frozenset[str] | None = None
+    final: frozenset[str] = frozenset()
 
     def __getitem__(self, name: str) -> Object | None:
         obj = self.store.get(name)
@@ -141,6 +145,9 @@ class Function(Object):
     parameters: list[Identifier]
     body: BlockStatement
     env: Environment
+    name: str = ""
+    local_names: frozenset[str] | None = None
+    final_names: frozenset[str] = frozenset()
 
     def type(self) -> ObjectType:
         return OBJECT_TYPE.FUNCTION_OBJ
@@ -178,6 +185,20 @@ class Builtin(Object):
         return super().__hash__()
 
 
+@dataclass(frozen=True)
+class AsyncBuiltin(Object):
+    fn: Callable[..., Awaitable[Object]]
+
+    def type(self) -> ObjectType:
+        return OBJECT_TYPE.BUILTIN_OBJ
+
+    def inspect(self) -> str:
+        return "async builtin function"
+
+    def __hash__(self) -> int:
+        return super().__hash__()
+
+
 @dataclass(frozen=True)
 class Array(Object):
     elements: list[Object]
@@ -219,9 +240,54 @@ class CompiledFunction(Object):
     instructions: Instructions
     num_of_locals: int
     num_of_parameters: int
+    name: str = ""
 
     def type(self) -> ObjectType:
         return OBJECT_TYPE.COMPILED_FUNCTION_OBJ
 
     def inspect(self) -> str:
         return f"CompiledFunction[{hex(id(self))}]"
+
+
+def memo_key(args: list[Object]) -> Hashable | None:
+    key: list[Hashable] = []
+    for arg in args:
+        match arg:
+            case Integer() | String() | Boolean():
+                key.append((arg.type(), arg.value))
+            case Null():
+                key.append(None)
+            case Array():
+                elements = memo_key(arg.elements)
+                if elements is None:
+                    return None
+                key.append(elements)
+            case _:
+                return None
+    return tuple(key)
+
+
+@dataclass(eq=False)
+class Memoized(Object):
+    fn: Object
+    size: int
+    cache: OrderedDict[Hashable, Object] = field(default_factory=OrderedDict)
+
+    def type(self) -> ObjectType:
+        return OBJECT_TYPE.MEMOIZED_OBJ
+
+    def inspect(self) -> str:
+        return f"memoized({self.fn.inspect()}, {self.size})"
+
+    def lookup(self, key: Hashable) -> Object | None:
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+        return result
+
+    def store(self, key: Hashable, result: Object) -> None:
+        if isinstance(result, Error):
+            return
+        self.cache[key] = result
+        if len(self.cache) > self.size:
+            self.cache.popitem(last=False)
@@ -0,0 +1,243 @@
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Any
+
+from src.analysis import let_statements, map_children, walk
+from src.libast import (
+    ArrayLiteral,
+    BlockStatement,
+    Boolean,
+    CallExpression,
+    Expression,
+    ExpressionStatement,
+    FunctionLiteral,
+    HashLiteral,
+    Identifier,
+    IfExpression,
+    IntegerLiteral,
+    LetStatement,
+    Node,
+    Program,
+    ReturnStatement,
+    Statement,
+    StringLiteral,
+)
+from src.libbuiltins import PURE_BUILTINS
+from src.tokens import Token, TokenType
+
+MAX_INLINE_SIZE = 32
+MEMO_SIZE = 1024
+
+
+def is_pure(node: Expression) -> bool:
+    match node:
+        case IntegerLiteral() | StringLiteral() | Boolean() | FunctionLiteral():
+            return True
+        case ArrayLiteral():
+            return all(is_pure(e) for e in node.elements)
+        case HashLiteral():
+            literals = IntegerLiteral | StringLiteral | Boolean
+            return all(isinstance(k, literals) and is_pure(v) for k, v in node.pairs.items())
+        case _:
+            return False
+
+
+def terminates(statement: Statement) -> bool:
+    match statement:
+        case ReturnStatement():
+            return True
+        case ExpressionStatement(expression=IfExpression() as node):
+            return node.alternative is not None and all(
+                any(terminates(s) for s in block.statements)
+                for block in (node.consequence, node.alternative)
+            )
+        case _:
+            return False
+
+
+def size(node: Node) -> int:
+    return sum(1 for _ in walk(node))
+
+
+def eliminate_dead_code(program: Program) -> Program:
+    while True:
+        references = Counter(n.value for n in walk(program) if isinstance(n, Identifier))
+        pruned = DeadCodeEliminator(references).prune(program)
+        if size(pruned) == size(program):
+            return pruned
+        program = pruned
+
+
+@dataclass
+class DeadCodeEliminator:
+    references: Counter[str]
+
+    def prune(self, node: Any) -> Any:
+        match node:
+            case Program():
+                return replace(node, statements=self.prune_statements(node.statements, True))
+            case BlockStatement():
+                return replace(node, statements=self.prune_statements(node.statements, False))
+            case _:
+                return map_children(node, self.prune)
+
+    def prune_statements(self, statements: list[Statement], keep_last: bool) -> list[Statement]:
+        live: list[Statement] = []
+        for i, statement in enumerate(statements):
+            if (keep_last and i == len(statements) - 1) or not self.is_dead(statement):
+                live.append(self.prune(statement))
+            if terminates(statement):
+                break
+        return live
+
+    def is_dead(self, statement: Statement) -> bool:
+        return (
+            isinstance(statement, LetStatement)
+            and statement.value is not None
+            and self.references[statement.name.value] == 0
+            and is_pure(statement.value)
+        )
+
+
+def is_inlinable(name: str, node: FunctionLiteral, bindings: Counter[str]) -> bool:
+    if bindings[name] != 1 or size(node.body) > MAX_INLINE_SIZE:
+        return False
+    statements = node.body.statements
+    for n in walk(node.body):
+        match n:
+            case FunctionLiteral():
+                return False
+            case Identifier() if n.value == name:
+                return False
+            case ReturnStatement() if n is not statements[-1] or n.return_value is None:
+                return False
+    return True
+
+
+def rename(node: Any, names: dict[str, str]) -> Any:
+    match node:
+        case Identifier() if node.value in names:
+            return replace(node, value=names[node.value])
+        case LetStatement():
+            return replace(
+                map_children(node, lambda n: rename(n, names)), name=rename(node.name, names)
+            )
+        case _:
+            return map_children(node, lambda n: rename(n, names))
+
+
+def inline_body(name: str, node: FunctionLiteral) -> tuple[list[str], BlockStatement, set[str]]:
+    bound = [p.value for p in node.parameters]
+    bound += [s.name.value for s in let_statements(list(node.body.statements))]
+    names = {n: f"{name}${n}" for n in bound}
+    free = {n.value for n in walk(node.body) if isinstance(n, Identifier)} - set(bound)
+    body: BlockStatement = rename(node.body, names)
+    last = body.statements[-1] if body.statements else None
+    if isinstance(last, ReturnStatement):
+        result = ExpressionStatement(token=last.token, expression=last.return_value)
+        body = replace(body, statements=[*body.statements[:-1], result])
+    return [names[p.value] for p in node.parameters], body, free
+
+
+def global_functions(program: Program, bindings: Counter[str]) -> dict[str, FunctionLiteral]:
+    return {
+        s.name.value: s.value
+        for s in program.statements
+        if isinstance(s, LetStatement)
+        and isinstance(s.value, FunctionLiteral)
+        and bindings[s.name.value] == 1
+    }
+
+
+def pure_functions(program: Program) -> dict[str, FunctionLiteral]:
+    bindings = Counter(s.name.value for s in walk(program) if isinstance(s, LetStatement))
+    constants = {
+        s.name.value
+        for s in program.statements
+        if isinstance(s, LetStatement)
+        and s.value is not None
+        and not isinstance(s.value, FunctionLiteral)
+        and bindings[s.name.value] == 1
+        and is_pure(s.value)
+    }
+    builtins = {name for name in PURE_BUILTINS if bindings[name] == 0}
+    pure = global_functions(program, bindings)
+    while True:
+        impure = {
+            name
+            for name, fn in pure.items()
+            if not is_pure_function(fn, set(pure) | builtins, constants)
+        }
+        if not impure:
+            return pure
+        pure = {name: fn for name, fn in pure.items() if name not in impure}
+
+
+def is_pure_function(node: FunctionLiteral, functions: set[str], constants: set[str]) -> bool:
+    local = {p.value for p in node.parameters}
+    local |= {s.name.value for s in let_statements(list(node.body.statements))}
+    for n in walk(node.body):
+        match n:
+            case FunctionLiteral():
+                return False
+            case CallExpression(function=Identifier(value=name)):
+                if name in local or name not in functions:
+                    return False
+            case CallExpression():
+                return False
+            case Identifier(value=name):
+                if name not in local and name not in functions and name not in constants:
+                    return False
+    return True
+
+
+def call_sites(node: FunctionLiteral, functions: dict[str, FunctionLiteral]) -> list[str]:
+    return [
+        n.function.value
+        for n in walk(node.body)
+        if isinstance(n, CallExpression)
+        and isinstance(n.function, Identifier)
+        and n.function.value in functions
+    ]
+
+
+def tree_recursive_functions(functions: dict[str, FunctionLiteral]) -> set[str]:
+    calls = {name: call_sites(fn, functions) for name, fn in functions.items()}
+    reachable: dict[str, set[str]] = {}
+    for name in functions:
+        reachable[name] = set()
+        pending = list(calls[name])
+        while pending:
+            callee = pending.pop()
+            if callee not in reachable[name]:
+                reachable[name].add(callee)
+                pending.extend(calls[callee])
+    return {
+        name
+        for name in functions
+        if sum(1 for callee in calls[name] if name in reachable[callee]) >= 2
+    }
+
+
+def memoize_pure_functions(program: Program, size: int = MEMO_SIZE) -> Program:
+    if any(isinstance(n, LetStatement) and n.name.value == "memoize" for n in walk(program)):
+        return program
+    memoized = tree_recursive_functions(pure_functions(program))
+    statements: list[Statement] = []
+    for statement in program.statements:
+        if (
+            isinstance(statement, LetStatement)
+            and isinstance(statement.value, FunctionLiteral)
+            and statement.name.value in memoized
+        ):
+            call = CallExpression(
+                token=Token(TokenType.LPAREN, "("),
+                function=Identifier(token=Token(TokenType.IDENT, "memoize"), value="memoize"),
+                arguments=[
+                    statement.value,
+                    IntegerLiteral(token=Token(TokenType.INT, str(size)), value=size),
+                ],
+            )
+            statement = replace(statement, value=call)
+        statements.append(statement)
+    return replace(program, statements=statements)
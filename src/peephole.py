@@ -0,0 +1,169 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from src.bytecode import Instructions, OpCodes, definitions, make, read_operands
+
+JUMPS = (OpCodes.OpJump, OpCodes.OpJumpNotTruthy, OpCodes.OpJumpTruthy)
+RETURNS = (OpCodes.OpReturnValue, OpCodes.OpReturn)
+PURE_PUSHES = (
+    OpCodes.OpConstant,
+    OpCodes.OpTrue,
+    OpCodes.OpFalse,
+    OpCodes.OpNull,
+    OpCodes.OpGetLocal,
+    OpCodes.OpGetBuiltin,
+)
+
+
+@dataclass
+class Instruction:
+    opcode: OpCodes
+    operands: list[int]
+    line: int = 0
+
+
+def decode(instructions: Instructions) -> list[Instruction]:
+    code: list[Instruction] = []
+    indices: dict[int, int] = {}
+    offset = 0
+    while offset < len(instructions):
+        opcode = OpCodes(instructions[offset])
+        operand_data = read_operands(definitions[opcode], instructions.inst[offset + 1 :])
+        indices[offset] = len(code)
+        code.append(Instruction(opcode, operand_data.operands, instructions.lines.get(offset, 0)))
+        offset += 1 + operand_data.offset
+    indices[offset] = len(code)
+    for ins in code:
+        if ins.opcode in JUMPS:
+            ins.operands = [indices[ins.operands[0]]]
+    return code
+
+
+def encode(code: list[Instruction]) -> Instructions:
+    offsets = []
+    offset = 0
+    for ins in code:
+        offsets.append(offset)
+        offset += 1 + sum(definitions[ins.opcode].operand_widths)
+    offsets.append(offset)
+    instructions = Instructions()
+    for ins in code:
+        operands = [offsets[ins.operands[0]]] if ins.opcode in JUMPS else ins.operands
+        instructions.add(make(ins.opcode, operands), ins.line)
+    return instructions
+
+
+def jump_targets(code: list[Instruction]) -> set[int]:
+    return {ins.operands[0] for ins in code if ins.opcode in JUMPS}
+
+
+def delete(code: list[Instruction], index: int, count: int = 1) -> None:
+    del code[index : index + count]
+    for ins in code:
+        if ins.opcode in JUMPS and ins.operands[0] > index:
+            ins.operands[0] = max(index, ins.operands[0] - count)
+
+
+def resolve_target(code: list[Instruction], target: int) -> int:
+    seen = set()
+    while target < len(code) and target not in seen:
+        seen.add(target)
+        ins = code[target]
+        if ins.opcode == OpCodes.OpJump:
+            target = ins.operands[0]
+        elif (
+            ins.opcode in PURE_PUSHES
+            and target + 1 < len(code)
+            and code[target + 1].opcode == OpCodes.OpPop
+        ):
+            target += 2
+        else:
+            break
+    return target
+
+
+def thread_jumps(code: list[Instruction]) -> bool:
+    changed = False
+    for i, ins in enumerate(code):
+        if ins.opcode not in JUMPS:
+            continue
+        target = resolve_target(code, ins.operands[0])
+        if target != ins.operands[0]:
+            ins.operands = [target]
+            changed = True
+        if ins.opcode == OpCodes.OpJump and target < len(code) and code[target].opcode in RETURNS:
+            code[i] = Instruction(code[target].opcode, list(code[target].operands))
+            changed = True
+    return changed
+
+
+def remove_unreachable_code(code: list[Instruction]) -> bool:
+    targets = jump_targets(code)
+    for i, ins in enumerate(code):
+        if ins.opcode == OpCodes.OpJump and ins.operands[0] == i + 1:
+            delete(code, i)
+            return True
+        if ins.opcode in JUMPS and ins.operands[0] == i + 1:
+            code[i] = Instruction(OpCodes.OpPop, [])
+            return True
+        if ins.opcode != OpCodes.OpJump and ins.opcode not in RETURNS:
+            continue
+        end = i + 1
+        while end < len(code) and end not in targets:
+            end += 1
+        if end > i + 1:
+            delete(code, i + 1, end - i - 1)
+            return True
+    return False
+
+
+def remove_dead_stores(code: list[Instruction]) -> bool:
+    targets = jump_targets(code)
+    for i in range(len(code) - 1):
+        if (
+            code[i].opcode in PURE_PUSHES
+            and code[i + 1].opcode == OpCodes.OpPop
+            and i + 1 not in targets
+        ):
+            delete(code, i, 2)
+            return True
+    return False
+
+
+def fold_branches(code: list[Instruction]) -> bool:
+    targets = jump_targets(code)
+    for i in range(len(code) - 1):
+        first, second = code[i], code[i + 1]
+        if i + 1 in targets:
+            continue
+        match first.opcode, second.opcode:
+            case OpCodes.OpTrue, OpCodes.OpJumpNotTruthy:
+                delete(code, i, 2)
+            case OpCodes.OpFalse | OpCodes.OpNull, OpCodes.OpJumpNotTruthy:
+                code[i] = Instruction(OpCodes.OpJump, second.operands)
+                delete(code, i + 1)
+            case OpCodes.OpBang, OpCodes.OpJumpNotTruthy:
+                code[i] = Instruction(OpCodes.OpJumpTruthy, second.operands)
+                delete(code, i + 1)
+            case OpCodes.OpNull, OpCodes.OpReturnValue:
+                code[i] = Instruction(OpCodes.OpReturn, [])
+                delete(code, i + 1)
+            case _:
+                continue
+        return True
+    return False
+
+
+REWRITES: list[Callable[[list[Instruction]], bool]] = [
+    thread_jumps,
+    remove_unreachable_code,
+    remove_dead_stores,
+    fold_branches,
+]
+
+
+def peephole(instructions: Instructions) -> Instructions:
+    code = decode(instructions)
+    while any(rewrite(code) for rewrite in REWRITES):
+        pass
+    return encode(code)
@@ -0,0 +1,70 @@
+from collections.abc import Hashable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any, Self
+
+from src.compiler import Compiler
+from src.frame import Frame
+from src.libast import Program
+from src.object import Array, Hash, HashPair, Integer, Object, String
+from src.vm import FALSE, NULL, TRUE, VM
+
+
+def from_native(value: Any) -> Object:
+    match value:
+        case None:
+            return NULL
+        case bool():
+            return TRUE if value else FALSE
+        case int():
+            return Integer(value=value)
+        case str():
+            return String(value=value)
+        case list():
+            return Array(elements=[from_native(e) for e in value])
+        case dict():
+            pairs: dict[Hashable, HashPair] = {}
+            for key, val in value.items():
+                key_obj = from_native(key)
+                if isinstance(key_obj, Hashable):
+                    pairs[key_obj] = HashPair(key=key_obj, value=from_native(val))
+            return Hash(pairs=pairs)
+        case _:
+            raise TypeError(f"cannot pass {type(value).__name__} to Monkey")
+
+
+@dataclass
+class PreparedProgram:
+    vm: VM
+    main: Frame
+    slots: dict[str, int]
+    num_globals: int
+
+    @classmethod
+    def from_program(cls, program: Program, inputs: Iterable[str], optimize: bool = False) -> Self:
+        compiler = Compiler(optimize=optimize)
+        slots = {name: compiler.symbol_table.define(name).index for name in inputs}
+        compiler.compile(program)
+        vm = VM.from_compiler(compiler=compiler)
+        main = vm.current_frame()
+        return cls(vm=vm, main=main, slots=slots, num_globals=compiler.symbol_table.num_definitions)
+
+    def reset(self) -> None:
+        first = len(self.slots)
+        self.main.ip = -1
+        self.vm.frame_index = 1
+        self.vm.stack.sp = 0
+        store = self.vm.globals.store
+        end = min(self.num_globals, len(store))
+        store[first:end] = [None] * (end - first)
+
+    def run(self, bindings: Mapping[str, Object]) -> Object | None:
+        self.reset()
+        for name, slot in self.slots.items():
+            self.vm.globals[slot] = bindings[name]
+        self.vm.run()
+        return self.vm.last_popped_stack_elem()
+
+    def run_records(self, records: Iterable[Mapping[str, Any]]) -> list[Object | None]:
+        return [
+            self.run({name: from_native(record[name]) for name in self.slots}) for record in records
+        ]
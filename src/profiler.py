@@ -0,0 +1,152 @@
+import argparse
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from src import evaluator
+from src.compiler import Compiler
+from src.frame import Frame
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.object import Environment, Function, Object
+from src.vm import VM, Status
+
+MAIN = "<main>"
+ANONYMOUS = "<anonymous>"
+
+
+@dataclass
+class FunctionStats:
+    calls: int = 0
+    self_time: float = 0.0
+    total_time: float = 0.0
+
+
+@dataclass
+class Call:
+    name: str
+    started: float
+    children: float = 0.0
+
+
+@dataclass
+class Profiler:
+    functions: dict[str, FunctionStats] = field(default_factory=dict)
+    stacks: defaultdict[str, float] = field(default_factory=lambda: defaultdict(float))
+    calls: list[Call] = field(default_factory=list)
+    active: Counter[str] = field(default_factory=Counter)
+
+    def enter(self, name: str) -> None:
+        self.calls.append(Call(name=name or ANONYMOUS, started=time.perf_counter()))
+        self.active[self.calls[-1].name] += 1
+
+    def exit(self) -> None:
+        call = self.calls[-1]
+        elapsed = time.perf_counter() - call.started
+        stats = self.functions.setdefault(call.name, FunctionStats())
+        stats.calls += 1
+        stats.self_time += elapsed - call.children
+        self.active[call.name] -= 1
+        if self.active[call.name] == 0:
+            stats.total_time += elapsed
+        self.stacks[";".join(c.name for c in self.calls)] += elapsed - call.children
+        self.calls.pop()
+        if self.calls:
+            self.calls[-1].children += elapsed
+
+    def exit_all(self) -> None:
+        while self.calls:
+            self.exit()
+
+    def report(self) -> str:
+        lines = [f"{'function':<24} {'calls':>10} {'self ms':>10} {'total ms':>10}"]
+        for name, stats in sorted(self.functions.items(), key=lambda item: -item[1].self_time):
+            lines.append(
+                f"{name:<24} {stats.calls:>10} {stats.self_time * 1e3:>10.2f} "
+                f"{stats.total_time * 1e3:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        return "\n".join(
+            f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(self.stacks.items())
+        )
+
+
+@dataclass
+class ProfilingVM(VM):
+    profiler: Profiler = field(default_factory=Profiler)
+
+    def push_frame(self, frame: Frame) -> None:
+        super().push_frame(frame)
+        self.profiler.enter(frame.fn.name)
+
+    def pop_frame(self) -> Frame:
+        frame = super().pop_frame()
+        self.profiler.exit()
+        return frame
+
+    def run(self, max_calls: int | None = None) -> Status:
+        if not self.profiler.calls:
+            self.profiler.enter(MAIN)
+        try:
+            status = super().run(max_calls)
+        except BaseException:
+            self.profiler.exit_all()
+            raise
+        if status == Status.DONE:
+            self.profiler.exit_all()
+        return status
+
+
+@contextmanager
+def profile_evaluator() -> Iterator[Profiler]:
+    profiler = Profiler()
+    apply_function = evaluator.apply_function
+
+    def profiled(func: Object, args: list[Object]) -> Object:
+        if not isinstance(func, Function):
+            return apply_function(func, args)
+        profiler.enter(func.name)
+        try:
+            return apply_function(func, args)
+        finally:
+            profiler.exit()
+
+    evaluator.apply_function = profiled
+    profiler.enter(MAIN)
+    try:
+        yield profiler
+    finally:
+        profiler.exit_all()
+        evaluator.apply_function = apply_function
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.profiler")
+    parser.add_argument("file", help="Monkey source file to run")
+    parser.add_argument("--engine", choices=["vm", "eval"], default="vm")
+    parser.add_argument("--collapsed", help="write collapsed stacks for flamegraph tools")
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        program = Parser(lexer=Lexer(f.read())).parse_program()
+    if args.engine == "eval":
+        with profile_evaluator() as profiler:
+            evaluator.eval(program, Environment())
+    else:
+        compiler = Compiler()
+        compiler.compile(program)
+        vm = ProfilingVM.from_compiler(compiler=compiler)
+        vm.run()
+        profiler = vm.profiler
+    print(profiler.report())
+    if args.collapsed:
+        with open(args.collapsed, "w") as f:
+            f.write(profiler.collapsed() + "\n")
+
+
+if __name__ == "__main__":
+    main()
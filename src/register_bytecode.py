@@ -0,0 +1,82 @@
+from enum import IntEnum, auto
+
+from src.bytecode import Definition, Instructions, Opcode
+
+
+class RegisterOpCodes(IntEnum):
+    OpLoadConstant = auto()
+    OpLoadTrue = auto()
+    OpLoadFalse = auto()
+    OpLoadNull = auto()
+    OpMove = auto()
+    OpAdd = auto()
+    OpSub = auto()
+    OpMul = auto()
+    OpDiv = auto()
+    OpEqual = auto()
+    OpNotEqual = auto()
+    OpGreaterThan = auto()
+    OpMinus = auto()
+    OpBang = auto()
+    OpJump = auto()
+    OpJumpNotTruthy = auto()
+    OpGetGlobal = auto()
+    OpSetGlobal = auto()
+    OpArray = auto()
+    OpHash = auto()
+    OpIndex = auto()
+    OpCall = auto()
+    OpReturnValue = auto()
+    OpReturn = auto()
+    OpResult = auto()
+
+
+# Register instructions store every operand in its own slot of `Instructions.inst`, so an
+# operand width of 1 means "one slot" rather than one byte.
+register_definitions: dict[Opcode, Definition] = {
+    RegisterOpCodes.OpLoadConstant: Definition("LOADK", [1, 1]),
+    RegisterOpCodes.OpLoadTrue: Definition("LOADTRUE", [1]),
+    RegisterOpCodes.OpLoadFalse: Definition("LOADFALSE", [1]),
+    RegisterOpCodes.OpLoadNull: Definition("LOADNULL", [1]),
+    RegisterOpCodes.OpMove: Definition("MOVE", [1, 1]),
+    RegisterOpCodes.OpAdd: Definition("ADD", [1, 1, 1]),
+    RegisterOpCodes.OpSub: Definition("SUB", [1, 1, 1]),
+    RegisterOpCodes.OpMul: Definition("MUL", [1, 1, 1]),
+    RegisterOpCodes.OpDiv: Definition("DIV", [1, 1, 1]),
+    RegisterOpCodes.OpEqual: Definition("EQ", [1, 1, 1]),
+    RegisterOpCodes.OpNotEqual: Definition("NE", [1, 1, 1]),
+    RegisterOpCodes.OpGreaterThan: Definition("GT", [1, 1, 1]),
+    RegisterOpCodes.OpMinus: Definition("NEG", [1, 1]),
+    RegisterOpCodes.OpBang: Definition("NOT", [1, 1]),
+    RegisterOpCodes.OpJump: Definition("JMP", [1]),
+    RegisterOpCodes.OpJumpNotTruthy: Definition("JMPF", [1, 1]),
+    RegisterOpCodes.OpGetGlobal: Definition("GETGLOBAL", [1, 1]),
+    RegisterOpCodes.OpSetGlobal: Definition("SETGLOBAL", [1, 1]),
+    RegisterOpCodes.OpArray: Definition("ARRAY", [1, 1, 1]),
+    RegisterOpCodes.OpHash: Definition("HASH", [1, 1, 1]),
+    RegisterOpCodes.OpIndex: Definition("INDEX", [1, 1, 1]),
+    RegisterOpCodes.OpCall: Definition("CALL", [1, 1, 1]),
+    RegisterOpCodes.OpReturnValue: Definition("RETURN", [1]),
+    RegisterOpCodes.OpReturn: Definition("RETURNNULL", []),
+    RegisterOpCodes.OpResult: Definition("RESULT", [1]),
+}
+
+
+def make_register(op: RegisterOpCodes, operands: list[int]) -> list[int]:
+    return [op, *operands]
+
+
+def register_instructions_to_string(instructions: Instructions) -> str:
+    output = ""
+    i = 0
+    while i < len(instructions):
+        definition = register_definitions.get(instructions[i])
+        if definition is None:
+            output += f"ERROR: Unknown opcode {instructions[i]}\n"
+            i += 1
+            continue
+        width = len(definition.operand_widths)
+        operands = ", ".join(f"{o}" for o in instructions.inst[i + 1 : i + 1 + width])
+        output += f"{i:04} {definition.name} {operands}\n"
+        i += 1 + width
+    return output
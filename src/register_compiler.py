@@ -0,0 +1,297 @@
+from dataclasses import dataclass, field
+
+from src.analysis import let_statements
+from src.bytecode import Instructions
+from src.compiler import CompilationError
+from src.libast import (
+    ArrayLiteral,
+    BlockStatement,
+    Boolean,
+    CallExpression,
+    Expression,
+    ExpressionStatement,
+    FunctionLiteral,
+    HashLiteral,
+    Identifier,
+    IfExpression,
+    IndexExpression,
+    InfixExpression,
+    IntegerLiteral,
+    LetStatement,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+    Statement,
+    StringLiteral,
+)
+from src.libbuiltins import builtins
+from src.object import CompiledFunction, Integer, Object, String
+from src.register_bytecode import RegisterOpCodes, make_register
+from src.symbol_table import Symbol, SymbolScope, SymbolTable
+
+INFIX_OPCODES: dict[str, RegisterOpCodes] = {
+    "+": RegisterOpCodes.OpAdd,
+    "-": RegisterOpCodes.OpSub,
+    "*": RegisterOpCodes.OpMul,
+    "/": RegisterOpCodes.OpDiv,
+    ">": RegisterOpCodes.OpGreaterThan,
+    "<": RegisterOpCodes.OpGreaterThan,
+    "==": RegisterOpCodes.OpEqual,
+    "!=": RegisterOpCodes.OpNotEqual,
+}
+
+
+@dataclass(frozen=True)
+class RegisterBytecode:
+    instructions: Instructions
+    constants: list[Object]
+    num_registers: int
+
+
+@dataclass
+class RegisterScope:
+    instructions: Instructions = field(default_factory=Instructions)
+    next_register: int = 0
+    num_registers: int = 0
+
+
+@dataclass
+class RegisterCompiler:
+    constants: list[Object] = field(default_factory=list)
+    symbol_table: SymbolTable = field(default_factory=SymbolTable)
+    scopes: list[RegisterScope] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.scopes.append(RegisterScope())
+
+    @property
+    def scope(self) -> RegisterScope:
+        return self.scopes[-1]
+
+    def is_main_scope(self) -> bool:
+        return len(self.scopes) == 1
+
+    def compile(self, program: Program) -> None:
+        for statement in program.statements:
+            self.compile_statement(statement)
+
+    def bytecode(self) -> RegisterBytecode:
+        return RegisterBytecode(
+            instructions=self.scope.instructions,
+            constants=self.constants,
+            num_registers=self.scope.num_registers,
+        )
+
+    def emit(self, op: RegisterOpCodes, operands: list[int]) -> int:
+        return self.scope.instructions.add(make_register(op, operands))
+
+    def change_operand(self, position: int, operand_index: int, operand: int) -> None:
+        self.scope.instructions.inst[position + 1 + operand_index] = operand
+
+    def add_constant(self, obj: Object) -> int:
+        self.constants.append(obj)
+        return len(self.constants) - 1
+
+    def allocate(self) -> int:
+        register = self.scope.next_register
+        self.scope.next_register += 1
+        self.scope.num_registers = max(self.scope.num_registers, self.scope.next_register)
+        return register
+
+    def release(self, mark: int) -> None:
+        self.scope.next_register = mark
+
+    def target(self, dst: int | None) -> int:
+        return self.allocate() if dst is None else dst
+
+    def resolve(self, name: str) -> Symbol:
+        symbol = self.symbol_table.resolve(name)
+        if symbol is None and name in builtins:
+            raise CompilationError(f"Error: builtins are not supported: {name}")
+        if symbol is None:
+            raise CompilationError(f"Error: identifier not found: {name}")
+        if symbol.scope == SymbolScope.LOCAL and name not in self.symbol_table.store:
+            raise CompilationError(f"Error: free variables are not supported: {name}")
+        return symbol
+
+    def compile_statement(self, node: Statement) -> None:
+        mark = self.scope.next_register
+        match node:
+            case ExpressionStatement() if node.expression is not None:
+                register = self.compile_expression(node.expression)
+                if self.is_main_scope():
+                    self.emit(RegisterOpCodes.OpResult, [register])
+            case LetStatement() if node.value is not None:
+                self.compile_let(node.name.value, node.value)
+            case ReturnStatement() if node.return_value is not None:
+                register = self.compile_expression(node.return_value)
+                self.emit(RegisterOpCodes.OpReturnValue, [register])
+            case ReturnStatement():
+                self.emit(RegisterOpCodes.OpReturn, [])
+        self.release(mark)
+
+    def compile_let(self, name: str, value: Expression) -> None:
+        if self.symbol_table.outer is not None and not let_statements([value]):
+            register = self.symbol_table.num_definitions
+            self.compile_expression(value, register)
+            self.symbol_table.define(name)
+            return
+        if self.symbol_table.outer is not None:
+            register = self.compile_expression(value)
+            symbol = self.symbol_table.define(name)
+            self.emit(RegisterOpCodes.OpMove, [symbol.index, register])
+            return
+        if isinstance(value, FunctionLiteral):
+            symbol = self.symbol_table.define(name)
+            register = self.compile_expression(value)
+        else:
+            register = self.compile_expression(value)
+            symbol = self.symbol_table.define(name)
+        self.emit(RegisterOpCodes.OpSetGlobal, [symbol.index, register])
+
+    def compile_block(self, block: BlockStatement, dst: int) -> None:
+        if not block.statements:
+            self.emit(RegisterOpCodes.OpLoadNull, [dst])
+        for i, statement in enumerate(block.statements):
+            is_last = i == len(block.statements) - 1
+            if is_last and isinstance(statement, ExpressionStatement) and statement.expression:
+                mark = self.scope.next_register
+                self.compile_expression(statement.expression, dst)
+                if self.is_main_scope():
+                    self.emit(RegisterOpCodes.OpResult, [dst])
+                self.release(mark)
+                continue
+            self.compile_statement(statement)
+            if is_last and not isinstance(statement, ReturnStatement):
+                self.emit(RegisterOpCodes.OpLoadNull, [dst])
+
+    def compile_expression(self, node: Expression, dst: int | None = None) -> int:  # noqa: C901
+        mark = self.scope.next_register
+        match node:
+            case IntegerLiteral():
+                register = self.target(dst)
+                constant = self.add_constant(Integer(value=node.value))
+                self.emit(RegisterOpCodes.OpLoadConstant, [register, constant])
+            case StringLiteral():
+                register = self.target(dst)
+                constant = self.add_constant(String(value=node.value))
+                self.emit(RegisterOpCodes.OpLoadConstant, [register, constant])
+            case Boolean():
+                register = self.target(dst)
+                load = RegisterOpCodes.OpLoadTrue if node.value else RegisterOpCodes.OpLoadFalse
+                self.emit(load, [register])
+            case Identifier():
+                register = self.compile_identifier(node, dst)
+            case PrefixExpression():
+                right = self.compile_expression(node.right)
+                self.release(mark)
+                register = self.target(dst)
+                match node.operator:
+                    case "!":
+                        self.emit(RegisterOpCodes.OpBang, [register, right])
+                    case "-":
+                        self.emit(RegisterOpCodes.OpMinus, [register, right])
+                    case _:
+                        raise CompilationError(f"Error: unknown operator {node.operator}")
+            case InfixExpression():
+                op = INFIX_OPCODES.get(node.operator)
+                if op is None:
+                    raise CompilationError(f"Error: unknown operator {node.operator}")
+                left = self.compile_expression(node.left)
+                right = self.compile_expression(node.right)
+                self.release(mark)
+                register = self.target(dst)
+                if node.operator == "<":
+                    left, right = right, left
+                self.emit(op, [register, left, right])
+            case IfExpression():
+                register = self.compile_if(node, dst)
+            case FunctionLiteral():
+                register = self.target(dst)
+                constant = self.add_constant(self.compile_function(node))
+                self.emit(RegisterOpCodes.OpLoadConstant, [register, constant])
+            case CallExpression():
+                base = self.compile_consecutive([node.function, *node.arguments])
+                self.release(mark)
+                register = self.target(dst)
+                self.emit(RegisterOpCodes.OpCall, [register, base, len(node.arguments)])
+            case ArrayLiteral():
+                base = self.compile_consecutive(node.elements)
+                self.release(mark)
+                register = self.target(dst)
+                self.emit(RegisterOpCodes.OpArray, [register, base, len(node.elements)])
+            case HashLiteral():
+                items = [e for pair in node.pairs.items() for e in pair]
+                base = self.compile_consecutive(items)
+                self.release(mark)
+                register = self.target(dst)
+                self.emit(RegisterOpCodes.OpHash, [register, base, len(items)])
+            case IndexExpression():
+                left = self.compile_expression(node.left)
+                index = self.compile_expression(node.index)
+                self.release(mark)
+                register = self.target(dst)
+                self.emit(RegisterOpCodes.OpIndex, [register, left, index])
+            case _:
+                raise CompilationError(f"Error: unsupported expression {node}")
+        return register
+
+    def compile_identifier(self, node: Identifier, dst: int | None) -> int:
+        symbol = self.resolve(node.value)
+        if symbol.scope == SymbolScope.GLOBAL:
+            register = self.target(dst)
+            self.emit(RegisterOpCodes.OpGetGlobal, [register, symbol.index])
+            return register
+        if dst is None or dst == symbol.index:
+            return symbol.index
+        self.emit(RegisterOpCodes.OpMove, [dst, symbol.index])
+        return dst
+
+    def compile_consecutive(self, nodes: list[Expression]) -> int:
+        base = self.scope.next_register
+        for node in nodes:
+            self.compile_expression(node, self.allocate())
+        return base
+
+    def compile_if(self, node: IfExpression, dst: int | None) -> int:
+        mark = self.scope.next_register
+        condition = self.compile_expression(node.condition)
+        self.release(mark)
+        register = self.target(dst)
+        jump_not_truthy = self.emit(RegisterOpCodes.OpJumpNotTruthy, [condition, 9999])
+        self.compile_block(node.consequence, register)
+        jump = self.emit(RegisterOpCodes.OpJump, [9999])
+        self.change_operand(jump_not_truthy, 1, len(self.scope.instructions))
+        if node.alternative is None:
+            self.emit(RegisterOpCodes.OpLoadNull, [register])
+        else:
+            self.compile_block(node.alternative, register)
+        self.change_operand(jump, 0, len(self.scope.instructions))
+        return register
+
+    def compile_function(self, node: FunctionLiteral) -> CompiledFunction:
+        num_of_locals = len(node.parameters) + len(let_statements(list(node.body.statements)))
+        self.scopes.append(RegisterScope(next_register=num_of_locals, num_registers=num_of_locals))
+        self.symbol_table = SymbolTable.enclosed_by(self.symbol_table)
+        for param in node.parameters:
+            self.symbol_table.define(param.value)
+
+        statements = node.body.statements
+        for i, statement in enumerate(statements):
+            is_last = i == len(statements) - 1
+            if is_last and isinstance(statement, ExpressionStatement) and statement.expression:
+                register = self.compile_expression(statement.expression)
+                self.emit(RegisterOpCodes.OpReturnValue, [register])
+                continue
+            self.compile_statement(statement)
+        if not statements or not isinstance(statements[-1], ExpressionStatement | ReturnStatement):
+            self.emit(RegisterOpCodes.OpReturn, [])
+
+        scope = self.scopes.pop()
+        if self.symbol_table.outer is not None:
+            self.symbol_table = self.symbol_table.outer
+        return CompiledFunction(
+            instructions=scope.instructions,
+            num_of_locals=scope.num_registers,
+            num_of_parameters=len(node.parameters),
+        )
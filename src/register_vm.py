@@ -0,0 +1,275 @@
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from typing import Self
+
+from src.object import (
+    Array,
+    Boolean,
+    CompiledFunction,
+    Hash,
+    HashPair,
+    Integer,
+    Object,
+    String,
+)
+from src.register_bytecode import RegisterOpCodes
+from src.register_compiler import RegisterCompiler
+from src.vm import (
+    FALSE,
+    MAX_FRAMES,
+    NULL,
+    STACK_SIZE,
+    TRUE,
+    GetGlobalIndexError,
+    Globals,
+    InvalidHashKeyError,
+    StackOverflow,
+)
+
+
+@dataclass
+class RegisterFrame:
+    fn: CompiledFunction
+    base_pointer: int
+    return_register: int
+    ip: int = 0
+
+
+@dataclass
+class RegisterVM:
+    constants: list[Object] = field(default_factory=list)
+    registers: list[Object | None] = field(default_factory=list)
+    globals: Globals = field(default_factory=Globals)
+    frames: list[RegisterFrame] = field(default_factory=list)
+    result: Object | None = None
+
+    @classmethod
+    def from_compiler(cls, compiler: RegisterCompiler) -> Self:
+        bytecode = compiler.bytecode()
+        main_fn = CompiledFunction(
+            instructions=bytecode.instructions,
+            num_of_locals=bytecode.num_registers,
+            num_of_parameters=0,
+        )
+        return cls(
+            constants=bytecode.constants,
+            registers=[None] * bytecode.num_registers,
+            frames=[RegisterFrame(fn=main_fn, base_pointer=0, return_register=0)],
+        )
+
+    @classmethod
+    def with_new_state(cls, compiler: RegisterCompiler, globals: Globals) -> Self:
+        vm = cls.from_compiler(compiler)
+        vm.globals = globals
+        return vm
+
+    def last_popped_stack_elem(self) -> Object | None:
+        return self.result
+
+    def run(self) -> None:  # noqa: C901
+        frames = self.frames
+        frame = frames[-1]
+        ins = frame.fn.instructions.inst
+        base = frame.base_pointer
+        ip = frame.ip
+        regs = self.registers
+        constants = self.constants
+        globals = self.globals.store
+        while ip < len(ins):
+            match ins[ip]:
+                case RegisterOpCodes.OpLoadConstant:
+                    regs[base + ins[ip + 1]] = constants[ins[ip + 2]]
+                    ip += 3
+                case RegisterOpCodes.OpSub:
+                    left, right = regs[base + ins[ip + 2]], regs[base + ins[ip + 3]]
+                    if type(left) is Integer and type(right) is Integer:
+                        regs[base + ins[ip + 1]] = Integer(value=left.value - right.value)
+                    else:
+                        regs[base + ins[ip + 1]] = binary_operation(ins[ip], left, right)
+                    ip += 4
+                case RegisterOpCodes.OpAdd:
+                    left, right = regs[base + ins[ip + 2]], regs[base + ins[ip + 3]]
+                    if type(left) is Integer and type(right) is Integer:
+                        regs[base + ins[ip + 1]] = Integer(value=left.value + right.value)
+                    else:
+                        regs[base + ins[ip + 1]] = binary_operation(ins[ip], left, right)
+                    ip += 4
+                case RegisterOpCodes.OpGreaterThan:
+                    left, right = regs[base + ins[ip + 2]], regs[base + ins[ip + 3]]
+                    if type(left) is Integer and type(right) is Integer:
+                        regs[base + ins[ip + 1]] = TRUE if left.value > right.value else FALSE
+                    else:
+                        regs[base + ins[ip + 1]] = comparison(ins[ip], left, right)
+                    ip += 4
+                case RegisterOpCodes.OpJumpNotTruthy:
+                    condition = regs[base + ins[ip + 1]]
+                    if condition is TRUE:
+                        ip += 3
+                    elif condition is FALSE or condition is NULL:
+                        ip = ins[ip + 2]
+                    else:
+                        ip = ip + 3 if is_truthy(condition) else ins[ip + 2]  # type: ignore[arg-type]
+                case RegisterOpCodes.OpJump:
+                    ip = ins[ip + 1]
+                case RegisterOpCodes.OpGetGlobal:
+                    obj = globals[ins[ip + 2]] if ins[ip + 2] < len(globals) else None
+                    if obj is None:
+                        raise GetGlobalIndexError(f"global at index {ins[ip + 2]} is None")
+                    regs[base + ins[ip + 1]] = obj
+                    ip += 3
+                case RegisterOpCodes.OpCall:
+                    fn = regs[base + ins[ip + 2]]
+                    num_of_args = ins[ip + 3]
+                    if not isinstance(fn, CompiledFunction):
+                        raise RuntimeError(f"calling non-function: type: {type(fn)}, value: {fn}")
+                    if fn.num_of_parameters != num_of_args:
+                        raise RuntimeError(
+                            f"wrong number of arguments: want={fn.num_of_parameters}, "
+                            f"got={num_of_args}"
+                        )
+                    new_base = base + ins[ip + 2] + 1
+                    top = new_base + fn.num_of_locals
+                    if len(frames) >= MAX_FRAMES or top > STACK_SIZE:
+                        raise StackOverflow(f"Stack overflow: call depth is {len(frames)}")
+                    if top > len(regs):
+                        regs.extend([None] * (min(max(top, 2 * len(regs)), STACK_SIZE) - len(regs)))
+                    frame.ip = ip + 4
+                    frame = RegisterFrame(
+                        fn=fn, base_pointer=new_base, return_register=base + ins[ip + 1]
+                    )
+                    frames.append(frame)
+                    ins = fn.instructions.inst
+                    base = new_base
+                    ip = 0
+                case RegisterOpCodes.OpReturnValue | RegisterOpCodes.OpReturn:
+                    if ins[ip] == RegisterOpCodes.OpReturn:
+                        value: Object | None = NULL
+                    else:
+                        value = regs[base + ins[ip + 1]]
+                    if len(frames) == 1:
+                        self.result = value
+                        break
+                    return_register = frame.return_register
+                    frames.pop()
+                    frame = frames[-1]
+                    regs[return_register] = value
+                    ins = frame.fn.instructions.inst
+                    base = frame.base_pointer
+                    ip = frame.ip
+                case RegisterOpCodes.OpMove:
+                    regs[base + ins[ip + 1]] = regs[base + ins[ip + 2]]
+                    ip += 3
+                case RegisterOpCodes.OpMul | RegisterOpCodes.OpDiv:
+                    left, right = regs[base + ins[ip + 2]], regs[base + ins[ip + 3]]
+                    regs[base + ins[ip + 1]] = binary_operation(ins[ip], left, right)
+                    ip += 4
+                case RegisterOpCodes.OpEqual | RegisterOpCodes.OpNotEqual:
+                    left, right = regs[base + ins[ip + 2]], regs[base + ins[ip + 3]]
+                    regs[base + ins[ip + 1]] = comparison(ins[ip], left, right)
+                    ip += 4
+                case RegisterOpCodes.OpLoadTrue:
+                    regs[base + ins[ip + 1]] = TRUE
+                    ip += 2
+                case RegisterOpCodes.OpLoadFalse:
+                    regs[base + ins[ip + 1]] = FALSE
+                    ip += 2
+                case RegisterOpCodes.OpLoadNull:
+                    regs[base + ins[ip + 1]] = NULL
+                    ip += 2
+                case RegisterOpCodes.OpBang:
+                    operand = regs[base + ins[ip + 2]]
+                    regs[base + ins[ip + 1]] = TRUE if operand in (FALSE, NULL) else FALSE
+                    ip += 3
+                case RegisterOpCodes.OpMinus:
+                    operand = regs[base + ins[ip + 2]]
+                    if not isinstance(operand, Integer):
+                        raise TypeError(f"unsupported type for negation: {operand}")
+                    regs[base + ins[ip + 1]] = Integer(value=-operand.value)
+                    ip += 3
+                case RegisterOpCodes.OpSetGlobal:
+                    if ins[ip + 1] >= len(globals):
+                        self.globals.reserve(ins[ip + 1] + 1)
+                    self.result = globals[ins[ip + 1]] = regs[base + ins[ip + 2]]
+                    ip += 3
+                case RegisterOpCodes.OpArray:
+                    start = base + ins[ip + 2]
+                    elements = regs[start : start + ins[ip + 3]]
+                    regs[base + ins[ip + 1]] = Array(elements=elements)  # type: ignore[arg-type]
+                    ip += 4
+                case RegisterOpCodes.OpHash:
+                    start = base + ins[ip + 2]
+                    regs[base + ins[ip + 1]] = build_hash(regs[start : start + ins[ip + 3]])
+                    ip += 4
+                case RegisterOpCodes.OpIndex:
+                    left, index = regs[base + ins[ip + 2]], regs[base + ins[ip + 3]]
+                    regs[base + ins[ip + 1]] = execute_index(left, index)  # type: ignore[arg-type]
+                    ip += 4
+                case RegisterOpCodes.OpResult:
+                    self.result = regs[base + ins[ip + 1]]
+                    ip += 2
+                case _:
+                    raise RuntimeError(f"unknown opcode: {ins[ip]}")
+        frame.ip = ip
+
+
+def binary_operation(opcode: int, left: Object | None, right: Object | None) -> Object:
+    if isinstance(left, Integer) and isinstance(right, Integer):
+        match opcode:
+            case RegisterOpCodes.OpAdd:
+                return Integer(value=left.value + right.value)
+            case RegisterOpCodes.OpSub:
+                return Integer(value=left.value - right.value)
+            case RegisterOpCodes.OpMul:
+                return Integer(value=left.value * right.value)
+            case RegisterOpCodes.OpDiv:
+                return Integer(value=left.value // right.value)
+    if isinstance(left, String) and isinstance(right, String):
+        if opcode != RegisterOpCodes.OpAdd:
+            raise TypeError(f"unknown string operation: {opcode}")
+        return String(value=left.value + right.value)
+    raise TypeError(f"unsupported types for binary operation: {left} {right}")
+
+
+def comparison(opcode: int, left: Object | None, right: Object | None) -> Object:
+    if isinstance(left, Integer) and isinstance(right, Integer):
+        match opcode:
+            case RegisterOpCodes.OpEqual:
+                return TRUE if left.value == right.value else FALSE
+            case RegisterOpCodes.OpNotEqual:
+                return TRUE if left.value != right.value else FALSE
+            case RegisterOpCodes.OpGreaterThan:
+                return TRUE if left.value > right.value else FALSE
+    match opcode:
+        case RegisterOpCodes.OpEqual:
+            return TRUE if left == right else FALSE
+        case RegisterOpCodes.OpNotEqual:
+            return TRUE if left != right else FALSE
+    raise TypeError(f"unknown operator: {opcode} ({left} {right})")
+
+
+def is_truthy(obj: Object) -> bool:
+    if isinstance(obj, Boolean):
+        return obj.value
+    return obj is not NULL
+
+
+def build_hash(items: list[Object | None]) -> Hash:
+    pairs: dict[Hashable, HashPair] = {}
+    for key, value in zip(items[::2], items[1::2], strict=True):
+        if key is None or value is None or not isinstance(key, Hashable):
+            raise InvalidHashKeyError(f"unsupported hash key: {key}")
+        pairs[key] = HashPair(key=key, value=value)
+    return Hash(pairs=pairs)
+
+
+def execute_index(left: Object, index: Object) -> Object:
+    if isinstance(left, Array) and isinstance(index, Integer):
+        if index.value < 0 or index.value >= len(left.elements):
+            return NULL
+        return left.elements[index.value]
+    if isinstance(left, Hash):
+        if not isinstance(index, Hashable):
+            raise InvalidHashKeyError(f"unusable as hash key: {index.type()}")
+        pair = left.pairs.get(index)
+        return NULL if pair is None else pair.value
+    raise TypeError(f"index operator not supported: {left.type()}")
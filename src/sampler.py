@@ -0,0 +1,106 @@
+import argparse
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.compiler import Compiler
+from src.lexer import Lexer
+from src.libparser import Parser
+from src.object import CompiledFunction
+from src.profiler import ANONYMOUS, MAIN
+from src.vm import VM
+
+DEFAULT_INTERVAL = 0.01
+
+Stack = tuple[tuple[int, int], ...]
+
+
+@dataclass
+class SamplingProfiler:
+    vm: VM
+    interval: float = DEFAULT_INTERVAL
+    samples: Counter[Stack] = field(default_factory=Counter)
+    functions: dict[int, CompiledFunction] = field(default_factory=dict)
+    stopped: threading.Event = field(default_factory=threading.Event)
+    thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.loop, name="monkey-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def loop(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        stack = []
+        for frame in self.vm.frames[: self.vm.frame_index]:
+            if frame is None:
+                continue
+            self.functions.setdefault(id(frame.fn), frame.fn)
+            stack.append((id(frame.fn), frame.ip))
+        if stack:
+            self.samples[tuple(stack)] += 1
+
+    def location(self, fn_id: int, ip: int, main: bool) -> str:
+        fn = self.functions[fn_id]
+        name = MAIN if main else fn.name or ANONYMOUS
+        return f"{name}:{fn.instructions.line(max(ip, 0))}"
+
+    def stacks(self) -> Counter[tuple[str, ...]]:
+        stacks: Counter[tuple[str, ...]] = Counter()
+        for stack, count in self.samples.items():
+            locations = tuple(self.location(f, ip, i == 0) for i, (f, ip) in enumerate(stack))
+            stacks[locations] += count
+        return stacks
+
+    def report(self, top: int = 20) -> str:
+        lines: Counter[str] = Counter()
+        for stack, count in self.stacks().items():
+            lines[stack[-1]] += count
+        total = sum(lines.values()) or 1
+        output = [f"{'location':<32} {'samples':>10} {'time':>7}"]
+        for location, count in lines.most_common(top):
+            output.append(f"{location:<32} {count:>10} {count / total:>7.1%}")
+        return "\n".join(output)
+
+    def collapsed(self) -> str:
+        return "\n".join(
+            f"{';'.join(stack)} {count}" for stack, count in sorted(self.stacks().items())
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.sampler")
+    parser.add_argument("file", help="Monkey source file to run")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--output", help="write collapsed stacks for flamegraph tools")
+    parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        program = Parser(lexer=Lexer(f.read())).parse_program()
+    compiler = Compiler(optimize=args.optimize)
+    compiler.compile(program)
+    vm = VM.from_compiler(compiler=compiler)
+    sampler = SamplingProfiler(vm=vm, interval=args.interval)
+    sampler.start()
+    try:
+        vm.run()
+    finally:
+        sampler.stop()
+    print(sampler.report())
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(sampler.collapsed() + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+from collections.abc import Callable
+from dataclasses import asdict
+from typing import Any, TypeVar
+
+from src.batch import (
+    BatchResult,
+    Outcome,
+    Script,
+    compile_source,
+    execute,
+    run_script,
+    warm_up,
+)
+from src.bytecode import Instructions, OpCodes, lookup, read_operands
+from src.client import DEFAULT_SOCKET
+from src.compiler import Bytecode
+from src.object import CompiledFunction, Integer, Object, String
+from src.vm import BUILTINS, GLOBALS_SIZE, VM
+
+S = TypeVar("S", bound=socketserver.UnixStreamServer)
+
+JUMPS = {OpCodes.OpJump, OpCodes.OpJumpNotTruthy, OpCodes.OpJumpTruthy}
+
+
+class BytecodeError(Exception):
+    pass
+
+
+def dump_constant(obj: Object) -> dict[str, Any]:
+    match obj:
+        case Integer():
+            return {"type": "INTEGER", "value": obj.value}
+        case String():
+            return {"type": "STRING", "value": obj.value}
+        case CompiledFunction():
+            return {
+                "type": "COMPILED_FUNCTION",
+                "instructions": obj.instructions.inst,
+                "num_of_locals": obj.num_of_locals,
+                "num_of_parameters": obj.num_of_parameters,
+                "name": obj.name,
+            }
+        case _:
+            raise BytecodeError(f"cannot encode constant: {obj.type()}")
+
+
+def dump_bytecode(bytecode: Bytecode) -> dict[str, Any]:
+    return {
+        "instructions": bytecode.instructions.inst,
+        "constants": [dump_constant(c) for c in bytecode.constants],
+    }
+
+
+def load_instructions(data: Any) -> Instructions:
+    if not isinstance(data, list) or not all(type(b) is int and 0 <= b < 256 for b in data):
+        raise BytecodeError("instructions must be a list of bytes")
+    return Instructions(inst=data)
+
+
+def load_constant(data: Any) -> Object:
+    match data:
+        case {"type": "INTEGER", "value": int(value)}:
+            return Integer(value=value)
+        case {"type": "STRING", "value": str(value)}:
+            return String(value=value)
+        case {
+            "type": "COMPILED_FUNCTION",
+            "instructions": instructions,
+            "num_of_locals": int(num_of_locals),
+            "num_of_parameters": int(num_of_parameters),
+            "name": str(name),
+        } if (
+            0 <= num_of_parameters <= num_of_locals
+        ):
+            return CompiledFunction(
+                instructions=load_instructions(instructions),
+                num_of_locals=num_of_locals,
+                num_of_parameters=num_of_parameters,
+                name=name,
+            )
+        case _:
+            raise BytecodeError(f"invalid constant: {data!r:.100}")
+
+
+def operand_limits(constants: list[Object], num_of_locals: int) -> dict[OpCodes, int]:
+    return {
+        OpCodes.OpConstant: len(constants),
+        OpCodes.OpGetGlobal: GLOBALS_SIZE,
+        OpCodes.OpSetGlobal: GLOBALS_SIZE,
+        OpCodes.OpGetLocal: num_of_locals,
+        OpCodes.OpSetLocal: num_of_locals,
+        OpCodes.OpGetBuiltin: len(BUILTINS),
+    }
+
+
+def check_instructions(
+    instructions: Instructions, constants: list[Object], num_of_locals: int = 0
+) -> None:
+    inst = instructions.inst
+    limits = operand_limits(constants, num_of_locals)
+    boundaries = set()
+    jumps = []
+    ip = 0
+    while ip < len(inst):
+        definition = lookup(inst[ip])
+        if definition is None:
+            raise BytecodeError(f"unknown opcode {inst[ip]} at {ip}")
+        end = ip + 1 + sum(definition.operand_widths)
+        if end > len(inst):
+            raise BytecodeError(f"truncated {definition.name} at {ip}")
+        operands = read_operands(definition, inst[ip + 1 : end]).operands
+        opcode = OpCodes(inst[ip])
+        if opcode in JUMPS:
+            if operands[0] <= ip:
+                raise BytecodeError(f"{definition.name} at {ip} does not jump forward")
+            jumps.append((ip, operands[0]))
+        elif opcode in limits and operands[0] >= limits[opcode]:
+            raise BytecodeError(f"{definition.name} operand {operands[0]} at {ip} is out of range")
+        boundaries.add(ip)
+        ip = end
+    boundaries.add(len(inst))
+    for ip, target in jumps:
+        if target not in boundaries:
+            raise BytecodeError(f"jump at {ip} to {target} is not an instruction boundary")
+
+
+def load_bytecode(data: Any) -> VM:
+    match data:
+        case {"instructions": instructions, "constants": list(constants)}:
+            bytecode = Bytecode(
+                instructions=load_instructions(instructions),
+                constants=[load_constant(c) for c in constants],
+            )
+        case _:
+            raise BytecodeError("expected an object with instructions and constants")
+    check_instructions(bytecode.instructions, bytecode.constants)
+    for constant in bytecode.constants:
+        if isinstance(constant, CompiledFunction):
+            check_instructions(constant.instructions, bytecode.constants, constant.num_of_locals)
+    return VM.from_bytecode(bytecode)
+
+
+def handle_request(request: Any) -> BatchResult:
+    if not isinstance(request, dict):
+        return BatchResult(name="request", outcome=Outcome.ERROR, error="expected a JSON object")
+    timeout = request.get("timeout")
+    if "bytecode" in request:
+        return execute("bytecode", lambda: load_bytecode(request["bytecode"]), timeout)
+    if "source" in request:
+        script = Script(name="source", source=request["source"])
+        return run_script(script, timeout, request.get("optimize", False))
+    return BatchResult(name="request", outcome=Outcome.ERROR, error="expected source or bytecode")
+
+
+class MonkeyHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            result = handle_request(json.loads(self.rfile.readline()))
+        except (ValueError, TypeError) as e:
+            result = BatchResult(name="request", outcome=Outcome.ERROR, error=f"bad request: {e}")
+        self.wfile.write(json.dumps(asdict(result)).encode() + b"\n")
+
+
+def remove_stale_socket(path: str) -> None:
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise FileExistsError(f"{path} is in use by another server")
+
+
+def bind_private(path: str, bind: Callable[[str], S]) -> S:
+    remove_stale_socket(path)
+    umask = os.umask(0o177)
+    try:
+        return bind(path)
+    finally:
+        os.umask(umask)
+
+
+def make_server(path: str) -> socketserver.UnixStreamServer:
+    server = bind_private(path, lambda p: socketserver.UnixStreamServer(p, MonkeyHandler))
+    warm_up()
+    return server
+
+
+def serve(path: str, workers: int = 1) -> None:
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with make_server(path) as server:
+        children = []
+        for _ in range(workers - 1):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    server.serve_forever()
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        try:
+            server.serve_forever()
+        finally:
+            for pid in children:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            os.unlink(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.server")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="serve requests on a Unix socket")
+    serve_parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    compile_parser = commands.add_parser("compile", help="compile a file to bytecode")
+    compile_parser.add_argument("file", help="Monkey source file to compile")
+    compile_parser.add_argument("output", help="bytecode file to write")
+    compile_parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket, args.workers)
+    else:
+        with open(args.file) as f:
+            compiler = compile_source(f.read(), args.optimize)
+        with open(args.output, "w") as f:
+            json.dump(dump_bytecode(compiler.bytecode()), f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import io
+import pickle
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from src.batch import compile_source
+from src.compiler import Compiler
+from src.frame import Frame
+from src.libbuiltins import builtins
+from src.object import Object
+from src.symbol_table import SymbolTable
+from src.vm import FALSE, MAX_FRAMES, NULL, STACK_SIZE, TRUE, VM
+
+VERSION = 1
+
+SHARED: dict[str, Object] = {
+    "TRUE": TRUE,
+    "FALSE": FALSE,
+    "NULL": NULL,
+    **{f"builtin:{name}": builtin for name, builtin in builtins.items()},
+}
+SHARED_IDS = {id(obj): key for key, obj in SHARED.items()}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotPickler(pickle.Pickler):
+    def persistent_id(self, obj: Any) -> str | None:
+        return SHARED_IDS.get(id(obj))
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid: Any) -> Object:
+        try:
+            return SHARED[pid]
+        except KeyError:
+            raise pickle.UnpicklingError(f"unknown shared object: {pid}") from None
+
+
+@dataclass
+class Snapshot:
+    constants: list[Object]
+    globals: list[Object | None]
+    symbol_table: SymbolTable = field(default_factory=SymbolTable)
+    frames: list[Frame] = field(default_factory=list)
+    stack: list[Object | None] = field(default_factory=list)
+    stack_size: int = STACK_SIZE
+    max_frames: int = MAX_FRAMES
+    version: int = VERSION
+
+    @classmethod
+    def take(cls, vm: VM, symbol_table: SymbolTable | None = None) -> Self:
+        if vm.awaiting is not None:
+            raise SnapshotError("cannot snapshot a VM that is awaiting an async builtin")
+        used = len(vm.globals.store)
+        while used > 0 and vm.globals.store[used - 1] is None:
+            used -= 1
+        return cls(
+            constants=vm.constants,
+            globals=vm.globals.store[:used],
+            symbol_table=SymbolTable() if symbol_table is None else symbol_table,
+            frames=vm.frames[: vm.frame_index],  # type: ignore[arg-type]
+            stack=vm.stack.store[: vm.stack.sp + 1],
+            stack_size=vm.stack.stack_size,
+            max_frames=vm.max_frames,
+        )
+
+    def restore(self) -> VM:
+        vm = VM(constants=self.constants, frames=list(self.frames), frame_index=len(self.frames))
+        vm.set_limits(self.stack_size, self.max_frames)
+        vm.globals.reserve(len(self.globals))
+        vm.globals.store[: len(self.globals)] = self.globals
+        vm.stack.reserve(len(self.stack))
+        vm.stack.store[: len(self.stack)] = self.stack
+        vm.stack.sp = max(len(self.stack) - 1, 0)
+        return vm
+
+    def compiler(self) -> Compiler:
+        return Compiler.with_new_state(self.symbol_table, self.constants)
+
+    def dumps(self) -> bytes:
+        buffer = io.BytesIO()
+        SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(self)
+        return zlib.compress(buffer.getvalue())
+
+    @classmethod
+    def loads(cls, data: bytes) -> Self:
+        try:
+            snapshot = SnapshotUnpickler(io.BytesIO(zlib.decompress(data))).load()
+        except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+            raise SnapshotError(f"invalid snapshot: {e}") from e
+        if not isinstance(snapshot, cls):
+            raise SnapshotError(f"expected Snapshot, got {type(snapshot).__name__}")
+        if snapshot.version != VERSION:
+            raise SnapshotError(f"unsupported snapshot version: {snapshot.version}")
+        return snapshot
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: str) -> Self:
+        with open(path, "rb") as f:
+            return cls.loads(f.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.snapshot")
+    parser.add_argument("file", help="Monkey source file to run")
+    parser.add_argument("output", help="snapshot file to write")
+    parser.add_argument("--max-calls", type=int, help="pause after this many calls")
+    parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        compiler = compile_source(f.read(), args.optimize)
+    vm = VM.from_compiler(compiler=compiler)
+    status = vm.run(max_calls=args.max_calls)
+    Snapshot.take(vm, compiler.symbol_table).save(args.output)
+    print(f"{status}: wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
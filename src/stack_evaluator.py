@@ -0,0 +1,360 @@
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+
+from src.evaluator import (
+    FALSE,
+    NULL,
+    TRUE,
+    ErrorSignal,
+    eval_identifier,
+    eval_index_expression,
+    eval_infix_expression,
+    eval_prefix_expression,
+    extend_function_env,
+    fail,
+    is_truthy,
+    make_function,
+)
+from src.libast import (
+    ArrayLiteral,
+    BlockStatement,
+    Boolean,
+    CallExpression,
+    Expression,
+    ExpressionStatement,
+    FunctionLiteral,
+    HashLiteral,
+    Identifier,
+    IfExpression,
+    IndexExpression,
+    InfixExpression,
+    IntegerLiteral,
+    LetStatement,
+    Node,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+    Statement,
+    StringLiteral,
+)
+from src.object import (
+    Array,
+    Builtin,
+    Environment,
+    Error,
+    Function,
+    Hash,
+    HashPair,
+    Integer,
+    Memoized,
+    Object,
+    ReturnValue,
+    String,
+    memo_key,
+)
+
+
+@dataclass(slots=True)
+class Statements:
+    statements: list[Statement]
+    env: Environment
+    index: int = 1
+
+
+@dataclass(slots=True)
+class Prefix:
+    operator: str
+
+
+@dataclass(slots=True)
+class InfixLeft:
+    node: InfixExpression
+    env: Environment
+
+
+@dataclass(slots=True)
+class InfixRight:
+    operator: str
+    left: Object
+
+
+@dataclass(slots=True)
+class Condition:
+    node: IfExpression
+    env: Environment
+
+
+@dataclass(slots=True)
+class Return:
+    pass
+
+
+@dataclass(slots=True)
+class Let:
+    name: str
+    env: Environment
+
+
+@dataclass(slots=True)
+class Callee:
+    node: CallExpression
+    env: Environment
+
+
+@dataclass(slots=True)
+class Arguments:
+    function: Object
+    nodes: list[Expression]
+    env: Environment
+    values: list[Object] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Elements:
+    nodes: list[Expression]
+    env: Environment
+    values: list[Object] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class IndexLeft:
+    node: IndexExpression
+    env: Environment
+
+
+@dataclass(slots=True)
+class IndexRight:
+    left: Object
+
+
+@dataclass(slots=True)
+class HashPairs:
+    items: list[tuple[Expression, Expression]]
+    env: Environment
+    pairs: dict[Hashable, HashPair] = field(default_factory=dict)
+    index: int = 0
+    key: Object | None = None
+
+
+@dataclass(slots=True)
+class FunctionReturn:
+    pass
+
+
+@dataclass(slots=True)
+class MemoStore:
+    function: Memoized
+    key: Hashable
+
+
+Continuation = (
+    Statements
+    | Prefix
+    | InfixLeft
+    | InfixRight
+    | Condition
+    | Return
+    | Let
+    | Callee
+    | Arguments
+    | Elements
+    | IndexLeft
+    | IndexRight
+    | HashPairs
+    | FunctionReturn
+    | MemoStore
+)
+
+RETURN = Return()
+FUNCTION_RETURN = FunctionReturn()
+
+
+def call(
+    func: Object, args: list[Object], env: Environment, stack: list[Continuation]
+) -> tuple[BlockStatement | None, Environment, Object]:
+    while True:
+        match func:
+            case Function():
+                stack.append(FUNCTION_RETURN)
+                return func.body, extend_function_env(func, args), NULL
+            case Memoized():
+                key = memo_key(args)
+                if key is not None:
+                    result = func.lookup(key)
+                    if result is not None:
+                        return None, env, result
+                    stack.append(MemoStore(function=func, key=key))
+                func = func.fn
+            case Builtin():
+                result = func.fn(*args)
+                if isinstance(result, Error):
+                    raise ErrorSignal(result)
+                return None, env, result
+            case _:
+                fail(f"not a function or builtin: {func.type()}")
+
+
+def eval(node: Node | None, env: Environment) -> Object:
+    try:
+        return run(node, env)
+    except ErrorSignal as signal:
+        return signal.error
+
+
+def run(node: Node | None, env: Environment) -> Object:  # noqa: C901
+    program = isinstance(node, Program)
+    stack: list[Continuation] = []
+    while True:
+        match node:
+            case IntegerLiteral():
+                value: Object = Integer(value=node.value)
+            case Identifier():
+                value = eval_identifier(node, env)
+            case InfixExpression():
+                stack.append(InfixLeft(node=node, env=env))
+                node = node.left
+                continue
+            case ExpressionStatement():
+                node = node.expression
+                continue
+            case CallExpression():
+                stack.append(Callee(node=node, env=env))
+                node = node.function
+                continue
+            case IfExpression():
+                stack.append(Condition(node=node, env=env))
+                node = node.condition
+                continue
+            case BlockStatement() | Program():
+                if not node.statements:
+                    value = NULL
+                else:
+                    stack.append(Statements(statements=node.statements, env=env))
+                    node = node.statements[0]
+                    continue
+            case Boolean():
+                value = TRUE if node.value else FALSE
+            case PrefixExpression():
+                stack.append(Prefix(operator=node.operator))
+                node = node.right
+                continue
+            case ReturnStatement():
+                stack.append(RETURN)
+                node = node.return_value
+                continue
+            case LetStatement():
+                stack.append(Let(name=node.name.value, env=env))
+                node = node.value
+                continue
+            case FunctionLiteral():
+                value = make_function(node, env)
+            case StringLiteral():
+                value = String(value=node.value)
+            case ArrayLiteral():
+                if not node.elements:
+                    value = Array(elements=[])
+                else:
+                    stack.append(Elements(nodes=node.elements, env=env))
+                    node = node.elements[0]
+                    continue
+            case IndexExpression():
+                stack.append(IndexLeft(node=node, env=env))
+                node = node.left
+                continue
+            case HashLiteral():
+                if not node.pairs:
+                    value = Hash(pairs={})
+                else:
+                    items = list(node.pairs.items())
+                    stack.append(HashPairs(items=items, env=env))
+                    node = items[0][0]
+                    continue
+            case _:
+                value = NULL
+
+        while True:
+            if not stack:
+                return value
+            k = stack.pop()
+            match k:
+                case InfixLeft():
+                    stack.append(InfixRight(operator=k.node.operator, left=value))
+                    node, env = k.node.right, k.env
+                    break
+                case InfixRight():
+                    value = eval_infix_expression(k.operator, k.left, value)
+                case FunctionReturn():
+                    pass
+                case Condition():
+                    if is_truthy(value):
+                        node, env = k.node.consequence, k.env
+                        break
+                    if k.node.alternative is not None:
+                        node, env = k.node.alternative, k.env
+                        break
+                    value = NULL
+                case Statements():
+                    if k.index < len(k.statements):
+                        node, env = k.statements[k.index], k.env
+                        k.index += 1
+                        stack.append(k)
+                        break
+                case Callee():
+                    if not k.node.arguments:
+                        node, env, value = call(value, [], env, stack)
+                        if node is not None:
+                            break
+                        continue
+                    stack.append(Arguments(function=value, nodes=k.node.arguments, env=k.env))
+                    node, env = k.node.arguments[0], k.env
+                    break
+                case Arguments():
+                    k.values.append(value)
+                    if len(k.values) < len(k.nodes):
+                        node, env = k.nodes[len(k.values)], k.env
+                        stack.append(k)
+                        break
+                    node, env, value = call(k.function, k.values, k.env, stack)
+                    if node is not None:
+                        break
+                case MemoStore():
+                    k.function.store(k.key, value)
+                case Prefix():
+                    value = eval_prefix_expression(k.operator, value)
+                case Return():
+                    while stack and stack[-1] is not FUNCTION_RETURN:
+                        stack.pop()
+                    if not stack and not program:
+                        value = ReturnValue(value=value)
+                case Let():
+                    k.env[k.name] = value
+                    value = NULL
+                case Elements():
+                    k.values.append(value)
+                    if len(k.values) < len(k.nodes):
+                        node, env = k.nodes[len(k.values)], k.env
+                        stack.append(k)
+                        break
+                    value = Array(elements=k.values)
+                case IndexLeft():
+                    stack.append(IndexRight(left=value))
+                    node, env = k.node.index, k.env
+                    break
+                case IndexRight():
+                    value = eval_index_expression(k.left, value)
+                case HashPairs():
+                    if k.key is None:
+                        if not isinstance(value, Hashable):
+                            fail(f"unusable as hash key: {value.type()}")
+                        k.key = value
+                        node, env = k.items[k.index][1], k.env
+                        stack.append(k)
+                        break
+                    k.pairs[k.key] = HashPair(key=k.key, value=value)  # type: ignore[index]
+                    k.key = None
+                    k.index += 1
+                    if k.index < len(k.items):
+                        node, env = k.items[k.index][0], k.env
+                        stack.append(k)
+                        break
+                    value = Hash(pairs=k.pairs)
@@ -40,6 +40,11 @@ class SymbolTable:
         self.num_definitions += 1
         return symbol
 
+    def define_builtin(self, index: int, name: str) -> Symbol:
+        symbol = Symbol(name=name, scope=SymbolScope.BUILTIN, index=index)
+        self.store[name] = symbol
+        return symbol
+
     def resolve(self, name: str) -> Symbol | None:
         symbol = self.store.get(name)
         if symbol is None and self.outer is not None:
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import StrEnum
 
 
@@ -40,6 +40,7 @@ class TokenType(StrEnum):
 class Token:
     token_type: TokenType
     literal: str
+    line: int = field(default=0, compare=False)
 
     def has_token_type(self, token_type: TokenType) -> bool:
         return self.token_type == token_type
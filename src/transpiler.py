@@ -0,0 +1,639 @@
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from src.analysis import let_statements
+from src.libast import (
+    ArrayLiteral,
+    BlockStatement,
+    Boolean,
+    CallExpression,
+    Expression,
+    ExpressionStatement,
+    FunctionLiteral,
+    HashLiteral,
+    Identifier,
+    IfExpression,
+    IndexExpression,
+    InfixExpression,
+    IntegerLiteral,
+    LetStatement,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+    Statement,
+    StringLiteral,
+)
+from src.object import Array
+from src.object import Boolean as BooleanObject
+from src.object import Builtin, Error, Hash, HashPair, Integer, Null, Object, String
+
+NULL = Null()
+TRUE = BooleanObject(value=True)
+FALSE = BooleanObject(value=False)
+
+ENTRY_POINT = "monkey_main"
+RETURN = "return"
+INDENT = "    "
+
+ARITHMETIC_OPERATORS = {"+": "_add", "-": "_sub", "*": "_mul", "/": "_div"}
+COMPARISON_OPERATORS = {"<": "_lt", ">": "_gt"}
+NATIVE_OPERATORS = {"+": "+", "-": "-", "*": "*", "/": "//", "<": "<", ">": ">"}
+
+
+class TranspileError(Exception):
+    pass
+
+
+class MonkeyRuntimeError(Exception):
+    pass
+
+
+def type_name(value: Any) -> str:
+    match value:
+        case bool():
+            return "BOOLEAN"
+        case int():
+            return "INTEGER"
+        case None:
+            return "NULL"
+        case str():
+            return "STRING"
+        case list():
+            return "ARRAY"
+        case dict():
+            return "HASH"
+        case _ if getattr(value, "__monkey_builtin__", False):
+            return "BUILTIN"
+        case _ if hasattr(value, "__monkey_memoized__"):
+            return "MEMOIZED"
+        case _:
+            return "FUNCTION"
+
+
+def inspect(value: Any) -> str:
+    match value:
+        case None:
+            return "null"
+        case bool() | int() | str():
+            return str(value)
+        case list():
+            return f"[{', '.join(inspect(e) for e in value)}]"
+        case dict():
+            pairs = [f"{inspect(k)}: {inspect(v)}" for k, v in value.values()]
+            return f"{{{', '.join(pairs)}}}"
+        case _ if getattr(value, "__monkey_builtin__", False):
+            return "builtin function"
+        case _ if hasattr(value, "__monkey_memoized__"):
+            fn, size = value.__monkey_memoized__
+            return f"memoized({inspect(fn)}, {size})"
+        case _:
+            return "fn"
+
+
+def _operator_error(left: Any, operator: str, right: Any) -> MonkeyRuntimeError:
+    if type_name(left) != type_name(right):
+        return MonkeyRuntimeError(f"type mismatch: {type_name(left)} {operator} {type_name(right)}")
+    return MonkeyRuntimeError(f"unknown operator: {type_name(left)} {operator} {type_name(right)}")
+
+
+def _add(left: Any, right: Any) -> Any:
+    if type(left) is type(right) and type(left) in (int, str):
+        return left + right
+    raise _operator_error(left, "+", right)
+
+
+def _sub(left: Any, right: Any) -> Any:
+    if type(left) is type(right) is int:
+        return left - right
+    raise _operator_error(left, "-", right)
+
+
+def _mul(left: Any, right: Any) -> Any:
+    if type(left) is type(right) is int:
+        return left * right
+    raise _operator_error(left, "*", right)
+
+
+def _div(left: Any, right: Any) -> Any:
+    if type(left) is type(right) is int:
+        return left // right
+    raise _operator_error(left, "/", right)
+
+
+def _lt(left: Any, right: Any) -> bool:
+    if type(left) is type(right) is int:
+        return bool(left < right)
+    raise _operator_error(left, "<", right)
+
+
+def _gt(left: Any, right: Any) -> bool:
+    if type(left) is type(right) is int:
+        return bool(left > right)
+    raise _operator_error(left, ">", right)
+
+
+def _neg(right: Any) -> int:
+    if type(right) is int:
+        return -right
+    raise MonkeyRuntimeError(f"unknown operator: -{type_name(right)}")
+
+
+def _hash_key(key: Any) -> Hashable:
+    if key is None or type(key) in (int, bool, str):
+        return (type(key), key)
+    raise MonkeyRuntimeError(f"unusable as hash key: {type_name(key)}")
+
+
+def _hash(pairs: list[tuple[Any, Any]]) -> dict[Hashable, tuple[Any, Any]]:
+    return {_hash_key(key): (key, value) for key, value in pairs}
+
+
+def _index(left: Any, index: Any) -> Any:
+    if type(left) is list and type(index) is int:
+        try:
+            return left[index]
+        except IndexError:
+            return None
+    if type(left) is dict:
+        pair = left.get(_hash_key(index))
+        return None if pair is None else pair[1]
+    raise MonkeyRuntimeError(f"index operator not supported: {type_name(left)}[{type_name(index)}]")
+
+
+def _unbound(name: str) -> Any:
+    raise MonkeyRuntimeError(f"identifier not found: {name}")
+
+
+def _builtin(fn: Callable[..., Any]) -> Callable[..., Any]:
+    fn.__monkey_builtin__ = True  # type: ignore[attr-defined]
+    return fn
+
+
+def _arity(args: tuple[Any, ...], want: int) -> None:
+    if len(args) != want:
+        raise MonkeyRuntimeError(f"wrong number of arguments. got={len(args)}, want={want}")
+
+
+@_builtin
+def b_len(*args: Any) -> Any:
+    _arity(args, 1)
+    if type(args[0]) in (str, list):
+        return len(args[0])
+    raise MonkeyRuntimeError(f"argument to 'len' not supported, got {type_name(args[0])}")
+
+
+@_builtin
+def b_first(*args: Any) -> Any:
+    _arity(args, 1)
+    if type(args[0]) is not list:
+        raise MonkeyRuntimeError(f"argument to 'first' must be ARRAY, got {type_name(args[0])}")
+    return args[0][0] if args[0] else None
+
+
+@_builtin
+def b_last(*args: Any) -> Any:
+    _arity(args, 1)
+    if type(args[0]) is not list:
+        raise MonkeyRuntimeError(f"argument to 'last' must be ARRAY, got {type_name(args[0])}")
+    return args[0][-1] if args[0] else None
+
+
+@_builtin
+def b_rest(*args: Any) -> Any:
+    _arity(args, 1)
+    if type(args[0]) is not list:
+        raise MonkeyRuntimeError(f"argument to 'rest' must be ARRAY, got {type_name(args[0])}")
+    return args[0][1:]
+
+
+@_builtin
+def b_push(*args: Any) -> Any:
+    _arity(args, 2)
+    if type(args[0]) is not list:
+        raise MonkeyRuntimeError(f"argument to 'push' must be ARRAY, got {type_name(args[0])}")
+    return [*args[0], args[1]]
+
+
+@_builtin
+def b_puts(*args: Any) -> Any:
+    for arg in args:
+        print(inspect(arg))
+
+
+def _memo_key(args: tuple[Any, ...] | list[Any]) -> Hashable | None:
+    key: list[Hashable] = []
+    for arg in args:
+        if arg is None or type(arg) in (int, bool, str):
+            key.append((type(arg), arg))
+        elif type(arg) is list:
+            elements = _memo_key(arg)
+            if elements is None:
+                return None
+            key.append(elements)
+        else:
+            return None
+    return tuple(key)
+
+
+@_builtin
+def b_memoize(*args: Any) -> Any:
+    _arity(args, 2)
+    fn, size = args
+    if not callable(fn):
+        raise MonkeyRuntimeError(f"argument to 'memoize' must be FUNCTION, got {type_name(fn)}")
+    if type(size) is not int or size < 1:
+        raise MonkeyRuntimeError(
+            f"size of 'memoize' must be a positive INTEGER, got {inspect(size)}"
+        )
+    cache: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def memoized(*call_args: Any) -> Any:
+        key = _memo_key(call_args)
+        if key is None:
+            return fn(*call_args)
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        result = cache[key] = fn(*call_args)
+        if len(cache) > size:
+            cache.popitem(last=False)
+        return result
+
+    memoized.__monkey_memoized__ = (fn, size)  # type: ignore[attr-defined]
+    return memoized
+
+
+runtime: dict[str, Any] = {
+    "_add": _add,
+    "_sub": _sub,
+    "_mul": _mul,
+    "_div": _div,
+    "_lt": _lt,
+    "_gt": _gt,
+    "_neg": _neg,
+    "_hash": _hash,
+    "_index": _index,
+    "_unbound": _unbound,
+    "b_len": b_len,
+    "b_first": b_first,
+    "b_last": b_last,
+    "b_rest": b_rest,
+    "b_push": b_push,
+    "b_puts": b_puts,
+    "b_memoize": b_memoize,
+}
+
+
+def to_object(value: Any) -> Object:
+    match value:
+        case None:
+            return NULL
+        case bool():
+            return TRUE if value else FALSE
+        case int():
+            return Integer(value=value)
+        case str():
+            return String(value=value)
+        case list():
+            return Array(elements=[to_object(e) for e in value])
+        case dict():
+            pairs: dict[Hashable, HashPair] = {}
+            for key, val in value.values():
+                key_obj = to_object(key)
+                if isinstance(key_obj, Hashable):
+                    pairs[key_obj] = HashPair(key=key_obj, value=to_object(val))
+            return Hash(pairs=pairs)
+        case _:
+            return Builtin(fn=lambda *args: to_object(value(*(to_native(a) for a in args))))
+
+
+def to_native(obj: Object) -> Any:
+    match obj:
+        case Null():
+            return None
+        case BooleanObject() | Integer() | String():
+            return obj.value
+        case Array():
+            return [to_native(e) for e in obj.elements]
+        case Hash():
+            return _hash([(to_native(p.key), to_native(p.value)) for p in obj.pairs.values()])
+        case _:
+            raise TranspileError(f"cannot pass {obj.type()} to transpiled code")
+
+
+@dataclass
+class Scope:
+    outer: Self | None = None
+    names: dict[str, str] = field(default_factory=dict)
+    assigned: set[str] = field(default_factory=set)
+    num_temps: int = 0
+
+    def declare(self, name: str) -> None:
+        if name in self.names:
+            return
+        python_name = f"v_{name}"
+        scope = self.outer
+        depth = 1
+        while scope is not None:
+            if python_name in scope.names.values():
+                python_name = f"v_{name}_{depth}"
+            scope = scope.outer
+            depth += 1
+        self.names[name] = python_name
+
+    def resolve(self, name: str) -> str | None:
+        scope: Scope | None = self
+        while scope is not None:
+            python_name = scope.names.get(name)
+            if python_name is not None and (scope is not self or name in scope.assigned):
+                return python_name
+            scope = scope.outer
+        return None
+
+    def new_temp(self) -> str:
+        self.num_temps += 1
+        return f"_t{self.num_temps}"
+
+
+@dataclass
+class Transpiler:
+    lines: list[str] = field(default_factory=list)
+    scope: Scope = field(default_factory=Scope)
+    indent: int = 0
+    num_functions: int = 0
+
+    def transpile(self, program: Program) -> str:
+        self.enter_scope(program.statements, [])
+        self.emit(f"def {ENTRY_POINT}():")
+        self.indent += 1
+        self.compile_statements(program.statements, RETURN)
+        self.leave_scope()
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, line: str) -> None:
+        self.lines.append(INDENT * self.indent + line)
+
+    def enter_scope(self, statements: list[Statement], parameters: list[Identifier]) -> None:
+        self.scope = Scope(outer=self.scope if self.indent > 0 else None)
+        for param in parameters:
+            self.scope.declare(param.value)
+            self.scope.assigned.add(param.value)
+        for let in let_statements(list(statements)):
+            self.scope.declare(let.name.value)
+
+    def leave_scope(self) -> None:
+        self.indent -= 1
+        if self.scope.outer is not None:
+            self.scope = self.scope.outer
+
+    def compile_statements(self, statements: list[Statement], target: str | None) -> None:
+        start = len(self.lines)
+        for i, statement in enumerate(statements):
+            is_last = i == len(statements) - 1
+            if isinstance(statement, ReturnStatement):
+                self.compile_return(statement)
+                return
+            if isinstance(statement, ExpressionStatement) and statement.expression is not None:
+                self.compile_expression_into(statement.expression, target if is_last else None)
+                continue
+            if isinstance(statement, LetStatement):
+                self.compile_let(statement)
+            if is_last:
+                self.assign_target(target, "None")
+        if not statements:
+            self.assign_target(target, "None")
+        if len(self.lines) == start:
+            self.emit("pass")
+
+    def compile_return(self, statement: ReturnStatement) -> None:
+        if statement.return_value is None:
+            self.emit("return None")
+            return
+        self.compile_expression_into(statement.return_value, RETURN)
+
+    def compile_let(self, statement: LetStatement) -> None:
+        name = statement.name.value
+        python_name = self.scope.names[name]
+        if isinstance(statement.value, FunctionLiteral):
+            self.scope.assigned.add(name)
+            self.compile_function(statement.value, python_name)
+            return
+        value = self.compile_expression(statement.value) if statement.value else "None"
+        self.scope.assigned.add(name)
+        self.emit(f"{python_name} = {value}")
+
+    def assign_target(self, target: str | None, value: str) -> None:
+        if target is None:
+            if not is_simple(value):
+                self.emit(value)
+            return
+        if target == RETURN:
+            self.emit(f"return {value}")
+            return
+        self.emit(f"{target} = {value}")
+
+    def compile_expression_into(self, node: Expression, target: str | None) -> None:
+        if isinstance(node, IfExpression):
+            self.compile_if(node, target)
+            return
+        self.assign_target(target, self.compile_expression(node))
+
+    def compile_if(self, node: IfExpression, target: str | None) -> None:
+        self.emit(f"if {self.compile_condition(node.condition)}:")
+        self.compile_block(node.consequence, target)
+        if node.alternative is None and target is None:
+            return
+        self.emit("else:")
+        if node.alternative is None:
+            self.indent += 1
+            self.assign_target(target, "None")
+            self.indent -= 1
+            return
+        self.compile_block(node.alternative, target)
+
+    def compile_block(self, block: BlockStatement, target: str | None) -> None:
+        self.indent += 1
+        self.compile_statements(block.statements, target)
+        self.indent -= 1
+
+    def compile_condition(self, node: Expression) -> str:
+        condition = self.compile_expression(node)
+        if produces_boolean(node):
+            return condition
+        if is_constant(condition):
+            return "False" if condition in ("False", "None") else "True"
+        if not is_simple(condition):
+            temp = self.scope.new_temp()
+            return f"({temp} := {condition}) is not False and {temp} is not None"
+        return f"{condition} is not False and {condition} is not None"
+
+    def compile_function(self, node: FunctionLiteral, python_name: str) -> None:
+        self.enter_scope(node.body.statements, node.parameters)
+        params = [self.scope.names[p.value] for p in node.parameters]
+        self.emit(f"def {python_name}({', '.join(params)}):")
+        self.indent += 1
+        self.compile_statements(node.body.statements, RETURN)
+        self.leave_scope()
+
+    def compile_expression(self, node: Expression | None) -> str:  # noqa: C901
+        match node:
+            case IntegerLiteral():
+                return str(node.value)
+            case Boolean():
+                return "True" if node.value else "False"
+            case StringLiteral():
+                return repr(node.value)
+            case Identifier():
+                return self.compile_identifier(node)
+            case PrefixExpression():
+                return self.compile_prefix(node)
+            case InfixExpression():
+                return self.compile_infix(node)
+            case IfExpression():
+                temp = self.scope.new_temp()
+                self.compile_if(node, temp)
+                return temp
+            case FunctionLiteral():
+                self.num_functions += 1
+                name = f"_fn{self.num_functions}"
+                self.compile_function(node, name)
+                return name
+            case CallExpression():
+                function, *args = self.compile_operands([node.function, *node.arguments])
+                return f"{function}({', '.join(args)})"
+            case ArrayLiteral():
+                elements = self.compile_operands(node.elements)
+                return f"[{', '.join(elements)}]"
+            case HashLiteral():
+                operands = self.compile_operands([e for pair in node.pairs.items() for e in pair])
+                pairs = [f"({k}, {v})" for k, v in zip(operands[::2], operands[1::2], strict=True)]
+                return f"_hash([{', '.join(pairs)}])"
+            case IndexExpression():
+                left, index = self.compile_operands([node.left, node.index])
+                return f"_index({left}, {index})"
+            case _:
+                raise TranspileError(f"unsupported expression: {node}")
+
+    def compile_identifier(self, node: Identifier) -> str:
+        python_name = self.scope.resolve(node.value)
+        if python_name is not None:
+            return python_name
+        if f"b_{node.value}" in runtime:
+            return f"b_{node.value}"
+        return f"_unbound({node.value!r})"
+
+    def compile_prefix(self, node: PrefixExpression) -> str:
+        right = self.compile_expression(node.right)
+        match node.operator:
+            case "!":
+                if is_constant(right):
+                    return "True" if right in ("False", "None") else "False"
+                if not is_simple(right):
+                    temp = self.scope.new_temp()
+                    return f"(({temp} := {right}) is False or {temp} is None)"
+                return f"({right} is False or {right} is None)"
+            case "-":
+                if isinstance(node.right, IntegerLiteral):
+                    return f"(-{right})"
+                return f"_neg({right})"
+            case _:
+                raise TranspileError(f"unknown operator {node.operator}")
+
+    def compile_infix(self, node: InfixExpression) -> str:
+        left, right = self.compile_operands([node.left, node.right])
+        match node.operator:
+            case "==" | "!=":
+                return f"({left} {node.operator} {right})"
+            case "+" | "-" | "*" | "/" | "<" | ">":
+                return self.guarded_operation(node, left, right)
+            case _:
+                raise TranspileError(f"unknown operator {node.operator}")
+
+    def guarded_operation(self, node: InfixExpression, left: str, right: str) -> str:
+        operator = NATIVE_OPERATORS[node.operator]
+        fallback = ARITHMETIC_OPERATORS.get(node.operator) or COMPARISON_OPERATORS[node.operator]
+        guards = []
+        if not isinstance(node.left, IntegerLiteral):
+            if not is_simple(left):
+                temp = self.scope.new_temp()
+                guards.append(f"({temp} := {left})")
+                left = temp
+            else:
+                guards.append(left)
+        if not isinstance(node.right, IntegerLiteral):
+            if not is_simple(right):
+                temp = self.scope.new_temp()
+                guards.append(f"({temp} := {right})")
+                right = temp
+            else:
+                guards.append(right)
+        fast = f"{left} {operator} {right}"
+        if not guards:
+            return f"({fast})"
+        guard = " is ".join(f"type({g})" for g in guards) + " is int"
+        return f"({fast} if {guard} else {fallback}({left}, {right}))"
+
+    def compile_operands(self, nodes: list[Expression]) -> list[str]:
+        operands: list[str] = []
+        for node in nodes:
+            mark = len(self.lines)
+            operand = self.compile_expression(node)
+            if len(self.lines) > mark:
+                hoisted = []
+                for i, previous in enumerate(operands):
+                    if not is_constant(previous):
+                        temp = self.scope.new_temp()
+                        hoisted.append(INDENT * self.indent + f"{temp} = {previous}")
+                        operands[i] = temp
+                self.lines[mark:mark] = hoisted
+            operands.append(operand)
+        return operands
+
+
+def produces_boolean(node: Expression) -> bool:
+    if isinstance(node, Boolean):
+        return True
+    if isinstance(node, InfixExpression):
+        return node.operator in ("==", "!=", "<", ">")
+    return isinstance(node, PrefixExpression) and node.operator == "!"
+
+
+def is_constant(expression: str) -> bool:
+    return expression in ("None", "True", "False") or expression.lstrip("-").isdigit()
+
+
+def is_simple(expression: str) -> bool:
+    return is_constant(expression) or expression.isidentifier()
+
+
+def transpile(program: Program) -> str:
+    return Transpiler().transpile(program)
+
+
+def load(program: Program) -> Callable[[], Any]:
+    source = transpile(program)
+    namespace = dict(runtime)
+    exec(compile(source, "<monkey>", "exec"), namespace)
+    entry_point: Callable[[], Any] = namespace[ENTRY_POINT]
+    return entry_point
+
+
+def run(program: Program) -> Object:
+    entry_point = load(program)
+    try:
+        return to_object(entry_point())
+    except MonkeyRuntimeError as e:
+        return Error(message=str(e))
+    except NameError as e:
+        return Error(message=f"identifier not found: {demangle(e.name)}")
+    except (TypeError, ZeroDivisionError) as e:
+        return Error(message=str(e))
+
+
+def demangle(python_name: str | None) -> str:
+    if python_name is None:
+        return ""
+    return re.sub(r"_\d+$", "", python_name.removeprefix("v_"))
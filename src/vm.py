@@ -1,25 +1,37 @@
-from collections.abc import Hashable
+import operator
+import sys
+from collections.abc import Awaitable, Callable, Coroutine, Hashable
 from dataclasses import dataclass, field
-from typing import Self
+from enum import StrEnum
+from typing import NoReturn, Self
 
-from src.bytecode import OpCodes
-from src.compiler import Compiler
+from src.bytecode import OpCodes, generic_opcodes, integer_specializations
+from src.compiler import Bytecode, Compiler
 from src.frame import Frame
+from src.jit import JIT_THRESHOLD, Deoptimization, Jit
+from src.libbuiltins import builtins
 from src.object import (
     Array,
+    AsyncBuiltin,
     Boolean,
+    Builtin,
     CompiledFunction,
     Hash,
     HashPair,
     Integer,
+    Memoized,
     Null,
     Object,
     String,
+    memo_key,
 )
 
 STACK_SIZE = 2048
 GLOBALS_SIZE = 65536
 MAX_FRAMES = 1024
+INITIAL_STACK_SIZE = 64
+STACK_CHUNK = 65536
+INITIAL_GLOBALS_SIZE = 64
 
 
 class VmError(Exception):
@@ -50,10 +62,34 @@ class GetGlobalIndexError(VmError):
     pass
 
 
+class AsyncCallError(VmError):
+    pass
+
+
+class Status(StrEnum):
+    DONE = "DONE"
+    SUSPENDED = "SUSPENDED"
+
+
+INTEGER_OPERATIONS: dict[OpCodes, Callable[[int, int], int]] = {
+    OpCodes.OpAddInt: operator.add,
+    OpCodes.OpSubInt: operator.sub,
+    OpCodes.OpMulInt: operator.mul,
+    OpCodes.OpDivInt: operator.floordiv,
+}
+
+INTEGER_COMPARISONS: dict[OpCodes, Callable[[int, int], bool]] = {
+    OpCodes.OpEqualInt: operator.eq,
+    OpCodes.OpNotEqualInt: operator.ne,
+    OpCodes.OpGreaterThanInt: operator.gt,
+}
+
 TRUE = Boolean(value=True)
 FALSE = Boolean(value=False)
 NULL = Null()
 
+BUILTINS = list(builtins.values())
+
 
 @dataclass
 class Stack:
@@ -61,10 +97,21 @@ class Stack:
     stack_size: int = STACK_SIZE
     sp: int = 0
 
-    def __post_init__(self) -> None:
-        self.store = [None] * self.stack_size
+    def reserve(self, size: int) -> None:
+        if size <= len(self.store):
+            return
+        if size > self.stack_size + 1:
+            raise StackOverflow(
+                f"Stack overflow: stack size is {self.stack_size}, stack pointer is {self.sp}"
+            )
+        capacity = max(len(self.store), INITIAL_STACK_SIZE)
+        while capacity < size:
+            capacity += min(capacity, STACK_CHUNK)
+        self.store.extend([None] * (min(capacity, self.stack_size + 1) - len(self.store)))
 
     def last_popped_stack_elem(self) -> Object | None:
+        if self.sp >= len(self.store):
+            return None
         return self.store[self.sp]
 
     def top(self) -> Object | None:
@@ -77,10 +124,8 @@ class Stack:
             raise
 
     def push(self, obj: Object) -> None:
-        if self.sp >= STACK_SIZE:
-            raise StackOverflow(
-                "Stack overflow: stack size is {STACK_SIZE}, stack pointer is {self.sp}"
-            )
+        if self.sp + 1 >= len(self.store):
+            self.reserve(self.sp + 2)
         self.store[self.sp] = obj
         self.sp += 1
 
@@ -97,14 +142,24 @@ class Stack:
 @dataclass
 class Globals:
     store: list[Object | None] = field(default_factory=list)
+    globals_size: int = GLOBALS_SIZE
 
-    def __post_init__(self) -> None:
-        self.store = [None] * GLOBALS_SIZE
+    def reserve(self, size: int) -> None:
+        if size <= len(self.store):
+            return
+        capacity = max(len(self.store), INITIAL_GLOBALS_SIZE)
+        while capacity < size:
+            capacity *= 2
+        self.store.extend([None] * (min(capacity, self.globals_size) - len(self.store)))
 
     def __setitem__(self, index: int, obj: Object) -> None:
+        if index >= len(self.store):
+            self.reserve(index + 1)
         self.store[index] = obj
 
     def __getitem__(self, index: int) -> Object | None:
+        if index >= len(self.store):
+            return None
         return self.store[index]
 
 
@@ -115,6 +170,12 @@ class VM:
     globals: Globals = field(default_factory=Globals)
     frames: list[Frame | None] = field(default_factory=list)
     frame_index: int = 0
+    max_frames: int = MAX_FRAMES
+    jit: Jit | None = None
+    budget: int = sys.maxsize
+    suspended: bool = False
+    awaiting: Awaitable[Object] | None = None
+    tracer: Callable[[OpCodes, Frame], None] | None = None
 
     def current_frame(self) -> Frame:
         frame = self.frames[self.frame_index - 1]
@@ -123,7 +184,12 @@ class VM:
         raise EmptyFrameError("Frame cannot be None")
 
     def push_frame(self, frame: Frame) -> None:
-        self.frames[self.frame_index] = frame
+        if self.frame_index < len(self.frames):
+            self.frames[self.frame_index] = frame
+        elif self.frame_index < self.max_frames:
+            self.frames.append(frame)
+        else:
+            raise StackOverflow(f"Stack overflow: call depth is {self.frame_index}")
         self.frame_index += 1
 
     def pop_frame(self) -> Frame:
@@ -142,19 +208,68 @@ class VM:
     def last_popped_stack_elem(self) -> Object | None:
         return self.stack.last_popped_stack_elem()
 
-    def run(self) -> None:  # noqa: C901
-        ip = 0
-        while self.current_frame().ip < len(self.current_frame().instructions()) - 1:
-            self.current_frame().ip += 1
-            ip = self.current_frame().ip
-            ins = self.current_frame().instructions().inst
+    def set_limits(self, stack_size: int = STACK_SIZE, max_frames: int = MAX_FRAMES) -> None:
+        self.stack.stack_size = stack_size
+        self.max_frames = max_frames
+
+    def enable_jit(self, threshold: int = JIT_THRESHOLD) -> None:
+        self.jit = Jit(vm=self, threshold=threshold)
+
+    def run(self, max_calls: int | None = None) -> Status:
+        if self.awaiting is not None:
+            return Status.SUSPENDED
+        self.budget = sys.maxsize if max_calls is None else max_calls
+        self.suspended = False
+        self.execute_until(0)
+        return Status.SUSPENDED if self.suspended else Status.DONE
+
+    async def run_async(self, max_calls: int | None = None) -> Status:
+        while True:
+            awaitable, self.awaiting = self.awaiting, None
+            if awaitable is not None:
+                self.stack.store[self.stack.sp - 1] = await awaitable
+            status = self.run(max_calls)
+            if status == Status.DONE or self.budget < 0:
+                return status
+            if max_calls is not None:
+                max_calls = self.budget
+
+    def execute_until(self, frame_index: int) -> None:  # noqa: C901
+        while self.frame_index > frame_index:
+            frame = self.current_frame()
+            ins = frame.instructions().inst
+            if frame.ip >= len(ins) - 1:
+                break
+            frame.ip += 1
+            ip = frame.ip
             opcode = OpCodes(ins[ip])
             match opcode:
                 case OpCodes.OpConstant:
                     const_index = int.from_bytes(ins[ip + 1 : ip + 3], "big")
-                    self.current_frame().ip += 2
+                    frame.ip += 2
                     self.stack.push(self.constants[const_index])
+                case OpCodes.OpAddInt | OpCodes.OpSubInt | OpCodes.OpMulInt | OpCodes.OpDivInt:
+                    store, sp = self.stack.store, self.stack.sp
+                    left, right = store[sp - 2], store[sp - 1]
+                    if type(left) is Integer and type(right) is Integer:
+                        number = INTEGER_OPERATIONS[opcode](left.value, right.value)
+                        store[sp - 2] = Integer(value=number)
+                        self.stack.sp = sp - 1
+                    else:
+                        ins[ip] = generic_opcodes[opcode]
+                        self.execute_binary_operation(generic_opcodes[opcode])
+                case OpCodes.OpEqualInt | OpCodes.OpNotEqualInt | OpCodes.OpGreaterThanInt:
+                    store, sp = self.stack.store, self.stack.sp
+                    left, right = store[sp - 2], store[sp - 1]
+                    if type(left) is Integer and type(right) is Integer:
+                        result = INTEGER_COMPARISONS[opcode](left.value, right.value)
+                        store[sp - 2] = TRUE if result else FALSE
+                        self.stack.sp = sp - 1
+                    else:
+                        ins[ip] = generic_opcodes[opcode]
+                        self.execute_comparison(generic_opcodes[opcode])
                 case OpCodes.OpAdd | OpCodes.OpSub | OpCodes.OpMul | OpCodes.OpDiv:
+                    self.quicken(ins, ip, opcode)
                     self.execute_binary_operation(opcode)
                 case OpCodes.OpPop:
                     self.stack.pop()
@@ -163,6 +278,7 @@ class VM:
                 case OpCodes.OpFalse:
                     self.stack.push(FALSE)
                 case OpCodes.OpEqual | OpCodes.OpNotEqual | OpCodes.OpGreaterThan:
+                    self.quicken(ins, ip, opcode)
                     self.execute_comparison(opcode)
                 case OpCodes.OpBang:
                     self.execute_bang_operator()
@@ -170,29 +286,35 @@ class VM:
                     self.execute_minus_operator()
                 case OpCodes.OpJump:
                     pos = int.from_bytes(ins[ip + 1 : ip + 3], "big")
-                    self.current_frame().ip = pos - 1
+                    frame.ip = pos - 1
                 case OpCodes.OpJumpNotTruthy:
                     pos = int.from_bytes(ins[ip + 1 : ip + 3], "big")
-                    self.current_frame().ip += 2
+                    frame.ip += 2
                     condition = self.stack.pop()
                     if not self.is_truthy(condition):
-                        self.current_frame().ip = pos - 1
+                        frame.ip = pos - 1
+                case OpCodes.OpJumpTruthy:
+                    pos = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    condition = self.stack.pop()
+                    if self.is_truthy(condition):
+                        frame.ip = pos - 1
                 case OpCodes.OpNull:
                     self.stack.push(NULL)
                 case OpCodes.OpSetGlobal:
                     global_index = int.from_bytes(ins[ip + 1 : ip + 3], "big")
-                    self.current_frame().ip += 2
+                    frame.ip += 2
                     self.globals[global_index] = self.stack.pop()
                 case OpCodes.OpGetGlobal:
                     global_index = int.from_bytes(ins[ip + 1 : ip + 3], "big")
-                    self.current_frame().ip += 2
+                    frame.ip += 2
                     obj = self.globals[global_index]
                     if obj is None:
                         raise GetGlobalIndexError(f"global at index {global_index} is None")
                     self.stack.push(obj)
                 case OpCodes.OpArray:
                     array_length = int.from_bytes(ins[ip + 1 : ip + 3], "big")
-                    self.current_frame().ip += 2
+                    frame.ip += 2
                     elements = self.stack.store[self.stack.sp - array_length : self.stack.sp]
                     if not all(elements):
                         raise EmptyStackObjectError(
@@ -203,7 +325,7 @@ class VM:
                     self.stack.push(array)
                 case OpCodes.OpHash:
                     hash_length = int.from_bytes(ins[ip + 1 : ip + 3], "big")
-                    self.current_frame().ip += 2
+                    frame.ip += 2
                     pairs: dict[Hashable, HashPair] = {}
                     for i in range(self.stack.sp - hash_length, self.stack.sp, 2):
                         key = self.stack.store[i]
@@ -221,76 +343,342 @@ class VM:
                 case OpCodes.OpIndex:
                     index = self.stack.pop()
                     left = self.stack.pop()
-                    if isinstance(left, Array) and isinstance(index, Integer):
-                        self.execute_array_index(left, index)
-                    elif isinstance(left, Hash):
-                        self.execute_hash_index(left, index)
-                    else:
-                        raise TypeError(f"index operator not supported: {left.type()}")
+                    self.stack.push(self.execute_index(left, index))
                 case OpCodes.OpCall:
+                    self.budget -= 1
+                    if self.budget < 0 and frame_index == 0:
+                        frame.ip = ip - 1
+                        self.suspended = True
+                        return
                     num_of_args = int.from_bytes(ins[ip + 1 : ip + 2], "big")
-                    self.current_frame().ip += 1
-                    fn = self.stack.store[self.stack.sp - 1 - num_of_args]
-                    if not isinstance(fn, CompiledFunction):
-                        raise RuntimeError(f"calling non-function: type: {type(fn)}, value: {fn}")
-                    if fn.num_of_parameters != num_of_args:
-                        raise RuntimeError(
-                            f"wrong number of arguments: want={fn.num_of_parameters}, got={num_of_args}"
+                    frame.ip += 1
+                    self.execute_call(num_of_args)
+                    if self.awaiting is not None:
+                        if frame_index != 0:
+                            self.reject_awaiting()
+                        self.suspended = True
+                        return
+                case OpCodes.OpReturnValue:
+                    rv = self.stack.pop()
+                    frame = self.pop_frame()
+                    self.stack.sp = frame.base_pointer - 1
+                    self.stack.push(rv)
+                    if frame.memoized is not None:
+                        frame.memoized[0].store(frame.memoized[1], rv)
+                case OpCodes.OpReturn:
+                    frame = self.pop_frame()
+                    self.stack.sp = frame.base_pointer - 1
+                    self.stack.push(NULL)
+                    if frame.memoized is not None:
+                        frame.memoized[0].store(frame.memoized[1], NULL)
+                case OpCodes.OpGetLocal:
+                    local_index = int.from_bytes(ins[ip + 1 : ip + 2], "big")
+                    frame.ip += 1
+                    obj = self.stack.store[frame.base_pointer + local_index]
+                    if obj is None:
+                        raise RuntimeError("local cannot be None")
+                    self.stack.push(obj)
+                case OpCodes.OpSetLocal:
+                    local_index = int.from_bytes(ins[ip + 1 : ip + 2], "big")
+                    frame.ip += 1
+                    self.stack.store[frame.base_pointer + local_index] = self.stack.pop()
+                case OpCodes.OpGetBuiltin:
+                    builtin_index = int.from_bytes(ins[ip + 1 : ip + 2], "big")
+                    frame.ip += 1
+                    self.stack.push(BUILTINS[builtin_index])
+
+    def execute_until_traced(self, frame_index: int) -> None:  # noqa: C901
+        tracer = self.tracer
+        if tracer is None:
+            raise RuntimeError("execute_until_traced needs a tracer")
+        while self.frame_index > frame_index:
+            frame = self.current_frame()
+            ins = frame.instructions().inst
+            if frame.ip >= len(ins) - 1:
+                break
+            frame.ip += 1
+            ip = frame.ip
+            opcode = OpCodes(ins[ip])
+            tracer(opcode, frame)
+            match opcode:
+                case OpCodes.OpConstant:
+                    const_index = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    self.stack.push(self.constants[const_index])
+                case OpCodes.OpAddInt | OpCodes.OpSubInt | OpCodes.OpMulInt | OpCodes.OpDivInt:
+                    store, sp = self.stack.store, self.stack.sp
+                    left, right = store[sp - 2], store[sp - 1]
+                    if type(left) is Integer and type(right) is Integer:
+                        number = INTEGER_OPERATIONS[opcode](left.value, right.value)
+                        store[sp - 2] = Integer(value=number)
+                        self.stack.sp = sp - 1
+                    else:
+                        ins[ip] = generic_opcodes[opcode]
+                        self.execute_binary_operation(generic_opcodes[opcode])
+                case OpCodes.OpEqualInt | OpCodes.OpNotEqualInt | OpCodes.OpGreaterThanInt:
+                    store, sp = self.stack.store, self.stack.sp
+                    left, right = store[sp - 2], store[sp - 1]
+                    if type(left) is Integer and type(right) is Integer:
+                        result = INTEGER_COMPARISONS[opcode](left.value, right.value)
+                        store[sp - 2] = TRUE if result else FALSE
+                        self.stack.sp = sp - 1
+                    else:
+                        ins[ip] = generic_opcodes[opcode]
+                        self.execute_comparison(generic_opcodes[opcode])
+                case OpCodes.OpAdd | OpCodes.OpSub | OpCodes.OpMul | OpCodes.OpDiv:
+                    self.quicken(ins, ip, opcode)
+                    self.execute_binary_operation(opcode)
+                case OpCodes.OpPop:
+                    self.stack.pop()
+                case OpCodes.OpTrue:
+                    self.stack.push(TRUE)
+                case OpCodes.OpFalse:
+                    self.stack.push(FALSE)
+                case OpCodes.OpEqual | OpCodes.OpNotEqual | OpCodes.OpGreaterThan:
+                    self.quicken(ins, ip, opcode)
+                    self.execute_comparison(opcode)
+                case OpCodes.OpBang:
+                    self.execute_bang_operator()
+                case OpCodes.OpMinus:
+                    self.execute_minus_operator()
+                case OpCodes.OpJump:
+                    pos = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip = pos - 1
+                case OpCodes.OpJumpNotTruthy:
+                    pos = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    condition = self.stack.pop()
+                    if not self.is_truthy(condition):
+                        frame.ip = pos - 1
+                case OpCodes.OpJumpTruthy:
+                    pos = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    condition = self.stack.pop()
+                    if self.is_truthy(condition):
+                        frame.ip = pos - 1
+                case OpCodes.OpNull:
+                    self.stack.push(NULL)
+                case OpCodes.OpSetGlobal:
+                    global_index = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    self.globals[global_index] = self.stack.pop()
+                case OpCodes.OpGetGlobal:
+                    global_index = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    obj = self.globals[global_index]
+                    if obj is None:
+                        raise GetGlobalIndexError(f"global at index {global_index} is None")
+                    self.stack.push(obj)
+                case OpCodes.OpArray:
+                    array_length = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    elements = self.stack.store[self.stack.sp - array_length : self.stack.sp]
+                    if not all(elements):
+                        raise EmptyStackObjectError(
+                            f"array elements cannot be None: {elements} in range {self.stack.sp - array_length} to {self.stack.sp}"
                         )
-                    frame = Frame(fn=fn, base_pointer=self.stack.sp - num_of_args)
-                    self.push_frame(frame)
-                    self.stack.sp = frame.base_pointer + fn.num_of_locals
+                    array = Array(elements=elements)  # type: ignore[arg-type]
+                    self.stack.sp -= array_length
+                    self.stack.push(array)
+                case OpCodes.OpHash:
+                    hash_length = int.from_bytes(ins[ip + 1 : ip + 3], "big")
+                    frame.ip += 2
+                    pairs: dict[Hashable, HashPair] = {}
+                    for i in range(self.stack.sp - hash_length, self.stack.sp, 2):
+                        key = self.stack.store[i]
+                        value = self.stack.store[i + 1]
+                        if (
+                            isinstance(key, Object)
+                            and isinstance(key, Hashable)
+                            and value is not None
+                        ):
+                            pairs[key] = HashPair(key=key, value=value)
+                        else:
+                            raise InvalidHashKeyError(f"unsupported hash key: {key}")
+                    self.stack.sp -= hash_length
+                    self.stack.push(Hash(pairs=pairs))
+                case OpCodes.OpIndex:
+                    index = self.stack.pop()
+                    left = self.stack.pop()
+                    self.stack.push(self.execute_index(left, index))
+                case OpCodes.OpCall:
+                    self.budget -= 1
+                    if self.budget < 0 and frame_index == 0:
+                        frame.ip = ip - 1
+                        self.suspended = True
+                        return
+                    num_of_args = int.from_bytes(ins[ip + 1 : ip + 2], "big")
+                    frame.ip += 1
+                    self.execute_call(num_of_args)
+                    if self.awaiting is not None:
+                        if frame_index != 0:
+                            self.reject_awaiting()
+                        self.suspended = True
+                        return
                 case OpCodes.OpReturnValue:
                     rv = self.stack.pop()
                     frame = self.pop_frame()
                     self.stack.sp = frame.base_pointer - 1
                     self.stack.push(rv)
+                    if frame.memoized is not None:
+                        frame.memoized[0].store(frame.memoized[1], rv)
                 case OpCodes.OpReturn:
                     frame = self.pop_frame()
                     self.stack.sp = frame.base_pointer - 1
                     self.stack.push(NULL)
+                    if frame.memoized is not None:
+                        frame.memoized[0].store(frame.memoized[1], NULL)
                 case OpCodes.OpGetLocal:
                     local_index = int.from_bytes(ins[ip + 1 : ip + 2], "big")
-                    self.current_frame().ip += 1
-                    obj = self.stack.store[self.current_frame().base_pointer + local_index]
+                    frame.ip += 1
+                    obj = self.stack.store[frame.base_pointer + local_index]
                     if obj is None:
                         raise RuntimeError("local cannot be None")
                     self.stack.push(obj)
                 case OpCodes.OpSetLocal:
                     local_index = int.from_bytes(ins[ip + 1 : ip + 2], "big")
-                    self.current_frame().ip += 1
-                    self.stack.store[
-                        self.current_frame().base_pointer + local_index
-                    ] = self.stack.pop()
-
-            ip += 1
-
-    def execute_array_index(self, left: Array, index: Integer) -> None:
-        if index.value < 0 or index.value >= len(left.elements):
-            self.stack.push(NULL)
+                    frame.ip += 1
+                    self.stack.store[frame.base_pointer + local_index] = self.stack.pop()
+                case OpCodes.OpGetBuiltin:
+                    builtin_index = int.from_bytes(ins[ip + 1 : ip + 2], "big")
+                    frame.ip += 1
+                    self.stack.push(BUILTINS[builtin_index])
+
+    def execute_call(self, num_of_args: int) -> None:
+        fn = self.stack.store[self.stack.sp - 1 - num_of_args]
+        if not isinstance(fn, CompiledFunction):
+            self.call_object(fn, num_of_args)
             return
-        self.stack.push(left.elements[index.value])
+        if fn.num_of_parameters != num_of_args:
+            raise RuntimeError(
+                f"wrong number of arguments: want={fn.num_of_parameters}, got={num_of_args}"
+            )
+        if self.jit is not None:
+            jitted = self.jit.lookup(fn)
+            if jitted is not None:
+                args = self.stack.store[self.stack.sp - num_of_args : self.stack.sp]
+                self.stack.sp -= num_of_args + 1
+                try:
+                    result = self.jit.enter(fn, jitted, args)  # type: ignore[arg-type]
+                except Deoptimization as deopt:
+                    self.enter_deoptimized_frame(fn, deopt)
+                    return
+                self.stack.push(result)
+                return
+        frame = Frame(fn=fn, base_pointer=self.stack.sp - num_of_args)
+        self.push_frame(frame)
+        sp = frame.base_pointer + fn.num_of_locals
+        if sp >= len(self.stack.store):
+            self.stack.reserve(sp + 1)
+        self.stack.sp = sp
+
+    def call_object(self, fn: Object | None, num_of_args: int) -> None:
+        match fn:
+            case Builtin():
+                args = self.stack.store[self.stack.sp - num_of_args : self.stack.sp]
+                self.stack.sp -= num_of_args + 1
+                self.stack.push(fn.fn(*args))  # type: ignore[arg-type]
+            case AsyncBuiltin():
+                args = self.stack.store[self.stack.sp - num_of_args : self.stack.sp]
+                self.stack.sp -= num_of_args + 1
+                self.awaiting = fn.fn(*args)
+                self.stack.push(NULL)
+            case Memoized():
+                self.call_memoized(fn, num_of_args)
+            case _:
+                raise RuntimeError(f"calling non-function: type: {type(fn)}, value: {fn}")
+
+    def call_memoized(self, fn: Memoized, num_of_args: int) -> None:
+        key = memo_key(self.stack.store[self.stack.sp - num_of_args : self.stack.sp])  # type: ignore[arg-type]
+        cached = None if key is None else fn.lookup(key)
+        if cached is not None:
+            self.stack.sp -= num_of_args + 1
+            self.stack.push(cached)
+            return
+        self.stack.store[self.stack.sp - 1 - num_of_args] = fn.fn
+        frame_index = self.frame_index
+        self.execute_call(num_of_args)
+        if key is None:
+            return
+        if self.frame_index > frame_index:
+            self.current_frame().memoized = (fn, key)
+        elif self.awaiting is None:
+            fn.store(key, self.stack.store[self.stack.sp - 1])  # type: ignore[arg-type]
+
+    def call_function(self, fn: Object, args: list[Object]) -> Object:
+        self.stack.push(fn)
+        for arg in args:
+            self.stack.push(arg)
+        frame_index = self.frame_index
+        self.execute_call(len(args))
+        if self.awaiting is not None:
+            self.reject_awaiting()
+        if self.frame_index > frame_index:
+            self.execute_until(frame_index)
+        return self.stack.pop()
+
+    def reject_awaiting(self) -> NoReturn:
+        awaitable, self.awaiting = self.awaiting, None
+        if isinstance(awaitable, Coroutine):
+            awaitable.close()
+        raise AsyncCallError("async builtins cannot be awaited in nested calls")
+
+    def resume_deoptimized(self, fn: CompiledFunction, deopt: Deoptimization) -> Object:
+        frame_index = self.frame_index
+        self.enter_deoptimized_frame(fn, deopt)
+        self.execute_until(frame_index)
+        return self.stack.pop()
+
+    def enter_deoptimized_frame(self, fn: CompiledFunction, deopt: Deoptimization) -> None:
+        self.stack.push(fn)
+        frame = Frame(fn=fn, base_pointer=self.stack.sp, ip=deopt.ip - 1)
+        self.stack.reserve(frame.base_pointer + fn.num_of_locals + 1)
+        for i, local in enumerate(deopt.locals):
+            self.stack.store[frame.base_pointer + i] = local
+        self.stack.sp = frame.base_pointer + fn.num_of_locals
+        for obj in deopt.stack:
+            self.stack.push(obj)
+        self.push_frame(frame)
+
+    def execute_index(self, left: Object, index: Object) -> Object:
+        if isinstance(left, Array) and isinstance(index, Integer):
+            return self.execute_array_index(left, index)
+        if isinstance(left, Hash):
+            return self.execute_hash_index(left, index)
+        raise TypeError(f"index operator not supported: {left.type()}")
+
+    def execute_array_index(self, left: Array, index: Integer) -> Object:
+        if index.value < 0 or index.value >= len(left.elements):
+            return NULL
+        return left.elements[index.value]
 
-    def execute_hash_index(self, left: Hash, index: Object) -> None:
+    def execute_hash_index(self, left: Hash, index: Object) -> Object:
         if not isinstance(index, Hashable):
             raise InvalidHashKeyError(f"unusable as hash key: {index.type()}")
         pair = left.pairs.get(index)
         if pair is None:
-            self.stack.push(NULL)
-            return
-        self.stack.push(pair.value)
+            return NULL
+        return pair.value
 
     @classmethod
     def from_compiler(cls, compiler: Compiler) -> Self:
+        return cls.from_bytecode(compiler.bytecode())
+
+    @classmethod
+    def from_bytecode(cls, bytecode: Bytecode) -> Self:
         main_fn = CompiledFunction(
-            instructions=compiler.bytecode().instructions,
+            instructions=bytecode.instructions,
             num_of_locals=0,
             num_of_parameters=0,
         )
         main_frame = Frame(fn=main_fn, base_pointer=0)
-        frames: list[Frame | None] = [None] * MAX_FRAMES
-        frames[0] = main_frame
-        return cls(constants=compiler.bytecode().constants, frames=frames, frame_index=1)
+        return cls(constants=bytecode.constants, frames=[main_frame], frame_index=1)
+
+    def quicken(self, ins: list[int], ip: int, opcode: OpCodes) -> None:
+        left = self.stack.store[self.stack.sp - 2]
+        right = self.stack.store[self.stack.sp - 1]
+        if type(left) is Integer and type(right) is Integer:
+            ins[ip] = integer_specializations[opcode]
 
     def execute_binary_operation(self, opcode: OpCodes) -> None:
         right = self.stack.pop()
@@ -0,0 +1,81 @@
+import threading
+import tracemalloc
+
+from src.allocations import Allocations, AllocationTrackingVM, tracking
+from src.compiler import Compiler
+from src.object import Integer
+from tests.helper import parse, verify_expected_object
+
+
+def run_tracked(input: str) -> AllocationTrackingVM:
+    compiler = Compiler()
+    compiler.compile(parse(input))
+    vm = AllocationTrackingVM.from_compiler(compiler=compiler)
+    vm.run()
+    return vm
+
+
+def test_allocations_are_attributed_to_opcodes_and_functions() -> None:
+    init = Integer.__init__
+    vm = run_tracked('let f = fn(x) { [x, x + 1] }; let h = {"a": "b" + "c"}; len(f(1)) + 1')
+    allocations = vm.allocations
+
+    verify_expected_object(vm.last_popped_stack_elem(), 3)
+    assert allocations.counts == {
+        ("Array", "OpArray", "f"): 1,
+        ("Integer", "OpAdd", "f"): 1,
+        ("String", "OpAdd", "<main>"): 1,
+        ("HashPair", "OpHash", "<main>"): 1,
+        ("Hash", "OpHash", "<main>"): 1,
+        ("Integer", "OpCall", "<main>"): 1,
+        ("Integer", "OpAdd", "<main>"): 1,
+    }
+    assert allocations.by(0)["Integer"] == 3
+    assert allocations.peak > 0
+    assert Integer.__init__ is init
+    assert not tracemalloc.is_tracing()
+
+
+def test_report_and_json() -> None:
+    allocations = run_tracked(
+        "let f = fn(n) { if (n == 0) { 0 } else { f(n - 1) + 1 } }; f(10)"
+    ).allocations
+
+    assert allocations.to_json()["functions"] == {"f": 20}
+    assert allocations.to_json()["types"] == {"Integer": 20}
+    assert "peak traced memory" in allocations.report()
+
+
+def test_allocations_in_other_threads_are_not_counted() -> None:
+    started, stop = threading.Event(), threading.Event()
+
+    def allocate() -> None:
+        started.set()
+        while not stop.is_set():
+            Integer(value=1)
+
+    thread = threading.Thread(target=allocate)
+    thread.start()
+    started.wait()
+    try:
+        allocations = run_tracked("1 + 2").allocations
+    finally:
+        stop.set()
+        thread.join()
+
+    assert allocations.counts == {("Integer", "OpAdd", "<main>"): 1}
+
+
+def test_nested_tracking_counts_into_the_innermost() -> None:
+    init = Integer.__init__
+    outer, inner = Allocations(), Allocations()
+
+    with tracking(outer):
+        Integer(value=1)
+        with tracking(inner):
+            Integer(value=2)
+        Integer(value=3)
+
+    assert outer.by(0) == {"Integer": 2}
+    assert inner.by(0) == {"Integer": 1}
+    assert Integer.__init__ is init
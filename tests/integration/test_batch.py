@@ -0,0 +1,54 @@
+from src.batch import Outcome, Script, compile_source, compiled, run_batch, run_script
+
+FIB = "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; "
+
+
+def fib(n: int) -> str:
+    return f"{FIB}fib({n})"
+
+
+def test_run_script_captures_value_and_output() -> None:
+    result = run_script(Script(name="a", source='puts("hi"); let a = [1, 2]; push(a, 3)'))
+
+    assert result.outcome == Outcome.OK
+    assert result.value == "[1, 2, 3]"
+    assert result.output == "hi\n"
+    assert result.error is None
+
+
+def test_run_script_reports_errors() -> None:
+    parse_error = run_script(Script(name="a", source="let = 1"))
+    runtime_error = run_script(Script(name="b", source='puts(1); 1 + "a"'))
+
+    assert parse_error.outcome == Outcome.ERROR
+    assert parse_error.error is not None and parse_error.error.startswith("ParseError")
+    assert runtime_error.outcome == Outcome.ERROR
+    assert runtime_error.output == "1\n"
+
+
+def test_run_script_times_out() -> None:
+    result = run_script(Script(name="a", source=fib(30)), timeout=0.01)
+
+    assert result.outcome == Outcome.TIMEOUT
+    assert result.value is None
+
+
+def test_compiled_programs_are_cached() -> None:
+    source = fib(5)
+
+    assert compile_source(source) is compile_source(source)
+    assert compile_source(source) is not compile_source(source, optimize=True)
+    assert run_script(Script(name="a", source=source)).value == "5"
+    assert run_script(Script(name="b", source=source)).value == "5"
+    assert (source, False) in compiled
+
+
+def test_run_batch_streams_all_results() -> None:
+    scripts = [Script(name=str(n), source=fib(n)) for n in range(15)]
+    scripts.append(Script(name="slow", source=fib(40)))
+
+    results = {r.name: r for r in run_batch(scripts, workers=2, timeout=0.5)}
+
+    assert results.keys() == {s.name for s in scripts}
+    assert results["slow"].outcome == Outcome.TIMEOUT
+    assert [results[str(n)].value for n in (0, 1, 2, 10, 14)] == ["0", "1", "1", "55", "377"]
@@ -0,0 +1,92 @@
+import os
+import stat
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src.client import request
+from src.forkserver import Prelude, make_server
+from src.object import Integer
+
+PRELUDE = """
+let square = fn(x) { x * x };
+let table = {"one": 1, "two": 2};
+let pid = 0;
+"""
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[str]:
+    path = tmp_path / "monkey.sock"
+    prelude = tmp_path / "prelude.monkey"
+    prelude.write_text(PRELUDE)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.forkserver", str(prelude), "--socket", str(path)]
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while not path.exists():
+            assert server.poll() is None, "fork-server exited"
+            assert time.monotonic() < deadline, "fork-server did not start"
+            time.sleep(0.01)
+        yield str(path)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def test_prelude_is_compiled_and_run_once() -> None:
+    prelude = Prelude.load(PRELUDE)
+    vm = prelude.compile('square(table["two"]) + square(3)')
+    vm.run()
+
+    assert vm.last_popped_stack_elem() == Integer(value=13)
+    assert prelude.symbol_table.resolve("square") is not None
+
+
+def test_requests_see_the_prelude(socket_path: str) -> None:
+    response = request(socket_path, {"source": 'puts(square(4)); table["one"]'})
+
+    assert response["outcome"] == "OK"
+    assert response["output"] == "16\n"
+    assert response["value"] == "1"
+
+
+def test_requests_do_not_change_the_prelude(socket_path: str) -> None:
+    first = request(socket_path, {"source": "let square = fn(x) { x }; square(5)"})
+    second = request(socket_path, {"source": "square(5)"})
+
+    assert first["value"] == "5"
+    assert second["value"] == "25"
+
+
+@pytest.mark.parametrize(
+    "payload,error",
+    [
+        [{"source": "let = 1"}, "ParseError"],
+        [{"source": "undefined(1)"}, "CompilationError"],
+        [{"bytecode": ""}, "bad request"],
+    ],
+)
+def test_errors_are_reported(socket_path: str, payload: dict[str, str], error: str) -> None:
+    response = request(socket_path, payload)
+
+    assert response["outcome"] == "ERROR"
+    assert error in response["error"]
+
+
+def test_forkserver_socket_is_private(socket_path: str) -> None:
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+
+def test_forkserver_does_not_replace_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "regular"
+    path.write_text("keep")
+
+    with pytest.raises(FileExistsError):
+        make_server(str(path), Prelude.load(PRELUDE))
+    assert path.read_text() == "keep"
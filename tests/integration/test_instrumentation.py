@@ -0,0 +1,66 @@
+import inspect
+import json
+
+from src.bytecode import OpCodes
+from src.compiler import Compiler
+from src.instrumentation import InstrumentedVM
+from src.vm import VM
+from tests.helper import parse, verify_expected_object
+
+
+def run_instrumented(input: str) -> InstrumentedVM:
+    compiler = Compiler()
+    compiler.compile(parse(input))
+    vm = InstrumentedVM.from_compiler(compiler=compiler)
+    vm.run()
+    return vm
+
+
+def test_opcodes_are_counted() -> None:
+    vm = run_instrumented("let f = fn(a) { a + 1 }; f(1) + f(2)")
+    instrumentation = vm.instrumentation
+
+    verify_expected_object(vm.last_popped_stack_elem(), 5)
+    assert instrumentation.counts[OpCodes.OpCall] == 2
+    assert instrumentation.counts[OpCodes.OpGetLocal] == 2
+    assert instrumentation.counts[OpCodes.OpAdd] == 2
+    assert instrumentation.counts[OpCodes.OpAddInt] == 1
+    assert instrumentation.bigrams[(OpCodes.OpGetLocal, OpCodes.OpConstant)] == 2
+    assert sum(instrumentation.bigrams.values()) == sum(instrumentation.counts.values()) - 1
+    assert set(instrumentation.times) == set(instrumentation.counts)
+    assert all(
+        sum(h.values()) == instrumentation.counts[op]
+        for op, h in instrumentation.histograms.items()
+    )
+
+
+def test_instrumented_vm_runs_like_vm() -> None:
+    input = (
+        "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; [fib(10), len([1])]"
+    )
+    compiler = Compiler()
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.run()
+
+    assert run_instrumented(input).last_popped_stack_elem() == vm.last_popped_stack_elem()
+    assert vm.tracer is None
+
+
+def test_traced_loop_matches_the_plain_loop() -> None:
+    plain = inspect.getsource(VM.execute_until).splitlines()[1:]
+    traced = inspect.getsource(VM.execute_until_traced).splitlines()[1:]
+
+    assert [line for line in traced if "tracer" not in line] == plain
+
+
+def test_report_and_json_export() -> None:
+    instrumentation = run_instrumented("1 + 2").instrumentation
+
+    report = instrumentation.report()
+    exported = json.loads(json.dumps(instrumentation.to_json()))
+
+    assert "OpConstant" in report
+    assert "OpConstant OpConstant" in report
+    assert exported["opcodes"]["OpConstant"]["count"] == 2
+    assert exported["bigrams"][0] == {"first": "OpConstant", "second": "OpConstant", "count": 1}
@@ -0,0 +1,106 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from src.compiler import Compiler
+from src.object import AsyncBuiltin, Object
+from src.vm import VM, AsyncCallError
+from tests.helper import parse, verify_expected_object
+
+
+def run_jit_vm(input: str, threshold: int = 2) -> VM:
+    compiler = Compiler()
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.enable_jit(threshold)
+    vm.run()
+    return vm
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        [
+            "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(15);",
+            610,
+        ],
+        ["let f = fn(a, b) { a * b - a / b }; f(6, 3); f(8, 2); f(-5, 5)", -24],
+        ["let f = fn(a) { -a }; f(1); f(2); f(3)", -3],
+        ["let f = fn(a) { !a }; f(1); f(true); f(false)", True],
+        ["let f = fn(a) { a == true }; f(1); f(true); f(1)", False],
+        ["let f = fn(a) { if (a) { 1 } else { 2 } }; f(true); f(0); f(if (false) { 1 })", 2],
+        ["let f = fn(a) { let b = [a, a * 2]; b[1] }; f(1); f(2); f(3)", 6],
+        ["let f = fn(a) { {a: 1, 2: a}[2] }; f(1); f(true); f(5)", 5],
+        ["let g = fn(x) { x * 2 }; let f = fn(a) { g(a) + g(a) }; f(1); f(2); f(3)", 12],
+        ['let f = fn(a, b) { a + b }; f(1, 2); f("a", "b"); f(3, 4); f("x", "y")', "xy"],
+        [
+            "let f = fn(x) { if (x > 0) { return x; } let y = x * 2; y }; f(1); f(-1); f(-4)",
+            -8,
+        ],
+    ],
+)
+def test_jit_matches_interpreter(input: str, expected: Any) -> None:
+    vm = run_jit_vm(input)
+    stack_elem = vm.last_popped_stack_elem()
+
+    assert stack_elem is not None
+
+    verify_expected_object(stack_elem, expected)
+
+
+def test_hot_functions_are_compiled() -> None:
+    vm = run_jit_vm("let f = fn(a) { a + 1 }; f(1); f(2); f(3)")
+
+    assert vm.jit is not None
+    assert len(vm.jit.sources) == 1
+    assert "l0.value + 1" in next(iter(vm.jit.sources.values()))
+
+
+def test_functions_below_threshold_are_interpreted() -> None:
+    vm = run_jit_vm("let f = fn(a) { a + 1 }; f(1); f(2); f(3)", threshold=10)
+
+    assert vm.jit is not None
+    assert vm.jit.sources == {}
+
+
+def test_type_miss_deoptimizes_to_interpreter() -> None:
+    vm = run_jit_vm('let f = fn(a, b) { a + b }; f(1, 2); f(3, 4); f("mon", "key")')
+
+    assert vm.jit is not None
+    assert list(vm.jit.deoptimizations.values()) == [1]
+    verify_expected_object(vm.last_popped_stack_elem(), "monkey")
+
+
+def test_deep_recursion_falls_back_to_interpreter_frames() -> None:
+    vm = run_jit_vm(
+        "let sum = fn(x) { if (x == 0) { 0 } else { x + sum(x - 1) } }; sum(10); sum(500)"
+    )
+
+    verify_expected_object(vm.last_popped_stack_elem(), 125250)
+
+
+def test_errors_in_jitted_code_match_interpreter() -> None:
+    with pytest.raises(TypeError):
+        run_jit_vm("let f = fn(a) { a > 1 }; f(1); f(2); f(true)")
+
+
+def test_async_builtins_cannot_be_awaited_from_jit_code() -> None:
+    async def fetch(x: Object) -> Object:
+        return x
+
+    compiler = Compiler()
+    symbol = compiler.symbol_table.define("fetch")
+    compiler.compile(
+        parse(
+            "let g = fn(n) { fetch(n) + 1 }; "
+            "let f = fn(n) { if (n == 0) { 0 } else { g(n) + f(n - 1) } }; f(5)"
+        )
+    )
+    vm = VM.from_compiler(compiler=compiler)
+    vm.globals[symbol.index] = AsyncBuiltin(fn=fetch)
+    vm.enable_jit(2)
+
+    with pytest.raises(AsyncCallError):
+        asyncio.run(vm.run_async())
+    assert vm.awaiting is None
@@ -0,0 +1,53 @@
+import pytest
+
+from src.object import Integer, String
+from src.prepared import PreparedProgram, from_native
+from tests.helper import parse, verify_expected_object
+
+
+def test_prepared_program_runs_once_per_record() -> None:
+    prepared = PreparedProgram.from_program(
+        parse('let f = fn(r) { r["a"] * 2 }; let b = f(record); [b, b + bonus]'),
+        ["record", "bonus"],
+    )
+    results = prepared.run_records(
+        [{"record": {"a": 1}, "bonus": 10}, {"record": {"a": 5}, "bonus": 0}]
+    )
+
+    verify_expected_object(results[0], [2, 12])
+    verify_expected_object(results[1], [10, 10])
+    assert prepared.vm.frame_index == 1
+    assert prepared.vm.stack.sp == 0
+
+
+def test_prepared_program_takes_objects() -> None:
+    prepared = PreparedProgram.from_program(parse('name + "!"'), ["name"], optimize=True)
+
+    assert prepared.run({"name": String(value="a")}) == String(value="a!")
+    assert prepared.run({"name": String(value="b")}) == String(value="b!")
+
+
+def test_prepared_program_recovers_after_a_failed_record() -> None:
+    prepared = PreparedProgram.from_program(
+        parse(
+            'let f = fn(x) { if (x > 0) { f(x - 1) } else { x + "a" } }; let y = n * 2; f(n) + y'
+        ),
+        ["n"],
+    )
+
+    with pytest.raises(TypeError):
+        prepared.run({"n": Integer(value=3)})
+    assert prepared.vm.frame_index == 5
+    with pytest.raises(TypeError):
+        prepared.run({"n": Integer(value=0)})
+    assert prepared.vm.globals[2] == Integer(value=0)
+    prepared.reset()
+    assert prepared.vm.globals[1] is None and prepared.vm.globals[2] is None
+    assert prepared.vm.globals[0] == Integer(value=0)
+
+
+def test_from_native() -> None:
+    verify_expected_object(from_native([1, "a", True, None]), [1, "a", True, None])
+    assert from_native({"a": [1]}).inspect() == "{a: [1]}"
+    with pytest.raises(TypeError):
+        from_native(1.5)
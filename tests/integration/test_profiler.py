@@ -0,0 +1,86 @@
+from src import evaluator
+from src.compiler import Compiler
+from src.object import Environment
+from src.profiler import ProfilingVM, profile_evaluator
+from src.vm import Status
+from tests.helper import parse, verify_expected_object
+
+INPUT = """
+let square = fn(x) { x * x };
+let sum = fn(n) { if (n == 0) { 0 } else { square(n) + sum(n - 1) } };
+[sum(3), fn() { 1 }()]
+"""
+
+
+def test_vm_profiler_counts_calls_by_let_binding() -> None:
+    compiler = Compiler()
+    compiler.compile(parse(INPUT))
+    vm = ProfilingVM.from_compiler(compiler=compiler)
+    vm.run()
+    functions = vm.profiler.functions
+
+    verify_expected_object(vm.last_popped_stack_elem(), [14, 1])
+    assert {name: stats.calls for name, stats in functions.items()} == {
+        "<main>": 1,
+        "sum": 4,
+        "square": 3,
+        "<anonymous>": 1,
+    }
+    assert functions["sum"].total_time >= functions["sum"].self_time
+    assert functions["<main>"].total_time >= functions["sum"].total_time
+    assert vm.profiler.calls == []
+
+
+def test_vm_profiler_resumes_a_suspended_run() -> None:
+    compiler = Compiler()
+    compiler.compile(parse(INPUT))
+    vm = ProfilingVM.from_compiler(compiler=compiler)
+
+    assert vm.run(max_calls=3) == Status.SUSPENDED
+    assert [call.name for call in vm.profiler.calls] == ["<main>", "sum", "sum"]
+    assert vm.run(max_calls=3) == Status.SUSPENDED
+    assert vm.run() == Status.DONE
+
+    verify_expected_object(vm.last_popped_stack_elem(), [14, 1])
+    assert {name: stats.calls for name, stats in vm.profiler.functions.items()} == {
+        "<main>": 1,
+        "sum": 4,
+        "square": 3,
+        "<anonymous>": 1,
+    }
+    assert vm.profiler.calls == []
+
+
+def test_evaluator_profiler_counts_calls_by_let_binding() -> None:
+    apply_function = evaluator.apply_function
+    with profile_evaluator() as profiler:
+        result = evaluator.eval(parse(INPUT), Environment())
+
+    verify_expected_object(result, [14, 1])
+    assert {name: stats.calls for name, stats in profiler.functions.items()} == {
+        "<main>": 1,
+        "sum": 4,
+        "square": 3,
+        "<anonymous>": 1,
+    }
+    assert evaluator.apply_function is apply_function
+
+
+def test_collapsed_stacks() -> None:
+    with profile_evaluator() as profiler:
+        evaluator.eval(parse(INPUT), Environment())
+
+    stacks = [line.rsplit(" ", 1)[0] for line in profiler.collapsed().splitlines()]
+
+    assert stacks == [
+        "<main>",
+        "<main>;<anonymous>",
+        "<main>;sum",
+        "<main>;sum;square",
+        "<main>;sum;sum",
+        "<main>;sum;sum;square",
+        "<main>;sum;sum;sum",
+        "<main>;sum;sum;sum;square",
+        "<main>;sum;sum;sum;sum",
+    ]
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in profiler.collapsed().splitlines())
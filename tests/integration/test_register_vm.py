@@ -0,0 +1,157 @@
+from typing import Any
+
+import pytest
+
+from src.compiler import CompilationError
+from src.object import CompiledFunction, Null
+from src.register_bytecode import RegisterOpCodes, register_instructions_to_string
+from src.register_compiler import RegisterCompiler
+from src.register_vm import RegisterVM
+from src.vm import STACK_SIZE, StackOverflow
+from tests.helper import parse, verify_expected_object
+
+
+def run_register_vm_test(input: str, expected: Any) -> None:
+    compiler = RegisterCompiler()
+    compiler.compile(parse(input))
+    vm = RegisterVM.from_compiler(compiler)
+    vm.run()
+    result = vm.last_popped_stack_elem()
+
+    assert result is not None
+
+    verify_expected_object(result, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["1 + 2", 3],
+        ["50 / 2 * 2 + 10 - 5", 55],
+        ["(5 + 10 * 2 + 15 / 3) * 2 + -10", 50],
+        ["-50 + 100 + -50", 0],
+        ["1 < 2", True],
+        ["2 < 1", False],
+        ["(10 + 50 + -5 - 5 * 2 / 2) < (100 - 49)", True],
+        ["true != false", True],
+        ["(1 > 2) == false", True],
+        ["!!5", True],
+        ["!(if (false) { 5; })", True],
+        ['"mon" + "key" + "banana"', "monkeybanana"],
+    ],
+)
+def test_expressions(input: str, expected: Any) -> None:
+    run_register_vm_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["if (true) { 10 } else { 20 }", 10],
+        ["if (false) { 10 } else { 20 } ", 20],
+        ["if (false) { 10 }", Null],
+        ["if ((if (false) { 10 })) { 10 } else { 20 }", 20],
+        ["1 + (if (1 < 2) { 2 } else { 3 })", 3],
+        ["let one = 15; let two = one + one + one; let three = one + two + 5", 65],
+    ],
+)
+def test_conditionals_and_globals(input: str, expected: Any) -> None:
+    run_register_vm_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["[1 + 2, 3 * 4, 5 + 6]", [3, 12, 11]],
+        ["{1 + 1: 2 * 2, 3 + 3: 4 * 4}", {2: 4, 6: 16}],
+        ["[[1,2,3]][0][0]", 1],
+        ["[1,2,3][99]", Null],
+        ["{1: 1, 2: 2}[2]", 2],
+        ["{}[0]", Null],
+    ],
+)
+def test_data_structures(input: str, expected: Any) -> None:
+    run_register_vm_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let a = fn() { 1 };let b = fn() { a() + 1 };let c = fn() { b() + 1 };c()", 3],
+        ["let earlyExit = fn() { return 99; 100; };earlyExit()", 99],
+        ["let noReturn = fn() { };let noReturnTwo = fn() { noReturn(); };noReturnTwo();", Null],
+        [
+            "let returnsOneReturner = fn() { let one = fn() { 1; }; one; }; returnsOneReturner()()",
+            1,
+        ],
+        [
+            "let globalNum = 10;let sum = fn(a, b) {let c = a + b;c + globalNum;};let outer = fn() {sum(1, 2) + sum(3, 4) + globalNum;};outer() + globalNum;",
+            50,
+        ],
+        ["let f = fn(a) { let b = if (a > 1) { let c = a * 2; c } else { a }; b + 1 }; f(5)", 11],
+        ["let f = fn(a, b) { [b, a] }; f(1, f(2, 3))", [[3, 2], 1]],
+        [
+            "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(15);",
+            610,
+        ],
+    ],
+)
+def test_functions(input: str, expected: Any) -> None:
+    run_register_vm_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["fn(a, b) { a + b; }(1);", "wrong number of arguments: want=2, got=1"],
+        ["let a = 1; a();", "calling non-function"],
+    ],
+)
+def test_calling_functions_with_errors(input: str, expected: str) -> None:
+    with pytest.raises(RuntimeError) as excinfo:
+        run_register_vm_test(input, expected)
+    assert expected in str(excinfo.value)
+
+
+def test_registers_grow_with_the_frames() -> None:
+    compiler = RegisterCompiler()
+    compiler.compile(
+        parse("let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } }; sum(100)")
+    )
+    vm = RegisterVM.from_compiler(compiler)
+
+    assert len(vm.registers) == compiler.bytecode().num_registers
+    vm.run()
+    verify_expected_object(vm.last_popped_stack_elem(), 5050)
+    assert 100 < len(vm.registers) <= STACK_SIZE
+
+    with pytest.raises(StackOverflow):
+        run_register_vm_test("let f = fn(n) { f(n + 1) }; f(0)", None)
+
+
+def test_free_variables_are_rejected() -> None:
+    with pytest.raises(CompilationError):
+        RegisterCompiler().compile(parse("fn(a) { fn(b) { a + b } }"))
+
+
+@pytest.mark.parametrize("input", ["len([1, 2])", "memoize(fn(n) { n * 2 }, 10)(3)"])
+def test_builtins_are_rejected(input: str) -> None:
+    with pytest.raises(CompilationError, match="builtins are not supported"):
+        RegisterCompiler().compile(parse(input))
+
+
+def test_builtin_names_can_be_shadowed() -> None:
+    run_register_vm_test("let len = fn(a) { 2 }; len([1])", 2)
+
+
+def test_three_address_instructions() -> None:
+    compiler = RegisterCompiler()
+    compiler.compile(parse("let f = fn(a, b) { let c = a + b; c < 10 }"))
+    fn = next(c for c in compiler.constants if isinstance(c, CompiledFunction))
+
+    assert isinstance(fn, CompiledFunction)
+    assert fn.num_of_locals == 4
+    assert fn.instructions.inst[:4] == [RegisterOpCodes.OpAdd, 2, 0, 1]
+    assert register_instructions_to_string(fn.instructions) == (
+        "0000 ADD 2, 0, 1\n0004 LOADK 3, 0\n0007 GT 3, 3, 2\n0011 RETURN 3\n"
+    )
@@ -0,0 +1,56 @@
+from src.compiler import Compiler
+from src.object import CompiledFunction
+from src.sampler import SamplingProfiler
+from src.vm import VM
+from tests.helper import parse, verify_expected_object
+
+INPUT = """let fib = fn(x) {
+  if (x < 2) { return x; }
+  fib(x - 1) + fib(x - 2)
+};
+fib(20)
+"""
+
+
+def compile_vm(input: str, optimize: bool = False) -> VM:
+    compiler = Compiler(optimize=optimize)
+    compiler.compile(parse(input))
+    return VM.from_compiler(compiler=compiler)
+
+
+def test_instructions_map_to_source_lines() -> None:
+    compiler = Compiler()
+    compiler.compile(parse(INPUT))
+    fib = next(c for c in compiler.constants if isinstance(c, CompiledFunction))
+    instructions = compiler.bytecode().instructions
+
+    assert {fib.instructions.line(offset) for offset in range(len(fib.instructions))} == {2, 3}
+    assert instructions.line(0) == 1
+    assert instructions.line(len(instructions) - 1) == 5
+
+
+def test_sampler_attributes_samples_to_function_lines() -> None:
+    vm = compile_vm(INPUT)
+    sampler = SamplingProfiler(vm=vm, interval=0.0005)
+    sampler.start()
+    try:
+        vm.run()
+    finally:
+        sampler.stop()
+    stacks = sampler.stacks()
+
+    verify_expected_object(vm.last_popped_stack_elem(), 6765)
+    assert sampler.thread is None
+    assert sum(stacks.values()) > 0
+    assert all(stack[0] == "<main>:5" for stack in stacks)
+    assert {location for stack in stacks for location in stack[1:]} <= {"fib:2", "fib:3"}
+
+
+def test_collapsed_stacks() -> None:
+    vm = compile_vm(INPUT)
+    sampler = SamplingProfiler(vm=vm)
+    sampler.sample()
+    sampler.sample()
+
+    assert sampler.collapsed() == "<main>:1 2"
+    assert "<main>:1" in sampler.report()
@@ -0,0 +1,116 @@
+import base64
+import json
+import os
+import pickle
+import socket
+import stat
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from src.batch import compile_source
+from src.client import request
+from src.server import dump_bytecode, make_server
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[str]:
+    path = str(tmp_path / "monkey.sock")
+    server = make_server(path)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01})
+    thread.start()
+    yield path
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_server_runs_source(socket_path: str) -> None:
+    response = request(socket_path, {"source": 'puts("hi"); let a = [1]; push(a, 2)'})
+
+    assert response["outcome"] == "OK"
+    assert response["value"] == "[1, 2]"
+    assert response["output"] == "hi\n"
+
+
+def test_server_runs_bytecode(socket_path: str) -> None:
+    bytecode = compile_source("let f = fn(x) { x * 2 }; f(21)").bytecode()
+    payload = {"bytecode": dump_bytecode(bytecode)}
+
+    assert request(socket_path, payload)["value"] == "42"
+
+
+@pytest.mark.parametrize(
+    "payload,error",
+    [
+        [{"source": "let = 1"}, "ParseError"],
+        [{"bytecode": base64.b64encode(pickle.dumps([1])).decode()}, "BytecodeError"],
+        [{"bytecode": {"instructions": [256], "constants": []}}, "BytecodeError"],
+        [
+            {"bytecode": {"instructions": [], "constants": [{"type": "BUILTIN", "value": 0}]}},
+            "BytecodeError",
+        ],
+        [{"bytecode": {"instructions": [15, 0, 0], "constants": []}}, "does not jump forward"],
+        [{"bytecode": {"instructions": [15, 0, 2, 6], "constants": []}}, "not an instruction"],
+        [{"bytecode": {"instructions": [1, 0, 0], "constants": []}}, "out of range"],
+        [{"bytecode": {"instructions": [25, 0], "constants": []}}, "out of range"],
+        [{"bytecode": {"instructions": [1, 0], "constants": []}}, "truncated OpConstant"],
+        [{}, "expected source or bytecode"],
+    ],
+)
+def test_server_reports_errors(socket_path: str, payload: dict[str, str], error: str) -> None:
+    response = request(socket_path, payload)
+
+    assert response["outcome"] == "ERROR"
+    assert error in response["error"]
+
+
+@pytest.mark.parametrize("line", [b"[1]\n", b'"source"\n', b"1\n"])
+def test_server_rejects_requests_that_are_not_objects(socket_path: str, line: bytes) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(line)
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+
+    assert response["outcome"] == "ERROR"
+    assert "expected a JSON object" in response["error"]
+
+
+def test_server_checks_function_bytecode(socket_path: str) -> None:
+    bytecode = dump_bytecode(compile_source("let f = fn(x) { x * 2 }; f(21)").bytecode())
+    [function] = [c for c in bytecode["constants"] if c["type"] == "COMPILED_FUNCTION"]
+    function["instructions"] = [15, 0, 0] + function["instructions"]
+
+    response = request(socket_path, {"bytecode": bytecode, "timeout": 0.1})
+
+    assert response["outcome"] == "ERROR"
+    assert "does not jump forward" in response["error"]
+
+
+def test_server_times_out(socket_path: str) -> None:
+    source = "let f = fn(x) { if (x < 2) { x } else { f(x - 1) + f(x - 2) } }; f(40)"
+
+    assert request(socket_path, {"source": source, "timeout": 0.05})["outcome"] == "TIMEOUT"
+
+
+def test_server_socket_is_private(socket_path: str) -> None:
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+
+def test_server_replaces_only_stale_sockets(tmp_path: Path, socket_path: str) -> None:
+    with pytest.raises(FileExistsError):
+        make_server(socket_path)
+    regular = tmp_path / "regular"
+    regular.write_text("keep")
+    with pytest.raises(FileExistsError):
+        make_server(str(regular))
+    assert regular.read_text() == "keep"
+
+    stale = str(tmp_path / "stale.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(stale)
+    server = make_server(stale)
+    server.server_close()
@@ -0,0 +1,140 @@
+import pickle
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+
+from src.compiler import Compiler
+from src.forkserver import Prelude
+from src.object import AsyncBuiltin, Integer, Object
+from src.snapshot import Snapshot, SnapshotError
+from src.vm import NULL, VM, Status
+from tests.helper import parse, verify_expected_object
+
+SETUP = """
+let fib = fn(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+let table = {"fib": fib(15), "empty": first([])};
+let lengths = [len("ab"), len([1, 2, 3])];
+"""
+
+
+def run(input: str) -> tuple[VM, Compiler]:
+    compiler = Compiler()
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.run()
+    return vm, compiler
+
+
+def test_snapshot_restores_globals_and_symbols() -> None:
+    vm, compiler = run(SETUP)
+    snapshot = Snapshot.loads(Snapshot.take(vm, compiler.symbol_table).dumps())
+
+    compiler = snapshot.compiler()
+    compiler.compile(parse('[fib(10), table["fib"], lengths]'))
+    vm = VM.with_new_state(compiler, snapshot.restore().globals)
+    vm.run()
+
+    verify_expected_object(vm.last_popped_stack_elem(), [55, 610, [2, 3]])
+
+
+def test_snapshot_is_compact() -> None:
+    vm, compiler = run(SETUP)
+
+    snapshot = Snapshot.take(vm, compiler.symbol_table)
+
+    assert len(snapshot.globals) == 3
+    assert len(snapshot.dumps()) < 2048
+
+
+def test_snapshot_keeps_shared_objects() -> None:
+    vm, compiler = run("let x = if (false) { 1 }; let f = len; [x, true]")
+
+    restored = Snapshot.loads(Snapshot.take(vm, compiler.symbol_table).dumps()).restore()
+
+    assert restored.globals[0] is NULL
+    assert restored.globals[1] is vm.globals[1]
+
+
+def test_snapshot_resumes_a_paused_vm() -> None:
+    compiler = Compiler()
+    compiler.compile(parse(SETUP + 'table["fib"] + fib(12)'))
+    vm = VM.from_compiler(compiler=compiler)
+    assert vm.run(max_calls=100) == Status.SUSPENDED
+
+    restored = Snapshot.loads(Snapshot.take(vm).dumps()).restore()
+
+    assert restored.frame_index == vm.frame_index
+    assert restored.run() == Status.DONE
+    verify_expected_object(restored.last_popped_stack_elem(), 610 + 144)
+
+
+def test_snapshot_resumes_in_a_fresh_process(tmp_path: Path) -> None:
+    path = tmp_path / "setup.snapshot"
+    compiler = Compiler()
+    compiler.compile(parse(SETUP + "fib(18)"))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.run(max_calls=1000)
+    Snapshot.take(vm, compiler.symbol_table).save(str(path))
+
+    script = (
+        "from src.snapshot import Snapshot; "
+        f"vm = Snapshot.load({str(path)!r}).restore(); vm.run(); "
+        "print(vm.last_popped_stack_elem().inspect())"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout == "2584\n"
+
+
+def test_prelude_from_snapshot() -> None:
+    vm, compiler = run(SETUP)
+
+    prelude = Prelude.from_snapshot(Snapshot.take(vm, compiler.symbol_table))
+    vm = prelude.compile('fib(7) + table["fib"]')
+    vm.run()
+
+    assert vm.last_popped_stack_elem() == Integer(value=623)
+
+
+async def fetch() -> Object:
+    return NULL
+
+
+def test_snapshot_rejects_an_awaiting_vm() -> None:
+    compiler = Compiler()
+    symbol = compiler.symbol_table.define("fetch")
+    compiler.compile(parse("fetch()"))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.globals[symbol.index] = AsyncBuiltin(fn=fetch)
+    assert vm.run() == Status.SUSPENDED
+
+    with pytest.raises(SnapshotError):
+        Snapshot.take(vm)
+    assert vm.awaiting is not None
+    vm.awaiting.close()  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize(
+    "data", [b"not a snapshot", zlib.compress(b""), zlib.compress(pickle.dumps([1, 2]))]
+)
+def test_snapshot_rejects_invalid_data(data: bytes) -> None:
+    with pytest.raises(SnapshotError):
+        Snapshot.loads(data)
+
+
+def test_snapshot_keeps_limits() -> None:
+    compiler = Compiler()
+    compiler.compile(parse("let f = fn(n) { if (n == 0) { 0 } else { 1 + f(n - 1) } }; f(2000)"))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.set_limits(stack_size=20_000, max_frames=4_000)
+    assert vm.run(max_calls=1500) == Status.SUSPENDED
+
+    restored = Snapshot.loads(Snapshot.take(vm).dumps()).restore()
+
+    assert restored.run() == Status.DONE
+    verify_expected_object(restored.last_popped_stack_elem(), 2000)
@@ -1,10 +1,25 @@
+import asyncio
 from typing import Any
 
 import pytest
 
+from src.bytecode import OpCodes
 from src.compiler import Compiler
-from src.object import Null
-from src.vm import VM
+from src.object import AsyncBuiltin, CompiledFunction, Integer, Memoized, Null, Object
+from src.vm import (
+    GLOBALS_SIZE,
+    INITIAL_GLOBALS_SIZE,
+    INITIAL_STACK_SIZE,
+    MAX_FRAMES,
+    STACK_CHUNK,
+    STACK_SIZE,
+    VM,
+    AsyncCallError,
+    Globals,
+    Stack,
+    StackOverflow,
+    Status,
+)
 from tests.helper import parse, verify_expected_object
 
 
@@ -307,3 +322,256 @@ def test_calling_functions_with_wrong_arguments(input: str, expected: Any) -> No
     with pytest.raises(RuntimeError) as excinfo:
         run_vm_test(input, expected)
     assert expected in str(excinfo.value)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        [
+            "let countDown = fn(x) { if (x == 0) { return 0; } else { countDown(x - 1); } }; countDown(1);",
+            0,
+        ],
+        [
+            "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(15);",
+            610,
+        ],
+    ],
+)
+def test_recursive_functions(input: str, expected: Any) -> None:
+    run_vm_test(input, expected)
+
+
+def run_and_get_function(input: str) -> tuple[VM, CompiledFunction]:
+    compiler = Compiler()
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.run()
+    fn = next(c for c in compiler.constants if isinstance(c, CompiledFunction))
+    return vm, fn
+
+
+def test_integer_operations_are_quickened() -> None:
+    vm, fn = run_and_get_function("let f = fn(a, b) { if (a > b) { a - b } else { a + b } }; f(1, 2)")
+
+    assert OpCodes.OpGreaterThanInt in fn.instructions.inst
+    assert OpCodes.OpAddInt in fn.instructions.inst
+    assert OpCodes.OpSub in fn.instructions.inst
+    verify_expected_object(vm.last_popped_stack_elem(), 3)
+
+
+def test_quickened_operations_fall_back_on_type_miss() -> None:
+    vm, fn = run_and_get_function('let f = fn(a, b) { a + b }; f(1, 2); f(3, 4); f("mon", "key")')
+
+    assert OpCodes.OpAddInt not in fn.instructions.inst
+    assert OpCodes.OpAdd in fn.instructions.inst
+    verify_expected_object(vm.last_popped_stack_elem(), "monkey")
+
+
+def test_quickened_comparisons_fall_back_on_type_miss() -> None:
+    vm, fn = run_and_get_function("let f = fn(a, b) { a == b }; f(1, 1); f(true, true)")
+
+    assert OpCodes.OpEqual in fn.instructions.inst
+    verify_expected_object(vm.last_popped_stack_elem(), True)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ['len("")', 0],
+        ['len("four")', 4],
+        ["len([1, 2, 3])", 3],
+        ["first([1, 2, 3])", 1],
+        ["last([1, 2, 3])", 3],
+        ["rest([1, 2, 3])", [2, 3]],
+        ["push([], 1)", [1]],
+        ["let f = fn(a) { len(a) }; f([1, 2])", 2],
+        ["let double = memoize(fn(x) { x * 2 }, 2); [double(1), double(2), double(1)]", [2, 4, 2]],
+        [
+            "let fib = memoize(fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }, 100); fib(90)",
+            2880067194370816120,
+        ],
+        ["let f = memoize(fn(x) { if (x) { 1 } }, 10); [f(true), f(false) == f(false)]", [1, True]],
+        ["memoize(len, 1)([1, 2])", 2],
+        ["memoize(memoize(fn(x) { -x }, 1), 1)(5)", -5],
+    ],
+)
+def test_builtin_functions(input: str, expected: Any) -> None:
+    run_vm_test(input, expected)
+
+
+def test_memoized_functions_skip_repeated_calls(capsys: pytest.CaptureFixture[str]) -> None:
+    vm, _ = run_and_get_function(
+        "let f = memoize(fn(x) { puts(x); x + 1 }, 1); f(1); f(1); f(2); f(2); f(1)"
+    )
+
+    verify_expected_object(vm.last_popped_stack_elem(), 2)
+    assert capsys.readouterr().out == "1\n2\n1\n"
+    memoized = vm.globals[0]
+    assert isinstance(memoized, Memoized)
+    assert list(memoized.cache.values()) == [Integer(value=2)]
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } }; sum(100)", 5050],
+        ["let f = fn(x) { x * 2 }; [f(1), len([1, 2]), f(f(3)), memoize(f, 2)(4)]", [2, 2, 12, 8]],
+        ["1 + 2", 3],
+    ],
+)
+def test_run_suspends_and_resumes_on_call_budget(input: str, expected: Any) -> None:
+    compiler = Compiler()
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    statuses = []
+    while not statuses or statuses[-1] == Status.SUSPENDED:
+        statuses.append(vm.run(max_calls=3))
+
+    verify_expected_object(vm.last_popped_stack_elem(), expected)
+    assert all(status == Status.SUSPENDED for status in statuses[:-1])
+    assert vm.run() == Status.DONE
+
+
+def test_run_stops_at_call_budget() -> None:
+    compiler = Compiler()
+    compiler.compile(parse("let f = fn(x) { f(x + 1) }; f(0)"))
+    vm = VM.from_compiler(compiler=compiler)
+
+    assert vm.run(max_calls=100) == Status.SUSPENDED
+    assert vm.frame_index == 101
+    assert vm.stack.store[vm.current_frame().base_pointer] == Integer(value=99)
+
+
+def async_vm(input: str, **bindings: AsyncBuiltin) -> VM:
+    compiler = Compiler()
+    symbols = [compiler.symbol_table.define(name) for name in bindings]
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    for symbol, builtin in zip(symbols, bindings.values(), strict=True):
+        vm.globals[symbol.index] = builtin
+    return vm
+
+
+async def fetch(x: Object) -> Object:
+    await asyncio.sleep(0)
+    assert isinstance(x, Integer)
+    return Integer(value=x.value * 10)
+
+
+def test_run_async_awaits_async_builtins() -> None:
+    async def main() -> list[Status]:
+        vms = [
+            async_vm(
+                f"let f = fn(n) {{ if (n == 0) {{ 0 }} else {{ fetch(n) + f(n - 1) }} }}; f({n}) + {n}",
+                fetch=AsyncBuiltin(fn=fetch),
+            )
+            for n in range(1, 20)
+        ]
+        statuses = await asyncio.gather(*(vm.run_async() for vm in vms))
+        for n, vm in enumerate(vms, start=1):
+            verify_expected_object(vm.last_popped_stack_elem(), 5 * n * (n + 1) + n)
+            assert vm.frame_index == 1
+        return statuses
+
+    assert asyncio.run(main()) == [Status.DONE] * 19
+
+
+def test_run_suspends_on_async_builtins() -> None:
+    vm = async_vm("let a = fetch(1); a + 1", fetch=AsyncBuiltin(fn=fetch))
+
+    assert vm.run() == Status.SUSPENDED
+    assert vm.awaiting is not None
+    assert asyncio.run(vm.run_async()) == Status.DONE
+    verify_expected_object(vm.last_popped_stack_elem(), 11)
+
+
+def test_async_builtins_cannot_be_awaited_in_nested_calls() -> None:
+    vm = async_vm("let f = fn(x) { fetch(x) }; f(1)", fetch=AsyncBuiltin(fn=fetch))
+    fn = next(c for c in vm.constants if isinstance(c, CompiledFunction))
+
+    with pytest.raises(AsyncCallError):
+        vm.call_function(fn, [Integer(value=1)])
+    assert vm.awaiting is None
+
+
+def test_run_async_keeps_the_call_budget() -> None:
+    vm = async_vm("let a = fetch(1); let b = fetch(a); b", fetch=AsyncBuiltin(fn=fetch))
+
+    assert asyncio.run(vm.run_async(max_calls=1)) == Status.SUSPENDED
+    assert vm.globals[1] == Integer(value=10)
+    assert asyncio.run(vm.run_async()) == Status.DONE
+    verify_expected_object(vm.last_popped_stack_elem(), 100)
+
+
+def test_storage_starts_small_and_grows_on_demand() -> None:
+    vm, _ = run_and_get_function(
+        "let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } }; "
+        "let a = 1; let b = 2; sum(300) + a + b"
+    )
+
+    verify_expected_object(vm.last_popped_stack_elem(), 45153)
+    assert len(vm.globals.store) == INITIAL_GLOBALS_SIZE
+    assert INITIAL_STACK_SIZE < len(vm.stack.store) <= STACK_SIZE + 1
+    assert 300 < len(vm.frames) < MAX_FRAMES
+
+    fresh = VM.from_compiler(compiler=Compiler())
+    assert fresh.globals.store == []
+    assert fresh.stack.store == []
+    assert len(fresh.frames) == 1
+
+
+def test_globals_grow_up_to_their_limit() -> None:
+    globals = Globals()
+    globals[1000] = Integer(value=1)
+
+    assert len(globals.store) == 1024
+    assert globals[1000] == Integer(value=1)
+    assert globals[5000] is None
+    with pytest.raises(IndexError):
+        globals[GLOBALS_SIZE] = Integer(value=1)
+
+
+@pytest.mark.parametrize(
+    "input",
+    [
+        "let f = fn(n) { f(n + 1) }; f(0)",
+        "let f = fn(n) { [1, 2, 3, 4, 5, 6, 7, 8, 9, f(n + 1)] }; f(0)",
+    ],
+)
+def test_unbounded_recursion_overflows(input: str) -> None:
+    program = parse(input)
+    compiler = Compiler()
+    compiler.compile(program)
+    vm = VM.from_compiler(compiler=compiler)
+
+    with pytest.raises(StackOverflow):
+        vm.run()
+    assert len(vm.frames) <= MAX_FRAMES
+    assert len(vm.stack.store) <= STACK_SIZE + 1
+
+
+def test_limits_allow_deep_recursion() -> None:
+    compiler = Compiler()
+    compiler.compile(
+        parse("let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } }; sum(5000)")
+    )
+    vm = VM.from_compiler(compiler=compiler)
+    vm.set_limits(stack_size=100_000, max_frames=10_000)
+
+    vm.run()
+
+    verify_expected_object(vm.last_popped_stack_elem(), 12502500)
+    assert MAX_FRAMES < len(vm.frames) <= 10_000
+    assert STACK_SIZE < len(vm.stack.store) <= 100_001
+
+
+def test_stack_grows_in_chunks() -> None:
+    stack = Stack(stack_size=10 * STACK_CHUNK)
+    stack.reserve(STACK_CHUNK + 1)
+    assert len(stack.store) == 2 * STACK_CHUNK
+
+    stack.reserve(2 * STACK_CHUNK + 1)
+    assert len(stack.store) == 3 * STACK_CHUNK
+
+    with pytest.raises(StackOverflow):
+        stack.reserve(10 * STACK_CHUNK + 2)
@@ -0,0 +1,52 @@
+import sys
+
+import pytest
+
+from src.bench.suite.runner import Statistics, compare, run_workload
+from src.bench.suite.workloads import WORKLOADS, Workload
+
+
+@pytest.mark.parametrize("engine", ["eval", "eval-stack", "vm"])
+@pytest.mark.parametrize("workload", WORKLOADS, ids=[w.name for w in WORKLOADS])
+def test_workloads_produce_expected_results(workload: Workload, engine: str) -> None:
+    result = run_workload(workload, engine, warmups=0, repeats=1)
+
+    if workload.name == "closures" and engine == "vm":
+        assert result.status == "unsupported"
+    else:
+        assert result.status == "ok", result.message
+        assert result.statistics is not None
+
+
+def test_eval_restores_the_recursion_limit() -> None:
+    limit = sys.getrecursionlimit()
+
+    result = run_workload(WORKLOADS[0], "eval", warmups=0, repeats=1)
+
+    assert result.status == "ok"
+    assert sys.getrecursionlimit() == limit
+
+
+def test_wrong_results_fail() -> None:
+    result = run_workload(Workload("wrong", "1 + 1", "3"), "vm", warmups=0, repeats=1)
+
+    assert result.status == "failed"
+    assert result.message == "expected 3, got 2"
+
+
+def test_statistics() -> None:
+    stats = Statistics.from_timings([1.0, 2.0, 6.0])
+
+    assert (stats.min, stats.max, stats.mean, stats.median) == (1.0, 6.0, 3.0, 2.0)
+
+
+def test_compare() -> None:
+    old = [
+        {"workload": "a", "engine": "vm", "statistics": {"median": 2.0}},
+        {"workload": "b", "engine": "vm", "statistics": None},
+    ]
+    new = [{"workload": "a", "engine": "vm", "statistics": {"median": 1.5}}]
+
+    comparisons = compare(old, new)
+
+    assert [c.change() for c in comparisons] == [-0.25, None]
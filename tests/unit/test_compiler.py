@@ -770,3 +770,63 @@ def test_let_statement_scopes(input, expected_constants, expected_instructions):
     verify_instructions(bytecode.instructions, flatten(expected_instructions))
 
     verify_constants(bytecode.constants, expected_constants)
+
+
+@pytest.mark.parametrize(
+    "input,expected_constants,expected_instructions",
+    [
+        [
+            "len([]); push([], 1);",
+            [1],
+            [
+                make(OpCodes.OpGetBuiltin, [0]),
+                make(OpCodes.OpArray, [0]),
+                make(OpCodes.OpCall, [1]),
+                make(OpCodes.OpPop, []),
+                make(OpCodes.OpGetBuiltin, [4]),
+                make(OpCodes.OpArray, [0]),
+                make(OpCodes.OpConstant, [0]),
+                make(OpCodes.OpCall, [2]),
+                make(OpCodes.OpPop, []),
+            ],
+        ],
+        [
+            "fn() { len([]) }",
+            [
+                [
+                    make(OpCodes.OpGetBuiltin, [0]),
+                    make(OpCodes.OpArray, [0]),
+                    make(OpCodes.OpCall, [1]),
+                    make(OpCodes.OpReturnValue, []),
+                ],
+            ],
+            [
+                make(OpCodes.OpConstant, [0]),
+                make(OpCodes.OpPop, []),
+            ],
+        ],
+    ],
+)
+def test_builtins(input, expected_constants, expected_instructions):
+    program = parse(input)
+    compiler = Compiler()
+    compiler.compile(program)
+
+    bytecode = compiler.bytecode()
+
+    verify_instructions(bytecode.instructions, flatten(expected_instructions))
+
+    verify_constants(bytecode.constants, expected_constants)
+
+
+@pytest.mark.parametrize(
+    "input",
+    [
+        "fn(a) { fn(b) { a + b } }",
+        "fn() { let a = 1; fn() { a } }",
+    ],
+)
+def test_free_variables_compile_error(input):
+    compiler = Compiler()
+    with pytest.raises(CompilationError, match="closures are not supported: a"):
+        compiler.compile(parse(input))
@@ -14,6 +14,7 @@ from src.object import (
     Integer,
     Null,
     Object,
+    ReturnValue,
     String,
 )
 
@@ -157,6 +158,9 @@ def test_if_else_expression(input: str, expected: int | None):
             """,
             10,
         ],
+        ["let f = fn() { 1 + if (true) { return 2; } }; f() + 1", 3],
+        ["let f = fn() { let x = if (true) { return 4; }; 5 }; f()", 4],
+        ["let f = fn(x) { [1, if (x) { return x; }] }; f(6)", 6],
     ],
 )
 def test_return_statements(input: str, expected: int | None):
@@ -212,6 +216,12 @@ def test_return_statements(input: str, expected: int | None):
             '{"name": "Monkey"}[fn(x) { x }];',
             "unusable as hash key: FUNCTION",
         ],
+        ["let f = fn(x) { x + true }; [1, f(1), 3]", "type mismatch: INTEGER + BOOLEAN"],
+        [
+            'let f = memoize(fn(x) { len(x) }, 2); f(1); f("ok")',
+            "argument to 'len' not supported, got INTEGER",
+        ],
+        ["1(2)", "not a function or builtin: INTEGER"],
     ],
 )
 def test_error_handling(input: str, expected: str):
@@ -278,6 +288,48 @@ def test_closures():
     check_integer_object(evaluated, 4)
 
 
+def test_closures_capture_only_bindings_they_reference():
+    evaluated = execute_eval(
+        "let make = fn(x, big) { let unused = [big]; fn(a) { fn(y) { x + y } } }; make(1, [2])(3)"
+    )
+
+    assert isinstance(evaluated, Function)
+    assert evaluated.env.store == {"x": Integer(value=1)}
+    assert evaluated.env.outer is not None
+    assert evaluated.env.outer.outer is None
+
+
+def test_closures_keep_frames_whose_bindings_may_change():
+    evaluated = execute_eval("let make = fn(big) { let g = fn() { h }; let h = 1; g }; make([1])")
+
+    assert isinstance(evaluated, Function)
+    assert evaluated.env.store.keys() == {"big", "g", "h"}
+
+
+def test_closures_without_free_locals_drop_enclosing_frames():
+    evaluated = execute_eval("let make = fn(big) { let n = [big]; fn(y) { y * 2 } }; make([1])")
+
+    assert isinstance(evaluated, Function)
+    assert "make" in evaluated.env.store
+    assert evaluated.env.outer is None
+
+
+@pytest.mark.parametrize(
+    "input, expected",
+    [
+        ["let f = fn() { let g = fn() { h() }; let h = fn() { 3 }; g() }; f()", 3],
+        ["let x = 1; let f = fn() { let g = fn() { x }; let x = 2; g() }; f()", 2],
+        [
+            "let f = fn(n) { let go = fn(i) { if (i == 0) { n } else { go(i - 1) } }; go(3) }; f(7)",
+            7,
+        ],
+        ["let f = fn() { let g = fn() { y }; g }; let h = f(); let y = 5; h()", 5],
+    ],
+)
+def test_closures_see_later_bindings(input: str, expected: int):
+    check_integer_object(execute_eval(input), expected)
+
+
 def test_function_as_argument():
     input = """
         let add = fn(a, b) { a + b };
@@ -562,3 +614,52 @@ def test_hash_index_expressions(input: str, expected: int | str | None):
         check_string_object(evaluated, expected)
     if expected is None:
         check_null_object(evaluated)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let double = memoize(fn(x) { x * 2 }, 2); double(2) + double(2)", 8],
+        [
+            "let fib = memoize(fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }, 100); fib(40)",
+            102334155,
+        ],
+        ["memoize(len, 1)([1, 2])", 2],
+        ["memoize(fn(x) { x }, 1)", "memoized(fn(x) {\nx\n}, 1)"],
+        ["memoize(1, 1)", "argument to 'memoize' must be FUNCTION, got INTEGER"],
+        ["memoize(len, 0)", "size of 'memoize' must be a positive INTEGER, got 0"],
+        ["memoize(len)", "wrong number of arguments. got=1, want=2"],
+    ],
+)
+def test_memoize_builtin_functions(input: str, expected: int | str):
+    evaluated = execute_eval(input)
+    if isinstance(expected, int):
+        check_integer_object(evaluated, expected)
+    if isinstance(expected, str) and isinstance(evaluated, Error):
+        assert evaluated.message == expected
+    if isinstance(expected, str) and not isinstance(evaluated, Error):
+        assert evaluated.inspect() == expected
+
+
+def test_memoized_functions_are_not_reevaluated(capsys: pytest.CaptureFixture[str]):
+    execute_eval("let f = memoize(fn(x) { puts(x); x }, 1); f(1); f(1); f(2); f(1)")
+
+    assert capsys.readouterr().out == "1\n2\n1\n"
+
+
+def test_errors_stop_evaluation(capsys: pytest.CaptureFixture[str]):
+    evaluated = execute_eval("let x = foo + puts(1); puts(2)")
+
+    assert evaluated == Error(message="identifier not found: foo")
+    assert capsys.readouterr().out == ""
+
+
+def test_conditions_are_evaluated_once(capsys: pytest.CaptureFixture[str]):
+    check_integer_object(execute_eval("if (puts(1)) { 2 } else { 3 }"), 3)
+    assert capsys.readouterr().out == "1\n"
+
+
+def test_return_outside_of_a_program_is_wrapped():
+    program = Parser(lexer=Lexer("return 1; 2")).parse_program()
+
+    assert eval(program.statements[0], Environment()) == ReturnValue(value=Integer(value=1))
@@ -1,4 +1,15 @@
-from src.object import Object, String
+from src.object import (
+    Array,
+    Boolean,
+    Error,
+    Hash,
+    Integer,
+    Memoized,
+    Null,
+    Object,
+    String,
+    memo_key,
+)
 
 
 def test_string_hash_key():
@@ -19,3 +30,23 @@ def test_string_hash_key():
     assert name1 != name3
 
     assert diff1 == diff2
+
+
+def test_memo_key():
+    assert memo_key([Integer(value=1), String(value="a")]) == memo_key(
+        [Integer(value=1), String(value="a")]
+    )
+    assert memo_key([Integer(value=1)]) != memo_key([Boolean(value=True)])
+    assert memo_key([Array(elements=[Null()])]) == ((None,),)
+    assert memo_key([Hash(pairs={})]) is None
+
+
+def test_memoized_cache_is_bounded_lru():
+    memoized = Memoized(fn=Null(), size=2)
+    memoized.store(1, Integer(value=1))
+    memoized.store(2, Integer(value=2))
+    memoized.lookup(1)
+    memoized.store(3, Integer(value=3))
+    memoized.store(4, Error(message="not cached"))
+
+    assert list(memoized.cache) == [1, 3]
@@ -0,0 +1,217 @@
+from typing import Any
+
+import pytest
+
+from src.bytecode import OpCodes
+from src.compiler import Compiler
+from src.evaluator import eval
+from src.object import CompiledFunction, Environment, Integer
+from src.optimizer import eliminate_dead_code, memoize_pure_functions, pure_functions
+from src.vm import VM
+from tests.helper import parse, verify_expected_object
+
+
+def compile_optimized(input: str) -> Compiler:
+    compiler = Compiler(optimize=True)
+    compiler.compile(parse(input))
+    return compiler
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let one = 1; let two = 2; 3", "3"],
+        ["let one = 1; let two = 2", "let two = 2;"],
+        ["let f = fn() { 1 }; let g = fn() { f() }; 3", "3"],
+        ["let f = fn() { 1 }; let g = fn() { f() }; g()", "let f = fn() 1;let g = fn() f();g()"],
+        ["let a = [1, {1: 2}]; let b = puts(1); 3", "let b = puts(1);3"],
+        ["let a = b; 3", "let a = b;3"],
+        ["fn() { return 1; 2; 3 }", "fn() return 1;"],
+        [
+            "fn(x) { if (x) { return 1 } else { return 2 }; 3 }",
+            "fn(x) if x return 1; else return 2;",
+        ],
+        ["fn(x) { if (x) { return 1 }; 3 }", "fn(x) if x return 1;3"],
+        ["fn(x) { let a = 1; x }", "fn(x) x"],
+    ],
+)
+def test_eliminate_dead_code(input: str, expected: str) -> None:
+    assert eliminate_dead_code(parse(input)).to_string() == expected
+
+
+def test_eliminate_dead_code_does_not_modify_input() -> None:
+    program = parse("let one = 1; 2")
+    eliminate_dead_code(program)
+
+    assert program.to_string() == "let one = 1;2"
+
+
+def test_dead_code_is_not_compiled() -> None:
+    compiler = compile_optimized(
+        "let unused = fn() { 1 }; let f = fn() { return 2; fn() { 3 } }; let x = 4; f"
+    )
+    functions = [c for c in compiler.constants if isinstance(c, CompiledFunction)]
+    integers = [c.value for c in compiler.constants if isinstance(c, Integer)]
+
+    assert len(functions) == 1
+    assert integers == [2]
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let f = fn() { return 1; 2; 3 }; f()", 1],
+        ["let a = 1; let b = fn() { a + 1 }; b()", 2],
+        ["let f = fn(x) { let unused = [x]; let y = x * 2; y }; f(2)", 4],
+        ["let f = fn(x) { if (x > 1) { return 1 } else { return 2 }; 3 }; f(2) + f(0)", 3],
+        ["let one = 1; let two = 2", 2],
+    ],
+)
+def test_optimized_programs_run_like_unoptimized_ones(input: str, expected: Any) -> None:
+    vm = VM.from_compiler(compiler=compile_optimized(input))
+    vm.run()
+    result = vm.last_popped_stack_elem()
+
+    assert result is not None
+    verify_expected_object(result, expected)
+
+
+def function_instructions(compiler: Compiler) -> list[list[int]]:
+    return [c.instructions.inst for c in compiler.constants if isinstance(c, CompiledFunction)]
+
+
+@pytest.mark.parametrize(
+    "input,inlined",
+    [
+        ["let add = fn(a, b) { a + b }; let f = fn(x) { add(x, 1) }; f", True],
+        ["let f = fn(x) { let inc = fn(y) { y + 1 }; inc(x) }; f", True],
+        ["let add = fn(a, b) { return a + b; }; let f = fn(x) { add(x, 1) }; f", True],
+        ["let f = fn(n) { if (n == 0) { 0 } else { f(n - 1) } }; f", False],
+        ["let g = 1; let add = fn(a) { a + g }; let f = fn(g) { add(g) }; f", False],
+        [
+            "let add = fn(a, b) { a + b }; let add = fn(a, b) { a - b }; let f = fn(x) { add(x, 1) }; f",
+            False,
+        ],
+        ["let add = fn(a, b) { a + b }; let f = fn(x) { add(x) }; f", False],
+        ["let early = fn(a) { if (a) { return 1; }; 2 }; let f = fn(x) { early(x) }; f", False],
+        ["let nested = fn(a) { fn() { 1 } }; let f = fn(x) { nested(x) }; f", False],
+        [
+            "let big = fn(a) { a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a }; let f = fn(x) { big(x) }; f",
+            False,
+        ],
+    ],
+)
+def test_inlining_candidates(input: str, inlined: bool) -> None:
+    caller = function_instructions(compile_optimized(input))[-1]
+
+    assert (OpCodes.OpCall not in caller) == inlined
+
+
+def test_inlined_locals_are_remapped_into_the_caller_frame() -> None:
+    compiler = compile_optimized(
+        "let add = fn(a, b) { let c = a + b; c }; let f = fn(x) { add(x, 1) }; f"
+    )
+    caller = next(c for c in compiler.constants[::-1] if isinstance(c, CompiledFunction))
+
+    assert caller.num_of_locals == 4
+    assert compiler.symbol_table.resolve("add$a") is None
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let add = fn(a, b) { a + b }; let f = fn(x) { add(x, add(x * 10, 1)) }; f(3)", 34],
+        ["let sub = fn(a, b) { a - b }; let f = fn(x) { sub(sub(x, 1), sub(10, x)) }; f(3)", -5],
+        ["let add = fn(a, b) { a + b }; add(add(1, 2), add(30, 40))", 73],
+        ["let b = fn(x) { x + 1 }; let a = fn(x) { b(x) * 2 }; let c = fn() { a(a(1)) }; c()", 10],
+        [
+            "let f = fn(x) { if (x > 1) { x } }; let g = fn() { [f(5), f(0) == f(0)] }; g()",
+            [5, True],
+        ],
+        [
+            "let sq = fn(x) { let y = x * x; return y; }; let f = fn(n) { sq(n) + sq(n + 1) }; f(2)",
+            13,
+        ],
+        ["let noop = fn() { }; let f = fn() { noop() }; f() == noop()", True],
+        ["let f = fn(a) { {a: a + 1} }; f(1)[1]", 2],
+        ["let x = 1; let f = fn() { x }; let x = 2; f()", 1],
+        ["let x = 1; let f = fn(a) { a + x }; let g = fn() { let x = 5; f(1) }; g()", 2],
+        ["let f = fn(a) { let k = a * 2; {k: a, a: k} }; let h = f(3); [h[6], h[3]]", [3, 6]],
+    ],
+)
+def test_inlined_calls_run_like_calls(input: str, expected: Any) -> None:
+    vm = VM.from_compiler(compiler=compile_optimized(input))
+    vm.run()
+    result = vm.last_popped_stack_elem()
+
+    assert result is not None
+    verify_expected_object(result, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let f = fn(x) { x + 1 }; f(1)", {"f"}],
+        ["let n = 2; let f = fn(x) { let y = x * n; [y, len([y])] }; f(1)", {"f"}],
+        ["let f = fn(x) { g(x) }; let g = fn(x) { f(x) }; f(1)", {"f", "g"}],
+        ["let f = fn(x) { puts(x) }; let g = fn(x) { f(x) }; g(1)", set()],
+        ["let n = puts(1); let f = fn(x) { x + n }; f(1)", set()],
+        ["let n = 1; let n = 2; let f = fn(x) { x + n }; f(1)", set()],
+        ["let f = fn(x) { x(1) }; f(len)", set()],
+        ["let f = fn(x) { fn(y) { x + y } }; f(1)", set()],
+        ["let f = fn(x) { [x][0](1) }; f(1)", set()],
+        ["let len = fn(x) { x }; let f = fn(x) { len(x) }; f(1)", {"f", "len"}],
+        ["let f = fn(x) { let len = x; len(x) }; f(1)", set()],
+    ],
+)
+def test_pure_functions(input: str, expected: set[str]) -> None:
+    assert set(pure_functions(parse(input))) == expected
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        [
+            "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(3)",
+            "let fib = memoize(fn(x) if (x < 2) x else (fib((x - 1)) + fib((x - 2))), 1024);fib(3)",
+        ],
+        [
+            "let sum = fn(x) { if (x == 0) { 0 } else { x + sum(x - 1) } }; sum(3)",
+            "let sum = fn(x) if (x == 0) 0 else (x + sum((x - 1)));sum(3)",
+        ],
+        [
+            "let fib = fn(x) { if (x < 2) { puts(x) } else { fib(x - 1) + fib(x - 2) } }; fib(3)",
+            "let fib = fn(x) if (x < 2) puts(x) else (fib((x - 1)) + fib((x - 2)));fib(3)",
+        ],
+        [
+            "let memoize = 1; let f = fn(x) { f(x) + f(x) }; f(3)",
+            "let memoize = 1;let f = fn(x) (f(x) + f(x));f(3)",
+        ],
+    ],
+)
+def test_memoize_pure_functions(input: str, expected: str) -> None:
+    assert memoize_pure_functions(parse(input)).to_string() == expected
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        [
+            "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(60)",
+            1548008755920,
+        ],
+        [
+            "let last = fn(n) { if (n < 2) { [n] } else { push(rest(last(n - 1)), len(last(n - 2))) } }; last(40)",
+            [1],
+        ],
+    ],
+)
+def test_memoized_programs_run_like_unmemoized_ones(input: str, expected: Any) -> None:
+    compiler = Compiler(optimize=True, memoize=True)
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    vm.run()
+    evaluated = eval(memoize_pure_functions(parse(input)), Environment())
+
+    assert vm.last_popped_stack_elem() == evaluated
+    verify_expected_object(evaluated, expected)
@@ -461,6 +461,21 @@ def test_function_literal_parsing():
         )
 
 
+def test_function_literal_with_name():
+    lexer = Lexer("let myFunction = fn() { };")
+
+    parser = Parser(lexer=lexer)
+    program = parser.parse_program()
+
+    check_parser_errors(parser=parser)
+
+    assert isinstance(program.statements[0], LetStatement)
+
+    assert isinstance(program.statements[0].value, FunctionLiteral)
+
+    assert program.statements[0].value.name == "myFunction"
+
+
 @pytest.mark.parametrize(
     "input,expected_params",
     [
@@ -0,0 +1,129 @@
+from typing import Any
+
+import pytest
+
+from src.bytecode import OpCodes, make
+from src.compiler import Compiler
+from src.jit import Jit
+from src.object import CompiledFunction
+from src.vm import VM
+from tests.helper import flatten, parse, verify_expected_object
+
+
+def compile_function(input: str, optimize: bool = True) -> CompiledFunction:
+    compiler = Compiler(optimize=optimize)
+    compiler.compile(parse(input))
+    return next(c for c in compiler.constants if isinstance(c, CompiledFunction))
+
+
+@pytest.mark.parametrize(
+    "input,expected_instructions",
+    [
+        [
+            "fn(x) { if (x > 2) { x } else { 1 } }",
+            [
+                make(OpCodes.OpGetLocal, [0]),
+                make(OpCodes.OpConstant, [0]),
+                make(OpCodes.OpGreaterThan, []),
+                make(OpCodes.OpJumpNotTruthy, [12]),
+                make(OpCodes.OpGetLocal, [0]),
+                make(OpCodes.OpReturnValue, []),
+                make(OpCodes.OpConstant, [1]),
+                make(OpCodes.OpReturnValue, []),
+            ],
+        ],
+        [
+            "fn(x) { if (x) { 1 }; 2 }",
+            [
+                make(OpCodes.OpConstant, [1]),
+                make(OpCodes.OpReturnValue, []),
+            ],
+        ],
+        [
+            "fn() { if (true) { 1 } else { 2 } }",
+            [
+                make(OpCodes.OpConstant, [0]),
+                make(OpCodes.OpReturnValue, []),
+            ],
+        ],
+        [
+            "fn() { if (false) { 1 } }",
+            [
+                make(OpCodes.OpReturn, []),
+            ],
+        ],
+        [
+            "fn(x) { if (!x) { 1 } else { 2 } }",
+            [
+                make(OpCodes.OpGetLocal, [0]),
+                make(OpCodes.OpJumpTruthy, [9]),
+                make(OpCodes.OpConstant, [0]),
+                make(OpCodes.OpReturnValue, []),
+                make(OpCodes.OpConstant, [1]),
+                make(OpCodes.OpReturnValue, []),
+            ],
+        ],
+        [
+            "fn(x) { if (x == 0) { return 0; } else { if (x == 1) { return 1; } else { x } } }",
+            [
+                make(OpCodes.OpGetLocal, [0]),
+                make(OpCodes.OpConstant, [0]),
+                make(OpCodes.OpEqual, []),
+                make(OpCodes.OpJumpNotTruthy, [13]),
+                make(OpCodes.OpConstant, [1]),
+                make(OpCodes.OpReturnValue, []),
+                make(OpCodes.OpGetLocal, [0]),
+                make(OpCodes.OpConstant, [2]),
+                make(OpCodes.OpEqual, []),
+                make(OpCodes.OpJumpNotTruthy, [26]),
+                make(OpCodes.OpConstant, [3]),
+                make(OpCodes.OpReturnValue, []),
+                make(OpCodes.OpGetLocal, [0]),
+                make(OpCodes.OpReturnValue, []),
+            ],
+        ],
+    ],
+)
+def test_peephole_rewrites(input: str, expected_instructions: list[list[int]]) -> None:
+    assert compile_function(input).instructions.inst == flatten(expected_instructions)
+
+
+def test_main_program_is_not_optimized() -> None:
+    compiler = Compiler(optimize=True)
+    compiler.compile(parse("if (true) { 1 }; 2"))
+    unoptimized = Compiler()
+    unoptimized.compile(parse("if (true) { 1 }; 2"))
+
+    assert compiler.bytecode().instructions == unoptimized.bytecode().instructions
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let f = fn(x) { if (!x) { 1 } else { 2 } }; [f(true), f(false), f(0)]", [2, 1, 2]],
+        ["let f = fn(x) { if (x) { 1 } }; if (f(false)) { 5 } else { f(true) }", 1],
+        ["let f = fn(x) { let y = if (x < 2) { 10 } else { 20 }; y + x }; f(1) + f(3)", 34],
+        ["let f = fn(x) { if (!(x > 1)) { return x; }; x * 2 }; [f(1), f(5)]", [1, 10]],
+        [
+            "let fib = fn(x) { if (x == 0) { return 0; } else { if (x == 1) { return 1; } else { fib(x - 1) + fib(x - 2) } } }; fib(15)",
+            610,
+        ],
+    ],
+)
+@pytest.mark.parametrize("jit", [False, True])
+def test_optimized_functions_run_like_unoptimized_ones(
+    input: str, expected: Any, jit: bool
+) -> None:
+    compiler = Compiler(optimize=True)
+    compiler.compile(parse(input))
+    vm = VM.from_compiler(compiler=compiler)
+    if jit:
+        vm.enable_jit(threshold=1)
+        for fn in compiler.constants:
+            if isinstance(fn, CompiledFunction):
+                assert Jit(vm=vm).compile(fn) is not None
+    vm.run()
+    result = vm.last_popped_stack_elem()
+
+    assert result is not None
+    verify_expected_object(result, expected)
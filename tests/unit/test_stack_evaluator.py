@@ -0,0 +1,97 @@
+import sys
+
+import pytest
+
+from src import evaluator, stack_evaluator
+from src.object import Environment, Error, Integer
+from tests.helper import parse
+
+
+@pytest.mark.parametrize(
+    "input",
+    [
+        "",
+        "5; -10; !true; !!5",
+        "(5 + 10 * 2 + 15 / 3) * 2 + -10",
+        '"Hello" + " " + "World!"',
+        "if (1 > 2) { 10 } else { 20 }",
+        "if (false) { 10 }",
+        "9; return 2 * 5; 9;",
+        "if (10 > 1) { if (10 > 1) { return 10; } return 1; }",
+        "let f = fn(x) { return x; x + 10; }; f(10);",
+        "let f = fn(x) { let result = x + 10; return result; return 10; }; f(10);",
+        "let a = 5; let b = a; let c = a + b + 5; c;",
+        "let add = fn(a, b) { a + b }; add(5 + 5, add(5, 5));",
+        "fn(x) { x; }(5)",
+        "let newAdder = fn(x) { fn(y) { x + y }; }; let addTwo = newAdder(2); addTwo(2);",
+        "let x = 1; let f = fn() { x }; let x = 2; f()",
+        "let f = fn() { let g = fn() { h() }; let h = fn() { 3 }; g() }; f()",
+        "let make = fn(big) { let n = [big]; fn(y) { y * 2 } }; make([1])(2)",
+        "let g = fn() { let a = 1; }; g()",
+        'len("hello"); len([1, 2, 3]); len(1)',
+        "let a = [1, 2 * 2, 3 + 3]; [a[0], a[1 + 1], a[3], a[-1], first(a), last(a), rest(a)]",
+        "let m = fn(a, f) { if (len(a) == 0) { [] } else { push(m(rest(a), f), f(first(a))) } }; "
+        "m([1, 2, 3], fn(x) { x * 2 })",
+        'let two = "two"; {"one": 10 - 9, two: 1 + 1, "thr" + "ee": 6 / 2, 4: 4, true: 5}',
+        '{"foo": 5}["foo"]; {"foo": 5}["bar"]; {5: 5}[5]; {}["foo"]',
+        "let fib = memoize(fn(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } }, 100); "
+        "fib(40)",
+        "let id = memoize(memoize(fn(x) { x }, 2), 2); [id(1), id(fn() { 1 })()]",
+        "5 + true;",
+        "5 + true; 5;",
+        "-true",
+        "true + false;",
+        "if (10 > 1) { true + false; }",
+        "if (10 > 1) { if (10 > 1) { return true + false; } return 1; }",
+        "foobar",
+        '"Hello" - "World"',
+        '{"name": "Monkey"}[fn(x) { x }];',
+        "[1, foo, 3]",
+        "len(foo, 1)",
+        "let f = fn(x) { x }; f(undefined)",
+        "undefined(1)",
+        "1(2)",
+        "(foo + 1) + bar",
+        "1 + if (true) { return 2 }",
+        "let x = if (true) { return 3 }; x",
+    ],
+)
+def test_stack_evaluator_matches_evaluator(input: str) -> None:
+    expected = evaluator.eval(parse(input), Environment())
+    actual = stack_evaluator.eval(parse(input), Environment())
+
+    assert type(actual) is type(expected)
+    assert actual.inspect() == expected.inspect()
+
+
+def test_stack_evaluator_handles_deep_recursion() -> None:
+    depth = 5_000
+    program = parse(
+        "let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } }; "
+        f"let count = fn(n, acc) {{ if (n == 0) {{ return acc; }} count(n - 1, acc + 1) }}; "
+        f"[sum({depth}), count({depth}, 0)]"
+    )
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(1000)
+    try:
+        result = stack_evaluator.eval(program, Environment())
+    finally:
+        sys.setrecursionlimit(limit)
+
+    assert result.inspect() == f"[{depth * (depth + 1) // 2}, {depth}]"
+
+
+def test_stack_evaluator_reports_errors_from_deep_recursion() -> None:
+    program = parse("let f = fn(n) { if (n == 0) { x } else { 1 + f(n - 1) } }; f(5000); 1")
+
+    result = stack_evaluator.eval(program, Environment())
+
+    assert result == Error(message="identifier not found: x")
+
+
+def test_stack_evaluator_evaluates_conditions_once(capsys: pytest.CaptureFixture[str]) -> None:
+    result = stack_evaluator.eval(parse("if (puts(1)) { 2 } else { 3 }"), Environment())
+
+    assert result == Integer(value=3)
+    assert capsys.readouterr().out == "1\n"
@@ -146,3 +146,26 @@ def test_next_token_with_simple_code():
 
         assert token.token_type == expected_token[0]
         assert token.literal == expected_token[1]
+
+
+def test_next_token_records_lines():
+    lexer = Lexer('let a = 1;\n\nlet b = "x\ny";\nb')
+    lines = []
+    token = lexer.next_token()
+    while token.token_type != TokenType.EOF:
+        lines.append((token.literal, token.line))
+        token = lexer.next_token()
+
+    assert lines == [
+        ("let", 1),
+        ("a", 1),
+        ("=", 1),
+        ("1", 1),
+        (";", 1),
+        ("let", 3),
+        ("b", 3),
+        ("=", 3),
+        ("x\ny", 3),
+        (";", 4),
+        ("b", 5),
+    ]
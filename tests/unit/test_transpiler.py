@@ -0,0 +1,156 @@
+from typing import Any
+
+import pytest
+
+from src.object import Error, Null
+from src.transpiler import transpile
+from src.transpiler import run as run_transpiled
+from tests.helper import parse, verify_expected_object
+
+
+def run_transpiler_test(input: str, expected: Any) -> None:
+    result = run_transpiled(parse(input))
+    if expected is None:
+        assert isinstance(result, Null)
+        return
+    verify_expected_object(result, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["5", 5],
+        ["-10", -10],
+        ["50 / 2 * 2 + 10 - 5", 55],
+        ["(5 + 10 * 2 + 15 / 3) * 2 + -10", 50],
+        ["1 < 2", True],
+        ["1 > 2", False],
+        ["(1 < 2) == true", True],
+        ["!5", False],
+        ["!!true", True],
+        ["!(if (false) { 5; })", True],
+        ['"mon" + "key"', "monkey"],
+        ['"a" == "a"', True],
+    ],
+)
+def test_expressions(input: str, expected: Any) -> None:
+    run_transpiler_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["if (true) { 10 }", 10],
+        ["if (false) { 10 }", None],
+        ["if (1) { 10 } else { 20 }", 10],
+        ["if ((if (false) { 10 })) { 10 } else { 20 }", 20],
+        ["1 + (if (true) { 2 } else { 3 })", 3],
+        ["let x = if (1 > 2) { 10 } else { let y = 3; y * 2 }; x", 6],
+        ["if (10 > 1) { if (10 > 1) { return 10; } return 1; }", 10],
+        ["9; return 2 * 5; 9;", 10],
+    ],
+)
+def test_conditionals_and_returns(input: str, expected: Any) -> None:
+    run_transpiler_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["let identity = fn(x) { x; }; identity(5);", 5],
+        ["let add = fn(a, b) { a + b }; add(5, add(5, 5));", 15],
+        ["fn(x) { x; }(5)", 5],
+        ["let newAdder = fn(x) { fn(y) { x + y } }; newAdder(2)(3)", 5],
+        ["let f = fn() { g() }; let g = fn() { 7 }; f()", 7],
+        ["let x = 1; let g = fn() { let x = x + 1; x }; g() + x", 3],
+        ["let noReturn = fn() { }; noReturn();", None],
+        [
+            "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(15)",
+            610,
+        ],
+        [
+            """
+            let map = fn(arr, f) {
+                let iter = fn(arr, accumulated) {
+                    if (len(arr) == 0) {
+                        accumulated
+                    } else {
+                        iter(rest(arr), push(accumulated, f(first(arr))));
+                    }
+                };
+                iter(arr, []);
+            };
+            map([1, 2, 3], fn(x) { x * 2 });
+            """,
+            [2, 4, 6],
+        ],
+    ],
+)
+def test_functions(input: str, expected: Any) -> None:
+    run_transpiler_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["[1, 2 * 2, 3 + 3]", [1, 4, 6]],
+        ["[1, 2, 3][3]", None],
+        ["[1, 2, 3][-1]", 3],
+        ["last([1, 2, 3])", 3],
+        ["first([])", None],
+        ['{"one": 1, true: 2, 1: 3}["one"]', 1],
+        ['{"one": 1, true: 2, 1: 3}[true]', 2],
+        ['{"one": 1, true: 2, 1: 3}[1]', 3],
+        ["{1: 1}[0]", None],
+        ['{"a": 1, "b": 2}', {"a": 1, "b": 2}],
+        ['len("four")', 4],
+        ["memoize(fn(n) { n * 2 }, 10)(3)", 6],
+        [
+            "let fib = memoize(fn(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } }, 100); "
+            "fib(60)",
+            1548008755920,
+        ],
+        [
+            "let id = memoize(memoize(fn(x) { x }, 2), 2); [id([1, true]), id(fn() { 1 })()]",
+            [[1, True], 1],
+        ],
+        ["memoize(len, 1)([1, 2])", 2],
+    ],
+)
+def test_data_structures_and_builtins(input: str, expected: Any) -> None:
+    run_transpiler_test(input, expected)
+
+
+@pytest.mark.parametrize(
+    "input,expected",
+    [
+        ["5 + true;", "type mismatch: INTEGER + BOOLEAN"],
+        ["5; true + false; 5", "unknown operator: BOOLEAN + BOOLEAN"],
+        ["-true", "unknown operator: -BOOLEAN"],
+        ['"Hello" - "World"', "unknown operator: STRING - STRING"],
+        ["foobar", "identifier not found: foobar"],
+        ["let f = fn() { some_name }; f()", "identifier not found: some_name"],
+        ['{"name": "Monkey"}[fn(x) { x }];', "unusable as hash key: FUNCTION"],
+        ["len(1)", "argument to 'len' not supported, got INTEGER"],
+        ["if (10 > 1) { return true + false; }", "unknown operator: BOOLEAN + BOOLEAN"],
+        ["memoize(1, 1)", "argument to 'memoize' must be FUNCTION, got INTEGER"],
+        ["memoize(len, 0)", "size of 'memoize' must be a positive INTEGER, got 0"],
+        ["memoize(len)", "wrong number of arguments. got=1, want=2"],
+    ],
+)
+def test_error_handling(input: str, expected: str) -> None:
+    result = run_transpiled(parse(input))
+    assert isinstance(result, Error)
+    assert result.message == expected
+
+
+def test_memoized_functions_are_not_rerun(capsys: pytest.CaptureFixture[str]) -> None:
+    run_transpiled(parse("let f = memoize(fn(x) { puts(x); x }, 1); f(1); f(1); f(2); f(1)"))
+
+    assert capsys.readouterr().out == "1\n2\n1\n"
+
+
+def test_integer_operations_are_guarded_inline() -> None:
+    source = transpile(parse("let f = fn(x) { x - 1 }; f(2)"))
+    assert "v_x - 1 if type(v_x) is int else _sub(v_x, 1)" in source
+    compile(source, "<monkey>", "exec")